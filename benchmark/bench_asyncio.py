@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the event loop latency while dumping files concurrently, with the
+blocking ``dump`` called in the coroutine, and with ``adump``. A ticker
+coroutine wakes up every 1 ms, the lag of each wake up is recorded.
+
+With the default thread pool executor, the encoding still holds the GIL most
+of the time, use a process pool executor to keep the event loop responsive
+for CPU heavy workload. Usage::
+
+    python benchmark/bench_asyncio.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+from bench_stream_dumps import make_payload
+
+N_FILES = 8
+INTERVAL = 0.001
+
+
+async def ticker(lags, stop):
+    while not stop.is_set():
+        st = time.perf_counter()
+        await asyncio.sleep(INTERVAL)
+        lags.append(time.perf_counter() - st - INTERVAL)
+
+
+async def blocking_dump(payload, abspath):
+    json.dump(payload, abspath, overwrite=True, verbose=False)
+
+
+async def async_dump(payload, abspath):
+    await json.adump(payload, abspath, overwrite=True)
+
+
+def make_process_dump(executor):
+    async def process_dump(payload, abspath):
+        await json.adump(payload, abspath, overwrite=True, executor=executor)
+
+    return process_dump
+
+
+async def run(dump, payload, tmpdir):
+    lags = list()
+    stop = asyncio.Event()
+    ticker_task = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0.01)
+    st = time.perf_counter()
+    await asyncio.gather(*[
+        dump(payload, os.path.join(tmpdir, "bench-%s.json.gz" % i))
+        for i in range(N_FILES)
+    ])
+    elapsed = time.perf_counter() - st
+    stop.set()
+    await ticker_task
+    lags.sort()
+    return elapsed, lags
+
+
+def main():
+    payload = make_payload(20000)
+    print("dump {} files concurrently, {} records each".format(N_FILES, len(payload)))
+    print("{:<10} {:>8} {:>10} {:>10} {:>10} {:>8}".format(
+        "mode", "total", "lag p50", "lag p99", "lag max", "ticks",
+    ))
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            ProcessPoolExecutor(os.cpu_count()) as executor:
+        # start the worker processes
+        list(executor.map(abs, range(os.cpu_count())))
+        for name, dump in [
+            ("dump", blocking_dump),
+            ("adump", async_dump),
+            ("adump+proc", make_process_dump(executor)),
+        ]:
+            loop = asyncio.new_event_loop()
+            try:
+                elapsed, lags = loop.run_until_complete(run(dump, payload, tmpdir))
+            finally:
+                loop.close()
+            print("{:<10} {:>7.2f}s {:>8.1f}ms {:>8.1f}ms {:>8.1f}ms {:>8}".format(
+                name,
+                elapsed,
+                lags[len(lags) // 2] * 1000,
+                lags[int(len(lags) * 0.99)] * 1000,
+                lags[-1] * 1000,
+                len(lags),
+            ))
+
+
+if __name__ == "__main__":
+    main()
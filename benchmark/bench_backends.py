@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the json backends (see ``superjson.backends``) on ``dumps`` and
+``loads`` speed, with a payload of builtin types only, and a payload full of
+registered types. Usage::
+
+    python benchmark/bench_backends.py
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import SuperJson
+from superjson.backends import backend_registry
+from bench_stream_dumps import make_payload
+
+
+def make_plain_payload(n_records=30000):
+    return [
+        {
+            "id": i,
+            "name": "user-%s" % i,
+            "score": i * 0.1,
+            "tags": ["a", "b", "c"],
+            "profile": {"bio": "Hello World!" * 4, "active": i % 2 == 0},
+        }
+        for i in range(n_records)
+    ]
+
+
+def timeit(func, *args):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    payloads = [
+        ("plain", make_plain_payload()),
+        ("tagged", make_payload(30000)),
+    ]
+    print("{:<8} {:<10} {:>10} {:>10}".format("payload", "backend", "dumps", "loads"))
+    for payload_name, payload in payloads:
+        for name, backend in backend_registry.items():
+            if not backend.available:
+                continue
+            json = SuperJson(backend=name)
+            s, dumps_time = timeit(json.dumps, payload)
+            _, loads_time = timeit(json.loads, s)
+            print("{:<8} {:<10} {:>9.3f}s {:>9.3f}s".format(
+                payload_name, name, dumps_time, loads_time,
+            ))
+
+
+if __name__ == "__main__":
+    main()
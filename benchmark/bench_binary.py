@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the binary format (``dumpb`` / ``loadb``, see ``superjson.binary``)
+with the json text (``dumps`` / ``loads``) on size and speed, with a payload
+of registered types, and a payload with a lot of bytes. Usage::
+
+    python benchmark/bench_binary.py
+"""
+
+import os
+import sys
+import time
+import random
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+from superjson.compression import get_codec
+from bench_stream_dumps import make_payload
+
+
+def make_bytes_payload(n_records=2000):
+    rnd = random.Random(0)
+    return [
+        {
+            "id": i,
+            "thumbnail": bytes(rnd.getrandbits(8) for _ in range(1000)),
+        }
+        for i in range(n_records)
+    ]
+
+
+def timeit(func, *args):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    payloads = [
+        ("tagged", make_payload(30000)),
+        ("bytes", make_bytes_payload()),
+    ]
+    gzip = get_codec("gzip")
+    print("{:<8} {:<7} {:>10} {:>10} {:>10} {:>10}".format(
+        "payload", "format", "size KB", "gzip KB", "dump", "load",
+    ))
+    for payload_name, payload in payloads:
+        s, dumps_time = timeit(json.dumps, payload)
+        _, loads_time = timeit(json.loads, s)
+        b = s.encode("utf-8")
+        print("{:<8} {:<7} {:>10.1f} {:>10.1f} {:>9.3f}s {:>9.3f}s".format(
+            payload_name, "json", len(b) / 1000,
+            len(gzip.compress(b)) / 1000, dumps_time, loads_time,
+        ))
+
+        b, dumpb_time = timeit(json.dumpb, payload)
+        _, loadb_time = timeit(json.loadb, b)
+        print("{:<8} {:<7} {:>10.1f} {:>10.1f} {:>9.3f}s {:>9.3f}s".format(
+            payload_name, "binary", len(b) / 1000,
+            len(gzip.compress(b)) / 1000, dumpb_time, loadb_time,
+        ))
+
+
+if __name__ == "__main__":
+    main()
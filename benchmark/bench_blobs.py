@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare ``dump`` / ``load`` of records with large binary attachments, base64
+encoded in the json, and written to the sidecar blob file
+(``blob_threshold``). The load time includes the first read of every
+attachment. Usage::
+
+    python benchmark/bench_blobs.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+from superjson.blobs import find_sidecars
+
+
+def make_records(n=200, size=1 << 20):
+    return [
+        {"id": i, "name": "file-%s" % i, "content": os.urandom(size)}
+        for i in range(n)
+    ]
+
+
+def main():
+    records = make_records()
+    dirname = tempfile.mkdtemp()
+    path = os.path.join(dirname, "data.json")
+    print("{:<8} {:>10} {:>9} {:>9} {:>14}".format(
+        "mode", "MB on disk", "dump", "load", "MB load peak",
+    ))
+    try:
+        for mode, kwargs in [
+            ("base64", dict()),
+            ("blob", dict(blob_threshold=1 << 16)),
+        ]:
+            st = time.perf_counter()
+            json.dump(records, path, overwrite=True, verbose=False, **kwargs)
+            dump_time = time.perf_counter() - st
+            size = os.path.getsize(path) + sum(
+                os.path.getsize(sidecar) for sidecar in find_sidecars(path)
+            )
+
+            tracemalloc.start()
+            st = time.perf_counter()
+            result = json.load(path, verbose=False)
+            for record in result:
+                record["content"][-1]
+            load_time = time.perf_counter() - st
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del result
+
+            print("{:<8} {:>10.1f} {:>8.3f}s {:>8.3f}s {:>14.1f}".format(
+                mode, size / 1e6, dump_time, load_time, peak / 1e6,
+            ))
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == "__main__":
+    main()
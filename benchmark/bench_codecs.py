@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the compression codecs (see ``superjson.compression``) on compress
+ratio, compress and decompress speed, with a few representative payloads.
+Speed is measured in MB of uncompressed json per second. Usage::
+
+    python benchmark/bench_codecs.py
+"""
+
+import os
+import sys
+import time
+import random
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+from superjson.compression import codec_registry
+
+
+def make_records(n_records=20000):
+    return [
+        {
+            "id": i,
+            "name": "user-%s" % i,
+            "score": i * 0.1,
+            "tags": {"a", "b", "c"},
+            "create_at": datetime(2000, 1, 1, 8, 30, i % 60),
+            "profile": {"bio": "Hello World!" * 4, "active": i % 2 == 0},
+        }
+        for i in range(n_records)
+    ]
+
+
+def make_numbers(n=100000):
+    rnd = random.Random(0)
+    return [rnd.random() for _ in range(n)]
+
+
+def make_text(n=5000):
+    rnd = random.Random(0)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur",
+             "adipiscing", "elit", "sed", "do", "eiusmod", "tempor"]
+    return [
+        " ".join(rnd.choice(words) for _ in range(rnd.randint(5, 50)))
+        for _ in range(n)
+    ]
+
+
+def timeit(func, *args):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    payloads = [
+        ("records", make_records()),
+        ("numbers", make_numbers()),
+        ("text", make_text()),
+    ]
+    print("{:<8} {:<6} {:>5} {:>8} {:>14} {:>16}".format(
+        "payload", "codec", "level", "ratio", "compress MB/s", "decompress MB/s",
+    ))
+    for payload_name, payload in payloads:
+        raw = json.dumps(payload).encode("utf-8")
+        size_mb = len(raw) / 1000000
+        for codec in codec_registry.values():
+            levels = sorted({1, codec.default_level})
+            for level in levels:
+                compressed, compress_time = timeit(codec.compress, raw, level)
+                _, decompress_time = timeit(codec.decompress, compressed)
+                print("{:<8} {:<6} {:>5} {:>8.2f} {:>14.1f} {:>16.1f}".format(
+                    payload_name,
+                    codec.name,
+                    level,
+                    len(raw) / len(compressed),
+                    size_mb / compress_time,
+                    size_mb / decompress_time,
+                ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare ``loads`` / ``dumps`` of a list of datetimes: the ISO 8601 string
+parsed by :func:`dateutil.parser.parse` (the old loader), by the
+``fromisoformat`` fast path, and the ``datetime_epoch="ms"`` encoding.
+Usage::
+
+    python benchmark/bench_datetime.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import SuperJson
+
+
+class DateutilJson(SuperJson):
+    def load_datetime(self, dct, class_name="datetime.datetime"):
+        from dateutil.parser import parse
+
+        return parse(dct["$" + class_name])
+
+
+def make_datetimes(n=100000):
+    start = datetime(2000, 1, 1, tzinfo=timezone(timedelta(hours=8)))
+    return [start + timedelta(seconds=i * 7.5) for i in range(n)]
+
+
+def timeit(func, *args, **kwargs):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    datetimes = make_datetimes()
+    print("{:<20} {:>10} {:>9} {:>9}".format("encoding", "size", "dumps", "loads"))
+    for name, json, kwargs in [
+        ("iso + dateutil", DateutilJson(), dict()),
+        ("iso + fromisoformat", SuperJson(), dict()),
+        ("epoch ms", SuperJson(), dict(datetime_epoch="ms")),
+    ]:
+        s, dumps_time = timeit(json.dumps, datetimes, **kwargs)
+        result, loads_time = timeit(json.loads, s)
+        assert result == datetimes
+        print("{:<20} {:>10} {:>8.3f}s {:>8.3f}s".format(
+            name, len(s), dumps_time, loads_time,
+        ))
+
+
+if __name__ == "__main__":
+    main()
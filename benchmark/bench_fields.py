@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the generated dumper / loader of ``SuperJson.register_fields`` with
+hand written ``dump_xxx`` / ``load_xxx`` methods, on ``dumps`` and ``loads``
+speed of a list of custom objects. Usage::
+
+    python benchmark/bench_fields.py
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import SuperJson
+
+FIELDS = ["id", "name", "email", "score", "active", "tags"]
+
+
+class User(object):
+    def __init__(self, id, name, email, score, active, tags):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.score = score
+        self.active = active
+        self.tags = tags
+
+
+CLASS_NAME = User.__module__ + "." + User.__name__
+
+
+class HandWrittenJson(SuperJson):
+    def dump_User(self, obj, class_name=CLASS_NAME):
+        return {
+            "$" + class_name: {
+                field: self._json_convert(getattr(obj, field))
+                for field in FIELDS
+            }
+        }
+
+    def load_User(self, dct, class_name=CLASS_NAME):
+        return User(**dct["$" + class_name])
+
+
+class GeneratedJson(SuperJson):
+    pass
+
+
+GeneratedJson.register_fields(User, FIELDS)
+
+
+def make_users(n=100000):
+    return [
+        User(i, "user-%s" % i, "user-%s@example.com" % i, i * 0.5,
+             i % 2 == 0, ["a", "b"])
+        for i in range(n)
+    ]
+
+
+def timeit(func, *args):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    users = make_users()
+    print("{:<12} {:>10} {:>10}".format("dumper", "dumps", "loads"))
+    for name, json in [
+        ("hand written", HandWrittenJson()),
+        ("generated", GeneratedJson()),
+    ]:
+        s, dumps_time = timeit(json.dumps, users)
+        _, loads_time = timeit(json.loads, s)
+        print("{:<12} {:>9.3f}s {:>9.3f}s".format(name, dumps_time, loads_time))
+
+
+if __name__ == "__main__":
+    main()
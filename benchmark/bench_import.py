@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the cold start cost of ``import superjson`` with ``python -X
+importtime``, and the time to define a ``SuperJson`` subclass. Each import
+is measured in a fresh interpreter, the median of the runs is reported,
+with the slowest modules imported by it. Usage::
+
+    python benchmark/bench_import.py
+
+``tests/test_import.py`` checks that the optional modules are not imported.
+"""
+
+import os
+import sys
+import time
+import subprocess
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+N_RUNS = 10
+N_TOP = 10
+
+
+def importtime(module: str):
+    """
+    :returns: ``{module name: (self us, cumulative us)}`` of one run.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(HERE)
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        env=env, stderr=subprocess.PIPE, check=True,
+    ).stderr.decode("utf-8")
+    result = dict()
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():  # header line
+            continue
+        result[name.strip()] = (int(self_us), int(cumulative_us))
+    return result
+
+
+def bench_subclass(n=1000):
+    from superjson import SuperJson
+
+    attrs = {
+        "dump_Point": lambda self, obj, class_name="a.Point": None,
+        "load_Point": lambda self, dct, class_name="a.Point": None,
+    }
+    st = time.perf_counter()
+    for i in range(n):
+        type(SuperJson)("MyJson%s" % i, (SuperJson,), dict(attrs))
+    return (time.perf_counter() - st) / n
+
+
+def main():
+    runs = [importtime("superjson") for _ in range(N_RUNS)]
+    total = statistics.median(run["superjson"][1] for run in runs)
+    print("import superjson: %.1f ms (median of %s runs)" % (total / 1000, N_RUNS))
+    last = runs[-1]
+    print("slowest modules (cumulative ms):")
+    for name, (_, cumulative) in sorted(
+        last.items(), key=lambda item: -item[1][1],
+    )[1:N_TOP + 1]:
+        print("    %-40s %8.1f" % (name, cumulative / 1000))
+    print("define a SuperJson subclass: %.1f us" % (bench_subclass() * 1e6))
+
+
+if __name__ == "__main__":
+    main()
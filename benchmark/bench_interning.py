@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the memory held by a loaded list of records, with and without
+``intern_keys`` / ``intern_values``, and report the bytes saved. The records
+are loaded as one json document (``loads``), and as one document per record
+(``loads_many`` of a reused decoder, like ``load_lines``). Usage::
+
+    python benchmark/bench_interning.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import SuperJson
+
+STATUSES = ["active", "inactive", "pending", "suspended"]
+
+
+def make_records(n=200000):
+    return [
+        {
+            "user_identifier": i,
+            "account_status": STATUSES[i % 4],
+            "country_code": "country-%s" % (i % 50),
+            "display_name": "user-%s" % i,
+        }
+        for i in range(n)
+    ]
+
+
+def measure(func):
+    """
+    :returns: ``(bytes held by the result, seconds)``, the time is measured
+        without tracing.
+    """
+    st = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - st
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def main():
+    records = make_records()
+    print("{:<8} {:<10} {:<22} {:>10} {:>11} {:>8}".format(
+        "backend", "input", "interning", "MB held", "MB saved", "time",
+    ))
+    for backend in ["stdlib", "orjson"]:
+        try:
+            json = SuperJson(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+        document = json.dumps(records)
+        lines = [json.dumps(record) for record in records]
+        for name, func, arg in [
+            ("document", lambda s, **kw: json.loads(s, **kw), document),
+            ("lines", lambda s, **kw: json.make_decoder(**kw).loads_many(s), lines),
+        ]:
+            baseline = None
+            for label, kwargs in [
+                ("off", dict()),
+                ("keys", dict(intern_keys=True)),
+                ("keys + values <= 16", dict(intern_keys=True, intern_values=16)),
+            ]:
+                size, elapsed = measure(lambda: func(arg, **kwargs))
+                if baseline is None:
+                    baseline = size
+                print("{:<8} {:<10} {:<22} {:>10.1f} {:>11.1f} {:>7.3f}s".format(
+                    backend, name, label, size / 1e6,
+                    (baseline - size) / 1e6, elapsed,
+                ))
+
+
+if __name__ == "__main__":
+    main()
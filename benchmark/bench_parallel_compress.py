@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the wall time of ``SuperJson.dump`` to a ``*.gz`` file, with single
+thread compression and with the ``workers=`` block parallel compression.
+Usage::
+
+    python benchmark/bench_parallel_compress.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+from bench_stream_dumps import make_payload
+
+
+def main():
+    payload = make_payload()
+    abspath = os.path.join(tempfile.gettempdir(), "bench_parallel_compress.json.gz")
+    n_cpu = os.cpu_count() or 1
+    workers_list = [None] + sorted({2, max(n_cpu, 2)})
+    print("cpu count = %s" % n_cpu)
+    for stream in [False, True]:
+        for workers in workers_list:
+            st = time.perf_counter()
+            json.dump(payload, abspath, overwrite=True, verbose=False,
+                      stream=stream, workers=workers)
+            elapsed = time.perf_counter() - st
+            size = os.path.getsize(abspath)
+            print("stream = {!s:<5} workers = {!s:<4} elapsed = {:.3f} sec, "
+                  "size = {:.1f} MB".format(stream, workers, elapsed, size / 1000000))
+    os.remove(abspath)
+
+
+if __name__ == "__main__":
+    main()
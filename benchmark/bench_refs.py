@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the size and speed of a graph of custom objects where every order
+refers to a shared customer and product, dumped as it is and with
+``dumps(track_refs=True)``. Usage::
+
+    python benchmark/bench_refs.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import SuperJson
+
+
+class Customer(object):
+    def __init__(self, id, name, email, address, created_at):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.address = address
+        self.created_at = created_at
+
+
+class Product(object):
+    def __init__(self, sku, title, description, price, tags):
+        self.sku = sku
+        self.title = title
+        self.description = description
+        self.price = price
+        self.tags = tags
+
+
+class Order(object):
+    def __init__(self, id, customer, product, quantity):
+        self.id = id
+        self.customer = customer
+        self.product = product
+        self.quantity = quantity
+
+
+class GraphSuperJson(SuperJson):
+    pass
+
+
+GraphSuperJson.register_fields(
+    Customer, ["id", "name", "email", "address", "created_at"])
+GraphSuperJson.register_fields(
+    Product, ["sku", "title", "description", "price", "tags"])
+GraphSuperJson.register_fields(
+    Order, ["id", "customer", "product", "quantity"])
+
+
+def make_orders(n_orders=50000, n_customers=500, n_products=100):
+    customers = [
+        Customer(
+            i, "customer-%s" % i, "customer-%s@example.com" % i,
+            {"street": "%s Main Street" % i, "city": "Springfield",
+             "country": "US"},
+            datetime(2000, 1, 1, i % 24),
+        )
+        for i in range(n_customers)
+    ]
+    products = [
+        Product(
+            "SKU-%06d" % i, "product %s" % i,
+            "a long description of the product %s " % i * 4,
+            i * 1.25, ["tag-%s" % (i % 7), "tag-%s" % (i % 11)],
+        )
+        for i in range(n_products)
+    ]
+    return [
+        Order(i, customers[i % n_customers], products[i % n_products], i % 5)
+        for i in range(n_orders)
+    ]
+
+
+def timeit(func, *args, **kwargs):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    orders = make_orders()
+    print("{:<10} {:<10} {:>10} {:>9} {:>9}".format(
+        "backend", "track_refs", "size", "dumps", "loads",
+    ))
+    for backend in ["stdlib", "orjson"]:
+        try:
+            json = GraphSuperJson(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+        for track_refs in [False, True]:
+            s, dumps_time = timeit(json.dumps, orders, track_refs=track_refs)
+            loads_time = timeit(json.loads, s)[1]
+            print("{:<10} {:<10} {:>10} {:>8.3f}s {:>8.3f}s".format(
+                backend, str(track_refs), len(s), dumps_time, loads_time,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare ``SuperJson.dump(..., stream=False)`` and
+``SuperJson.dump(..., stream=True)`` on peak memory and elapsed time.
+
+The streaming mode is a memory tradeoff, not a speedup: the extra peak RSS
+doesn't grow with the data, the elapsed time is about the same, up to 10%
+more.
+
+Each mode runs in a fresh sub process, so the peak RSS of one mode doesn't
+affect the other. Usage::
+
+    python benchmark/bench_stream_dumps.py
+"""
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+
+
+def make_payload(n_records=200000):
+    return [
+        {
+            "id": i,
+            "name": "user-%s" % i,
+            "score": i * 0.1,
+            "tags": {"a", "b", "c"},
+            "create_at": datetime(2000, 1, 1, 8, 30, i % 60),
+            "profile": {"bio": "Hello World!" * 4, "active": i % 2 == 0},
+        }
+        for i in range(n_records)
+    ]
+
+
+def get_peak_rss_mb():
+    # ru_maxrss is in KB on Linux, and in bytes on MacOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # pragma: no cover
+        peak = peak / 1024
+    return peak / 1024
+
+
+def run_one(mode):
+    payload = make_payload()
+    baseline = get_peak_rss_mb()
+    abspath = os.path.join(tempfile.gettempdir(), "bench_stream_dumps.json")
+    st = time.perf_counter()
+    json.dump(payload, abspath, overwrite=True, verbose=False,
+              stream=(mode == "stream"))
+    elapsed = time.perf_counter() - st
+    os.remove(abspath)
+    print("%s %.3f %.1f" % (mode, elapsed, get_peak_rss_mb() - baseline))
+
+
+def main():
+    for mode in ["convert", "stream"]:
+        output = subprocess.check_output(
+            [sys.executable, __file__, mode]
+        ).decode("utf-8").strip()
+        mode, elapsed, rss = output.split()
+        print("{:<8} elapsed = {:>7} sec, extra peak RSS = {:>7} MB".format(
+            mode, elapsed, rss,
+        ))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        run_one(sys.argv[1])
+    else:
+        main()
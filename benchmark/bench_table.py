@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the size and speed of a homogeneous list of records encoded as a
+list of objects and as a columnar table (``dumps(table_threshold=...)``),
+raw and gzip compressed. Usage::
+
+    python benchmark/bench_table.py
+"""
+
+import os
+import sys
+import time
+import zlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import SuperJson
+
+
+def make_records(n=100000):
+    return [
+        {
+            "user_id": i,
+            "user_name": "user-%s" % i,
+            "email_address": "user-%s@example.com" % i,
+            "score": i * 0.5,
+            "is_active": i % 2 == 0,
+        }
+        for i in range(n)
+    ]
+
+
+def timeit(func, *args, **kwargs):
+    best = None
+    for _ in range(3):
+        st = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - st
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def main():
+    records = make_records()
+    print("{:<10} {:<8} {:>10} {:>10} {:>9} {:>9}".format(
+        "backend", "layout", "size", "gzip size", "dumps", "loads",
+    ))
+    for backend in ["stdlib", "orjson"]:
+        try:
+            json = SuperJson(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+        for layout, threshold in [("records", None), ("table", 16)]:
+            s, dumps_time = timeit(json.dumps, records, table_threshold=threshold)
+            _, loads_time = timeit(json.loads, s)
+            print("{:<10} {:<8} {:>10} {:>10} {:>8.3f}s {:>8.3f}s".format(
+                backend, layout, len(s), len(zlib.compress(s.encode("utf-8"))),
+                dumps_time, loads_time,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the decode speed of a document that is mostly plain dicts, with and
+without the tag pre-scan. Usage::
+
+    python benchmark/bench_tag_decode.py
+"""
+
+import os
+import sys
+import time
+from datetime import date
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from superjson import json
+
+
+def make_records(n_records=200000, with_tags=False):
+    records = [
+        {"id": i, "name": "user-%s" % i, "profile": {"age": i % 100, "active": True}}
+        for i in range(n_records)
+    ]
+    if with_tags:
+        # 1% of the records have a tagged value
+        for record in records[::100]:
+            record["birthday"] = date(2000, 1, 1)
+    return records
+
+
+def timeit(func, repeat=3):
+    elapsed = list()
+    for _ in range(repeat):
+        st = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - st)
+    return min(elapsed)
+
+
+def main():
+    for with_tags in [False, True]:
+        s = json.dumps(make_records(with_tags=with_tags))
+        print("document with tags = %s, size = %.1f MB" % (with_tags, len(s) / 1000000))
+        for scan_tags in [False, True]:
+            decoder = json.make_decoder(scan_tags=scan_tags)
+            print("    scan_tags = {:<5}: {:.3f} sec".format(
+                str(scan_tags), timeit(lambda: decoder.loads(s)),
+            ))
+
+
+if __name__ == "__main__":
+    main()
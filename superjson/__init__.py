@@ -12,6 +12,8 @@ __github_username__ = "MacHu-GWU"
 
 try:
     from ._superjson import SuperJson, get_class_name, superjson as json
+    from .encoder import Encoder
+    from .decoder import Decoder
 except ImportError as e:  # pragma: no cover
     pass
 except Exception as e:  # pragma: no cover
@@ -1,19 +1,46 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import re
+import sys
+import copy
 import time
-import inspect
+import weakref
+import threading
 
+from functools import partial
+from itertools import islice
 from collections import OrderedDict, deque
-from datetime import datetime
 from base64 import b64encode, b64decode
 
 from .helper import get_class_name
-from .comments import strip_comments
-from .warning import logger, WARN_MSG, prt_console
-from .pkg import compresslib
-from .pkg.atomicwrites import atomic_write
+from .blobs import (
+    BLOB_CLASS_NAME, BlobWriter, BlobReader, remove_sidecars,
+)
+from .datetimes import (
+    parse_datetime, parse_date, datetime_to_epoch, epoch_to_datetime,
+    check_datetime_epoch,
+)
+from .refs import DEF_CLASS_NAME, REF_CLASS_NAME, RefTracker, RefTable
+from .encoder import Encoder
+from .decoder import Decoder
+from .fileio import (
+    DEFAULT_CHUNK_SIZE, write_chunks, map_file, iter_text_chunks, iter_lines,
+)
+from .compression import codec_registry
+from .comments import iter_strip_comments
+from .backends import get_backend
+from .warning import get_logger, WARN_MSG, prt_console
+
+
+def atomic_write(path, **kwargs):
+    """
+    :func:`superjson.pkg.atomicwrites.atomic_write`, the module (and
+    :mod:`tempfile`) is imported at the first call.
+    """
+    from .pkg.atomicwrites import atomic_write
+
+    return atomic_write(path, **kwargs)
 
 
 def get_class_name_from_dumper_loader_method(func):
@@ -22,14 +49,25 @@ def get_class_name_from_dumper_loader_method(func):
 
     Because the third argument of dumper, loader method must be the class name.
     """
-    return inspect.getfullargspec(func).defaults[0]
+    return func.__defaults__[0]
+
+
+def _get_arg_names(func):
+    """The positional argument names of a function, read from its code
+    object, much cheaper than :func:`inspect.getfullargspec`.
+    """
+    try:
+        code = func.__code__
+    except AttributeError:
+        raise TypeError("%r is not a function" % (func,))
+    return list(code.co_varnames[:code.co_argcount])
 
 
 def is_dumper_method(func):
     """
     Test if it is a dumper method.
     """
-    if inspect.getfullargspec(func).args == ["self", "obj", "class_name"]:
+    if _get_arg_names(func) == ["self", "obj", "class_name"]:
         return True
     else:
         return False
@@ -39,149 +77,642 @@ def is_loader_method(func):
     """
     Test if it is a loader method.
     """
-    if inspect.getfullargspec(func).args == ["self", "dct", "class_name"]:
+    if _get_arg_names(func) == ["self", "dct", "class_name"]:
         return True
     else:
         return False
 
 
+# methods of BaseSuperJson that starts with "dump_" / "load_", but they are
+# not dumper / loader.
+_api_method_names = {
+    "dump_lines",
+    "load_lines",
+    "dump_many",
+    "load_many",
+}
+
+
+def _find_declared_methods(attrs):
+    """Find the dumper / loader methods defined in a class body.
+
+    :returns: ``(dumpers, loaders)``, two dict, class name -> method.
+    """
+    dumpers = dict()
+    loaders = dict()
+    for attr, value in attrs.items():
+        if attr in _api_method_names:
+            continue
+        if attr.startswith("dump_"):
+            method_type, obj_or_dct, dump_or_load, check, methods = \
+                "dumper", "obj", "dump", is_dumper_method, dumpers
+        elif attr.startswith("load_"):
+            method_type, obj_or_dct, dump_or_load, check, methods = \
+                "loader", "dct", "load", is_loader_method, loaders
+        else:
+            continue
+        # link dumper / loader method with the full classname
+        try:
+            if check(value):
+                class_name = get_class_name_from_dumper_loader_method(value)
+                methods[class_name] = value
+                continue
+        except TypeError:
+            pass
+        get_logger().warning(WARN_MSG.format(
+            attr=attr,
+            method_type=method_type,
+            obj_or_dct=obj_or_dct,
+            dump_or_load=dump_or_load,
+        ))
+    return dumpers, loaders
+
+
 class Meta(type):
     def __new__(cls, name, bases, attrs):
         klass = super(Meta, cls).__new__(cls, name, bases, attrs)
 
+        # the class body is inspected only once, the dumpers / loaders
+        # declared in it (and registered by ``register_fields`` later) are
+        # kept in ``_declared_dumpers`` / ``_declared_loaders``
+        klass._declared_dumpers, klass._declared_loaders = \
+            _find_declared_methods(attrs)
+
+        # merge them along the MRO, the subclass overrides its bases
         _dumpers = dict()
         _loaders = dict()
-
-        for base in inspect.getmro(klass):
-            for attr, value in base.__dict__.items():
-                dumper_warning_message = WARN_MSG.format(
-                    attr=attr,
-                    method_type="dumper",
-                    obj_or_dct="obj",
-                    dump_or_load="dump",
-                )
-
-                loader_warning_message = WARN_MSG.format(
-                    attr=attr,
-                    method_type="loader",
-                    obj_or_dct="dct",
-                    dump_or_load="load",
-                )
-
-                # link dumper / loader method with the full classname
-                # find dumper method,
-                if attr.startswith("dump_"):
-                    try:
-                        if is_dumper_method(value):
-                            class_name = get_class_name_from_dumper_loader_method(
-                                value)
-                            _dumpers[class_name] = value
-                        else:
-                            logger.warning(dumper_warning_message)
-                    except TypeError:
-                        logger.warning(dumper_warning_message)
-
-                # find loader method
-                if attr.startswith("load_"):
-                    try:
-                        if is_loader_method(value):
-                            class_name = get_class_name_from_dumper_loader_method(
-                                value)
-                            _loaders[class_name] = value
-                        else:
-                            logger.warning(loader_warning_message)
-                    except TypeError:
-                        logger.warning(loader_warning_message)
+        for base in reversed(klass.__mro__):
+            if "_declared_dumpers" in base.__dict__:
+                _dumpers.update(base.__dict__["_declared_dumpers"])
+                _loaders.update(base.__dict__["_declared_loaders"])
+            elif base is not object:
+                # plain mixin class, not created by this metaclass
+                dumpers, loaders = _find_declared_methods(base.__dict__)
+                _dumpers.update(dumpers)
+                _loaders.update(loaders)
 
         klass._dumpers = _dumpers
         klass._loaders = _loaders
+        # "$class_name" key -> loader, used by the object hook
+        klass._tagged_loaders = {
+            "$" + class_name: loader
+            for class_name, loader in _loaders.items()
+        }
         return klass
 
 
 bytes_class_name = get_class_name(bytes())
 set_class_name = get_class_name(set())
+table_class_name = "superjson.table"
 
+_tag_pattern = re.compile(r'"\$([^"\\]*)"')
+_bytes_tag_pattern = re.compile(rb'"\$([^"\\]*)"')
+_bytes_escaped_dollar = re.compile(rb"\\u0024")
 
-def is_compressed_json_file(abspath):
-    """Test a file is a valid json file.
+#: builtin types that are json serializable as they are.
+ATOMIC_TYPES = (str, int, bool, type(None))
+
+
+JSON_LINES_EXTENSIONS = [".jsonl", ".ndjson"]
+
+#: superjson binary file, see :mod:`superjson.binary`
+BINARY_EXTENSIONS = [".sjb"]
+
+
+def get_file_codec(abspath):
+    """Test a file is a valid json file, and find the compression codec.
 
     - ``*.json``: uncompressed, utf-8 encode json file
     - ``*.js``: uncompressed, utf-8 encode json file
-    - ``*.gz``: compressed, utf-8 encode json file
+    - ``*.jsonl``, ``*.ndjson``: uncompressed, utf-8 encode json lines file
+    - ``*.sjb``: uncompressed superjson binary file
+    - ``*.gz``, ``*.bz2``, ``*.xz``, ``*.zst``, ``*.lz4`` or any extension in
+      the :mod:`~superjson.compression` registry: compressed, utf-8 encode
+      json file (or json lines file if it is ``*.jsonl.gz``,
+      ``*.ndjson.gz``, ..., binary file if it is ``*.sjb.gz``, ...)
+
+    :returns: the :class:`~superjson.compression.Codec`, or ``None`` if the
+      file is uncompressed.
     """
     abspath = abspath.lower()
     fname, ext = os.path.splitext(abspath)
-    if ext in [".json", ".js"]:
-        is_compressed = False
-    elif ext == ".gz":
-        is_compressed = True
+    if ext in [".json", ".js"] + JSON_LINES_EXTENSIONS + BINARY_EXTENSIONS:
+        return None
+    elif ext in codec_registry:
+        return codec_registry[ext]
     else:
         raise ValueError(
             "'%s' is not a valid json file. "
-            "extension has to be '.json' or '.js' for uncompressed, '.gz' "
-            "for compressed." % abspath)
-    return is_compressed
+            "extension has to be '.json', '.js', '.jsonl', '.ndjson' or "
+            "'.sjb' for "
+            "uncompressed, %s for compressed." % (
+                abspath,
+                ", ".join("'%s'" % ext for ext in codec_registry),
+            ))
+
+
+def is_compressed_json_file(abspath):
+    """Test a file is a valid json file, and it is compressed. See
+    :func:`get_file_codec`.
+    """
+    return get_file_codec(abspath) is not None
+
+
+def is_json_lines_file(abspath):
+    """Test a file is a json lines file, one json value per line.
+
+    - ``*.jsonl``, ``*.ndjson``: uncompressed
+    - ``*.jsonl.gz``, ``*.ndjson.gz``, ``*.jsonl.xz``, ...: compressed
+    """
+    fname, ext = os.path.splitext(abspath.lower())
+    if ext in codec_registry:
+        fname, ext = os.path.splitext(fname)
+    return ext in JSON_LINES_EXTENSIONS
+
+
+def is_binary_file(abspath):
+    """Test a file is a superjson binary file, see :mod:`superjson.binary`.
+
+    - ``*.sjb``: uncompressed
+    - ``*.sjb.gz``, ``*.sjb.xz``, ...: compressed
+    """
+    fname, ext = os.path.splitext(abspath.lower())
+    if ext in codec_registry:
+        fname, ext = os.path.splitext(fname)
+    return ext in BINARY_EXTENSIONS
+
+
+def _run_many(func, items, workers):
+    """Call ``func(key, value)`` for each item on a thread pool.
+
+    :returns: ``(results, errors)``, two dict, key -> return value, and
+      key -> exception.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    results = dict()
+    errors = dict()
+    with ThreadPoolExecutor(workers) as executor:
+        futures = {
+            executor.submit(func, key, value): key
+            for key, value in items
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+    return results, errors
+
+
+# the SuperJson instance in the process pool worker
+_process_superjson = None
+
+
+def _init_process_worker(superjson):
+    global _process_superjson
+    _process_superjson = superjson
+
+
+def _start_process_pool(superjson, workers):
+    """Python 3.6 ``ProcessPoolExecutor`` has no ``initializer``. The
+    workers are forked (the default on POSIX) with the instance already set,
+    all of them are started by the first task.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _process_superjson
+    previous = _process_superjson
+    _process_superjson = superjson
+    try:
+        pool = ProcessPoolExecutor(workers)
+        pool.submit(int).result()
+    finally:
+        _process_superjson = previous
+    return pool
+
+
+def _dumps_chunk(objs, kwargs):
+    return _process_superjson.make_encoder(**kwargs).dumps_many(objs)
+
+
+def _loads_chunk(strings, kwargs):
+    return _process_superjson.make_decoder(**kwargs).loads_many(strings)
+
+
+def _get_mp_context():
+    """Prefer ``fork``, the worker process inherits the SuperJson instance
+    as it is, so subclass defined in ``__main__`` or in a function works.
+    """
+    import multiprocessing
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()  # pragma: no cover
+
+
+#: size of the block written at a time by :func:`_write_atomic`, the
+#: cancellation is checked before each block
+_WRITE_BLOCK_SIZE = 1 << 20
+
+
+class _WriteCancelled(Exception):
+    pass
+
+
+def _write_atomic(abspath, data, cancel_event):
+    """Write bytes to a file atomically, block by block. If ``cancel_event``
+    is set, stop writing and remove the temp file.
+    """
+    with atomic_write(abspath, mode="wb", overwrite=True) as f:
+        with memoryview(data) as view:
+            for start in range(0, len(view), _WRITE_BLOCK_SIZE):
+                if cancel_event.is_set():
+                    raise _WriteCancelled
+                f.write(view[start:start + _WRITE_BLOCK_SIZE])
+        if cancel_event.is_set():
+            raise _WriteCancelled
+
+
+def _next_batch(iterator, size):
+    return list(islice(iterator, size))
+
+
+# live SuperJson instances, their dumper dispatch tables are cleared when a
+# new dumper is registered
+_instances = weakref.WeakSet()
 
 
 class BaseSuperJson(metaclass=Meta):
     """
     A extensable json encoder/decoder. You can easily custom converter for
     any types.
+
+    :param backend: default ``"stdlib"``, the json library used for the final
+        encode / parse step, ``"orjson"``, ``"rapidjson"``, ``"ujson"`` or
+        ``"auto"`` for the fastest installed one. See
+        :mod:`superjson.backends`.
+
+    :param auto_classes: default ``False``, if ``True``, dataclasses,
+        ``typing.NamedTuple``, attrs classes and ``__slots__`` classes that
+        don't have a registered dumper are dumped automatically, and loaded
+        only after this instance dumped them. If it is a list of classes,
+        only these classes are handled, they can be loaded right away. See
+        :mod:`superjson.fields`.
     """
     _dumpers = dict()
     _loaders = dict()
 
+    # encoding settings, they are only set on the configured copy made by
+    # :meth:`BaseSuperJson._configure`, never on a shared instance
+    _float_precision = None
+    # True when encoding the binary format, dumpers can return raw bytes
+    # (or a byte memoryview) instead of base64 string
+    _binary = False
+    # list of at least this many records is encoded as a columnar table,
+    # see :meth:`BaseSuperJson._to_table`
+    _table_threshold = None
+    # decoding setting, return the columns of the table instead of records
+    _table_columns = False
+    # "ms" / "us", dump datetime as integer epoch instead of ISO string, see
+    # :mod:`superjson.datetimes`
+    _datetime_epoch = None
+    # :class:`~superjson.blobs.BlobWriter` used by ``dump(blob_threshold=...)``
+    _blob_writer = None
+    # :class:`~superjson.blobs.BlobReader` used by ``load``
+    _blob_reader = None
+    # :class:`~superjson.refs.RefTable` of the document being loaded
+    _ref_table = None
+
+    # json backend name, set by __init__
+    _backend = "stdlib"
+
+    # handle dataclasses, NamedTuple, ... automatically, set by __init__
+    _auto_classes = False
+    # frozenset of the automatically handled classes if they are listed,
+    # ``None`` for any class, set by __init__
+    _allowed_auto_classes = None
+
+    # process pool used by dumps_parallel / loads_parallel, created lazily
+    _process_pool = None
+    _process_pool_workers = None
+
+    def __init__(self, backend: str = "stdlib", auto_classes=False):
+        get_backend(backend)  # raise early if not available
+        self._backend = backend
+        self._auto_classes = bool(auto_classes)
+        # type -> dumper method (or None) dispatch table, filled lazily
+        self._dumper_cache = dict()
+        # "$class_name" key -> automatically handled class that can be
+        # loaded, the listed ones and the ones dumped by this instance
+        self._auto_class_names = dict()
+        # "$class_name" key -> loader of the automatically handled classes,
+        # filled lazily
+        self._auto_loaders = dict()
+        if self._auto_classes and not isinstance(auto_classes, bool):
+            self._allowed_auto_classes = self._allow_auto_classes(
+                auto_classes)
+        # builtin types that don't have a registered dumper, they bypass
+        # the dumper lookup entirely
+        self._atomic_types = self._find_atomic_types()
+        _instances.add(self)
+
+    def __getattr__(self, name):
+        """Create the per-instance caches on first use, if the ``__init__``
+        of a subclass doesn't call ``super().__init__()``.
+        """
+        if name in ("_dumper_cache", "_auto_class_names", "_auto_loaders"):
+            value = dict()
+        elif name == "_atomic_types":
+            value = self._find_atomic_types()
+        else:
+            raise AttributeError(
+                "%r object has no attribute %r"
+                % (self.__class__.__name__, name)
+            )
+        self.__dict__[name] = value
+        _instances.add(self)
+        return value
+
+    def _allow_auto_classes(self, classes):
+        from .fields import get_auto_fields, get_auto_class_name
+
+        allowed = frozenset(classes)
+        for klass in allowed:
+            if get_auto_fields(klass) is None:
+                raise TypeError(
+                    "%r is not a dataclass, NamedTuple, attrs class or "
+                    "__slots__ class" % (klass,)
+                )
+            self._auto_class_names["$" + get_auto_class_name(klass)] = klass
+        return allowed
+
+    def _find_atomic_types(self):
+        return frozenset(
+            klass for klass in ATOMIC_TYPES if self._get_dumper(klass) is None
+        )
+
+    def __copy__(self):
+        superjson = object.__new__(self.__class__)
+        superjson.__dict__.update(self.__dict__)
+        return superjson
+
+    def __getstate__(self):
+        """The dumper / loader caches and the process pool are not pickled,
+        they are rebuilt lazily.
+        """
+        state = self.__dict__.copy()
+        state["_dumper_cache"] = dict()
+        state["_auto_loaders"] = dict()
+        state.pop("_process_pool", None)
+        state.pop("_process_pool_workers", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        _instances.add(self)
+
+    @classmethod
+    def register_fields(
+        cls,
+        klass,
+        fields,
+        init: bool = True,
+    ):
+        """Register a generated dumper and loader for ``klass``, instead of
+        hand writing the ``dump_xxx`` / ``load_xxx`` methods. The object is
+        dumped as ``{"$module.ClassName": {field: value, ...}}``. See
+        :mod:`superjson.fields`.
+
+        The dumper / loader is registered to this class and all its
+        subclasses that don't have their own one, the existing instances
+        pick it up immediately.
+
+        :param fields: attribute names to dump.
+        :type fields: list
+
+        :param init: default ``True``, if ``True`` the loader creates the
+            object by calling ``klass(**fields)``, else ``__init__`` is
+            bypassed, the attributes are set directly.
+        :type init: bool
+        """
+        class_name = klass.__module__ + "." + klass.__name__
+        from .fields import compile_fields
+
+        dumper, loader = compile_fields(klass, fields, class_name, init)
+
+        old_dumper = cls._dumpers.get(class_name)
+        old_loader = cls._loaders.get(class_name)
+        # inherited by the subclasses defined later
+        cls._declared_dumpers[class_name] = dumper
+        cls._declared_loaders[class_name] = loader
+        todo = [cls]
+        while todo:
+            subclass = todo.pop()
+            todo.extend(subclass.__subclasses__())
+            if subclass is cls \
+                    or subclass._dumpers.get(class_name) is old_dumper:
+                subclass._dumpers[class_name] = dumper
+            if subclass is cls \
+                    or subclass._loaders.get(class_name) is old_loader:
+                subclass._loaders[class_name] = loader
+                subclass._tagged_loaders["$" + class_name] = loader
+
+        for superjson in list(_instances):
+            if isinstance(superjson, cls):
+                superjson._dumper_cache.clear()
+
+    def _configure(self, **settings):
+        """Return a shallow copy of this instance with some encoding / decoding
+        settings changed. The dumper dispatch table is shared with the
+        original one.
+
+        Dumper / loader methods receive the copy as ``self``, so that's how
+        the settings reach the nested ``self._json_convert`` calls without
+        touching any global state.
+        """
+        superjson = copy.copy(self)
+        for key, value in settings.items():
+            setattr(superjson, key, value)
+        return superjson
+
+    def _resolve_dumper(self, klass):
+        """Find the dumper for ``klass`` along its MRO, so subclasses of
+        registered types also get a dumper. The result is cached.
+        """
+        dumper = None
+        for base in klass.__mro__:
+            class_name = base.__module__ + "." + base.__name__
+            if class_name in self._dumpers:
+                dumper = self._dumpers[class_name]
+                break
+        else:
+            allowed = self._allowed_auto_classes
+            if self._auto_classes and (allowed is None or klass in allowed):
+                from .fields import compile_auto_fields, get_auto_class_name
+
+                compiled = compile_auto_fields(klass)
+                if compiled is not None:
+                    dumper = compiled[0]
+                    # only the classes dumped before can be loaded
+                    key = "$" + get_auto_class_name(klass)
+                    self._auto_class_names[key] = klass
+        self._dumper_cache[klass] = dumper
+        return dumper
+
+    def _get_dumper(self, klass):
+        """Get the dumper method for ``klass``, return None if not found.
+        """
+        try:
+            return self._dumper_cache[klass]
+        except KeyError:
+            return self._resolve_dumper(klass)
+
     def _dump(self, obj):
         """Dump single object to json serializable value.
         """
-        class_name = get_class_name(obj)
-        if class_name in self._dumpers:
-            return self._dumpers[class_name](self, obj)
-        raise TypeError("%r is not JSON serializable" % obj)
+        dumper = self._get_dumper(type(obj))
+        if dumper is None:
+            raise TypeError("%r is not JSON serializable" % obj)
+        return dumper(self, obj)
 
     def _json_convert(self, obj):
         """Recursive helper method that converts dict types to standard library
         json serializable types, so they can be converted into json.
         """
-        # OrderedDict
-        if isinstance(obj, OrderedDict):
-            try:
-                return self._dump(obj)
-            except TypeError:
-                return {k: self._json_convert(v) for k, v in obj.items()}
+        klass = type(obj)
+
+        # str, int, bool, None
+        if klass in self._atomic_types:
+            return obj
 
         # nested dict
-        elif isinstance(obj, dict):
+        elif klass is dict:
             return {k: self._json_convert(v) for k, v in obj.items()}
 
         # list or tuple
-        elif isinstance(obj, (list, tuple)):
-            return list((self._json_convert(v) for v in obj))
+        elif klass is list or klass is tuple:
+            if self._table_threshold is not None \
+                    and len(obj) >= self._table_threshold:
+                table = self._to_table(obj)
+                if table is not None:
+                    return self._json_convert(table)
+            return [self._json_convert(v) for v in obj]
 
         # float
+        elif klass is float:
+            if self._float_precision is None:
+                return obj
+            return round(obj, self._float_precision)
+
+        # single object, or subclass of builtin types
+        dumper = self._get_dumper(klass)
+        if dumper is not None:
+            return dumper(self, obj)
+        elif isinstance(obj, dict):
+            return {k: self._json_convert(v) for k, v in obj.items()}
+        elif isinstance(obj, (list, tuple)):
+            return [self._json_convert(v) for v in obj]
         elif isinstance(obj, float):
-            return float(json.encoder.FLOAT_REPR(obj))
+            if self._float_precision is None:
+                return obj
+            return round(obj, self._float_precision)
+        return obj
 
-        # single object
-        try:
-            return self._dump(obj)
-        except TypeError:
-            return obj
+    def _to_table(self, records):
+        """Convert a list of dict that have the same keys in the same order
+        into the columnar table ``{"$superjson.table": {"keys": [...],
+        "columns": [[...], ...]}}``, the keys are stored only once.
+
+        :returns: the table, or ``None`` if ``records`` doesn't qualify.
+        """
+        if not records:
+            return None
+        first = records[0]
+        if type(first) is not dict or not first:
+            return None
+        keys = tuple(first)
+        for key in keys:
+            if type(key) is not str:
+                return None
+        # it would be taken as a tag
+        if len(keys) == 1 and keys[0].startswith("$"):
+            return None
+        for record in records:
+            if type(record) is not dict or tuple(record) != keys:
+                return None
+        columns = list(zip(*[record.values() for record in records]))
+        return {
+            "$" + table_class_name: {"keys": keys, "columns": columns},
+        }
 
     def _object_hook1(self, dct):
         """A function can convert dict data into object.
 
-        it's an O(1) implementation.
+        it's an O(1) implementation, the ``"$class_name"`` key is looked up
+        in a pre-built tag index.
         """
         # {"$class_name": obj_data}
         if len(dct) == 1:
-            for key, value in dct.items():
-                class_name = key[1:]
-                if class_name in self._loaders:
-                    return self._loaders[class_name](self, dct)
-            return dct
+            for key in dct:
+                loader = self._tagged_loaders.get(key)
+                if loader is not None:
+                    return loader(self, dct)
+                if self._auto_classes:
+                    loader = self._get_auto_loader(key)
+                    if loader is not None:
+                        return loader(self, dct)
         return dct
 
+    def _get_auto_loader(self, key):
+        """Find the loader of an automatically handled class by the
+        ``"$module.QualifiedName"`` key, the result is cached. Only the
+        listed classes and the classes dumped by this instance are loaded,
+        any other tag in the untrusted input is kept as it is.
+        """
+        try:
+            return self._auto_loaders[key]
+        except KeyError:
+            pass
+        klass = self._auto_class_names.get(key)
+        if klass is None:
+            return None
+        from .fields import compile_auto_fields
+
+        loader = compile_auto_fields(klass)[1]
+        self._auto_loaders[key] = loader
+        return loader
+
+    def _has_tags(self, s: str) -> bool:
+        """Fast pre-scan, test if the json string may contain any
+        ``"$class_name"`` tag that has a registered loader. If not, the
+        object hook can be skipped entirely.
+
+        ``s`` can also be utf-8 encoded bytes-like object, for example a
+        memory mapped file.
+        """
+        if self._auto_classes:
+            # any tag may be an automatically handled class
+            if isinstance(s, str):
+                return '"$' in s or "\\u0024" in s
+            return _bytes_tag_pattern.search(s) is not None \
+                or _bytes_escaped_dollar.search(s) is not None
+        if not isinstance(s, str):
+            loaders = self._loaders
+            for match in _bytes_tag_pattern.finditer(s):
+                if match.group(1).decode("utf-8", "replace") in loaders:
+                    return True
+            return _bytes_escaped_dollar.search(s) is not None
+        if '"$' not in s:
+            # the "$" could be escaped as \u0024
+            return "\\u0024" in s
+        loaders = self._loaders
+        for match in _tag_pattern.finditer(s):
+            if match.group(1) in loaders:
+                return True
+        return "\\u0024" in s
+
     def _object_hook2(self, dct):  # pragma: no cover
         """Another object hook implementation.
 
@@ -192,6 +723,102 @@ class BaseSuperJson(metaclass=Meta):
                 return loader(self, dct)
         return dct
 
+    def make_encoder(
+        self,
+        indent: bool = None,
+        sort_keys: bool = None,
+        pretty: bool = False,
+        float_precision: int = None,
+        ensure_ascii: bool = True,
+        compress=False,
+        compress_level: int = None,
+        stream: bool = False,
+        backend: str = None,
+        table_threshold: int = None,
+        datetime_epoch: str = None,
+        track_refs: bool = False,
+        **kwargs
+    ) -> Encoder:
+        """Create a reusable, thread safe :class:`~superjson.encoder.Encoder`.
+        The settings are resolved only once, it is good for encoding lots of
+        small messages.
+
+        Arguments are the same as :meth:`BaseSuperJson.dumps`.
+        """
+        return Encoder(
+            self,
+            indent=indent,
+            sort_keys=sort_keys,
+            pretty=pretty,
+            float_precision=float_precision,
+            ensure_ascii=ensure_ascii,
+            compress=compress,
+            compress_level=compress_level,
+            stream=stream,
+            backend=backend,
+            table_threshold=table_threshold,
+            datetime_epoch=datetime_epoch,
+            track_refs=track_refs,
+            **kwargs
+        )
+
+    def make_decoder(
+        self,
+        object_hook=None,
+        decompress=False,
+        ignore_comments: bool = False,
+        backend: str = None,
+        table_columns: bool = False,
+        intern_keys: bool = False,
+        intern_values: int = None,
+        **kwargs
+    ) -> Decoder:
+        """Create a reusable, thread safe :class:`~superjson.decoder.Decoder`.
+
+        Arguments are the same as :meth:`BaseSuperJson.loads`. The strings
+        interned by ``intern_keys`` / ``intern_values`` are shared by all the
+        documents loaded by the decoder.
+        """
+        return Decoder(
+            self,
+            object_hook=object_hook,
+            decompress=decompress,
+            ignore_comments=ignore_comments,
+            backend=backend,
+            table_columns=table_columns,
+            intern_keys=intern_keys,
+            intern_values=intern_values,
+            **kwargs
+        )
+
+    def iterdumps(
+        self,
+        obj,
+        indent: bool = None,
+        sort_keys: bool = None,
+        pretty: bool = False,
+        float_precision: int = None,
+        ensure_ascii: bool = True,
+        **kwargs
+    ):
+        """Encode any object into json string, and yield it chunk by chunk.
+
+        Registered dumpers are applied only when a value is reached, so the
+        intermediate copy of the whole object made by ``_json_convert``
+        is never created. ``"".join(iterdumps(obj))`` equals to ``dumps(obj)``.
+        It saves memory, it isn't faster, see :mod:`superjson.encoder`.
+
+        Arguments are the same as :meth:`BaseSuperJson.dumps`.
+        """
+        return self.make_encoder(
+            indent=indent,
+            sort_keys=sort_keys,
+            pretty=pretty,
+            float_precision=float_precision,
+            ensure_ascii=ensure_ascii,
+            **kwargs
+        ).iterdumps(obj)
+
     def dumps(
         self,
         obj,
@@ -200,7 +827,13 @@ class BaseSuperJson(metaclass=Meta):
         pretty: bool = False,
         float_precision: int = None,
         ensure_ascii: bool = True,
-        compress: bool = False,
+        compress=False,
+        compress_level: int = None,
+        stream: bool = False,
+        backend: str = None,
+        table_threshold: int = None,
+        datetime_epoch: str = None,
+        track_refs: bool = False,
         **kwargs
     ):
         """Dump any object into json string.
@@ -213,68 +846,172 @@ class BaseSuperJson(metaclass=Meta):
             N-decimal points.
         :type float_precision: int
 
-        :param compress: default ``False``. If True, then compress encoded string.
-        :type compress: bool
+        :param compress: default ``False``. If True, then compress encoded
+            string with zlib. It can also be a codec name or extension in
+            :mod:`superjson.compression`, for example ``"bz2"``, ``".xz"``.
+            The compressed bytes are base64 encoded.
+        :type compress: bool or str
+
+        :param compress_level: default ``None``, use the default level of the
+            codec.
+        :type compress_level: int
+
+        :param stream: default ``False``. If True, use the streaming encoder
+            (see :meth:`BaseSuperJson.iterdumps`), the intermediate converted
+            object is not created. The output is exactly the same. It saves
+            memory but isn't faster.
+        :type stream: bool
+
+        :param backend: default ``None``, use the backend of this instance.
+            Override the json backend for this call, see
+            :mod:`superjson.backends`.
+        :type backend: str
+
+        :param table_threshold: default ``None``. If set, a list (or tuple)
+            of at least ``table_threshold`` dicts that have the same str keys
+            in the same order is encoded as a columnar table
+            ``{"$superjson.table": {"keys": [...], "columns": [[...], ...]}}``,
+            the keys are stored only once. It's loaded back to the list of
+            dict.
+        :type table_threshold: int
+
+        :param datetime_epoch: default ``None``, dump ``datetime`` as ISO
+            8601 string. ``"ms"`` or ``"us"``, dump it as integer milli /
+            micro seconds since the epoch and the UTC offset, see
+            :mod:`superjson.datetimes`.
+        :type datetime_epoch: str
+
+        :param track_refs: default ``False``. If True, an object that occurs
+            more than once is dumped only once, the other occurrences are
+            ``{"$superjson.ref": n}`` references, reference cycles are
+            supported. The shared objects are restored by ``loads``, see
+            :mod:`superjson.refs`.
+        :type track_refs: bool
         """
-        if pretty:
-            indent = 4
-            sort_keys = True
-
-        if float_precision is None:
-            json.encoder.FLOAT_REPR = repr
-        else:
-            json.encoder.FLOAT_REPR = lambda x: format(
-                x, ".%sf" % float_precision)
-
-        s = json.dumps(
-            self._json_convert(obj),
+        return self.make_encoder(
             indent=indent,
             sort_keys=sort_keys,
+            pretty=pretty,
+            float_precision=float_precision,
             ensure_ascii=ensure_ascii,
+            compress=compress,
+            compress_level=compress_level,
+            stream=stream,
+            backend=backend,
+            table_threshold=table_threshold,
+            datetime_epoch=datetime_epoch,
+            track_refs=track_refs,
             **kwargs
-        )
-
-        if compress:
-            s = compresslib.compress(s, return_type="str")
-
-        return s
+        ).dumps(obj)
 
     def loads(
         self,
         s: str,
         object_hook: bool = None,
-        decompress: bool = False,
+        decompress=False,
         ignore_comments: bool = False,
+        backend: str = None,
+        table_columns: bool = False,
+        intern_keys: bool = False,
+        intern_values: int = None,
         **kwargs,
     ):
         """load object from json encoded string.
 
         :param decompress: default ``False``. If True, then decompress string.
-        :type decompress: bool
+            It can also be a codec name or extension, the same one used by
+            ``dumps(compress=...)``.
+        :type decompress: bool or str
 
         :param ignore_comments: default ``False``. If True, then ignore comments.
         :type ignore_comments: bool
-        """
-        if decompress:
-            s = compresslib.decompress(s, return_type="str")
 
-        if ignore_comments:
-            s = strip_comments(s)
+        :param backend: default ``None``, use the backend of this instance.
+            Override the json backend for this call, see
+            :mod:`superjson.backends`.
+        :type backend: str
 
-        if object_hook is None:
-            object_hook = self._object_hook1
+        :param table_columns: default ``False``. If True, the columnar table
+            (see ``dumps(table_threshold=...)``) is loaded as a
+            ``{key: column}`` dict instead of the list of dict.
+        :type table_columns: bool
 
-        if "object_pairs_hook" in kwargs:
-            del kwargs["object_pairs_hook"]
+        :param intern_keys: default ``False``. If True, the equal keys of the
+            json objects share one ``str`` object, it saves memory for a
+            large list of records. See :mod:`superjson.interning`.
+        :type intern_keys: bool
 
-        obj = json.loads(
-            s,
+        :param intern_values: default ``None``. If set, the equal string
+            values not longer than this share one ``str`` object as well.
+        :type intern_values: int
+
+        ``intern_memo_size`` (default 65536) limits the number of interned
+        strings.
+        """
+        return self.make_decoder(
             object_hook=object_hook,
-            object_pairs_hook=None,
+            decompress=decompress,
+            ignore_comments=ignore_comments,
+            backend=backend,
+            table_columns=table_columns,
+            intern_keys=intern_keys,
+            intern_values=intern_values,
             **kwargs
+        ).loads(s)
+
+    def dumpb(
+        self,
+        obj,
+        float_precision: int = None,
+        table_threshold: int = None,
+        datetime_epoch: str = None,
+        track_refs: bool = False,
+    ) -> bytes:
+        """Dump any object into the compact binary format, it is MessagePack
+        compatible. ``bytes`` is stored as it is, and every registered type is
+        stored as a MessagePack extension type. See :mod:`superjson.binary`.
+
+        :param float_precision: default ``None``, limit floats to
+            N-decimal points.
+        :type float_precision: int
+
+        :param table_threshold: see :meth:`BaseSuperJson.dumps`.
+        :type table_threshold: int
+
+        :param datetime_epoch: see :meth:`BaseSuperJson.dumps`.
+        :type datetime_epoch: str
+
+        :param track_refs: see :meth:`BaseSuperJson.dumps`.
+        :type track_refs: bool
+        """
+        if datetime_epoch is not None:
+            check_datetime_epoch(datetime_epoch)
+        superjson = self._configure(
+            _atomic_types=self._atomic_types | {bytes, memoryview},
+            _float_precision=float_precision,
+            _table_threshold=table_threshold,
+            _datetime_epoch=datetime_epoch,
+            _binary=True,
         )
+        from .binary import make_pack
 
-        return obj
+        if track_refs:
+            obj = RefTracker(superjson).track(obj)
+        return make_pack(superjson)(obj)
+
+    def loadb(self, b: bytes, object_hook=None):
+        """Load object from the binary data created by :meth:`dumpb`.
+
+        :param object_hook: default ``None``, use the object hook of this
+            instance, which restores the registered types.
+        """
+        from .binary import make_unpack
+
+        if object_hook is not None:
+            return make_unpack(self, object_hook)(b)
+        superjson = self._configure(_ref_table=RefTable())
+        obj = make_unpack(superjson)(b)
+        return superjson._ref_table.resolve(obj)
 
     def dump(
         self,
@@ -287,12 +1024,21 @@ class BaseSuperJson(metaclass=Meta):
         ensure_ascii: bool = True,
         overwrite: bool = False,
         verbose: bool = True,
+        stream: bool = False,
+        compress_level: int = None,
+        workers: int = None,
+        blob_threshold: int = None,
         **kwargs
     ):
         """Dump any object into file.
 
-        :param abspath: if ``*.json, *.js**`` then do regular dump. if ``*.gz``,
-          then perform compression.
+        :param abspath: if ``*.json, *.js**`` then do regular dump. if
+          ``*.gz``, ``*.bz2``, ``*.xz``, ``*.zst``, ``*.lz4``, then perform
+          compression, the file can be read by the standard tools. See
+          :mod:`superjson.compression`. if ``*.sjb`` (or ``*.sjb.gz``, ...),
+          then dump in the binary format (see :meth:`dumpb`), ``indent``,
+          ``sort_keys``, ``stream``, ``workers`` and other json options are
+          ignored, the uncompressed bytes is returned.
         :type abspath: str
 
         :param pretty: if True, dump json into pretty indent and sorted key
@@ -311,10 +1057,56 @@ class BaseSuperJson(metaclass=Meta):
 
         :param verbose: default True, help-message-display trigger.
         :type verbose: boolean
+
+        :param stream: default ``False``, if True, the json string is encoded
+          chunk by chunk and written to the file on the fly, the full string
+          is never created in memory, and ``None`` is returned.
+        :type stream: boolean
+
+        :param compress_level: default ``None``, use the default level of the
+          codec.
+        :type compress_level: int
+
+        :param workers: default ``None``, if greater than 1, the compressed
+          file is cut into blocks, and compressed by ``workers`` threads in
+          parallel. Use it with ``stream=True``, so that encoding, compression
+          and writing run at the same time.
+        :type workers: int
+
+        :param blob_threshold: default ``None``. If set, the ``bytes``,
+          ``bytearray``, ``memoryview`` values and the ``numpy.ndarray`` data
+          of at least ``blob_threshold`` bytes are written to a sidecar file
+          ``<abspath>.<token>.blob`` instead of base64 encoded in the json,
+          they are loaded back as memoryview of the memory mapped sidecar
+          file. The json file and the sidecar file are replaced together.
+          See :mod:`superjson.blobs`. Not supported by json lines and binary
+          file, ``stream`` and ``workers`` are ignored.
+        :type blob_threshold: int
         """
+        if blob_threshold is not None \
+                and (is_json_lines_file(abspath) or is_binary_file(abspath)):
+            raise ValueError(
+                "blob_threshold is not supported by '%s', only json file" %
+                abspath
+            )
+
+        if is_json_lines_file(abspath):
+            return self.dump_lines(
+                obj,
+                abspath,
+                sort_keys=sort_keys,
+                float_precision=float_precision,
+                ensure_ascii=ensure_ascii,
+                overwrite=overwrite,
+                verbose=verbose,
+                compress_level=compress_level,
+                workers=workers,
+                **kwargs
+            )
+
         prt_console("\nDump to '%s' ..." % abspath, verbose)
 
-        is_compressed = is_compressed_json_file(abspath)
+        codec = get_file_codec(abspath)
 
         if not overwrite:
             if os.path.exists(abspath):  # pragma: no cover
@@ -326,6 +1118,67 @@ class BaseSuperJson(metaclass=Meta):
 
         st = time.process_time()
 
+        if blob_threshold is not None:
+            s = self._dump_with_blobs(
+                obj,
+                abspath,
+                codec,
+                compress_level,
+                blob_threshold,
+                dict(
+                    indent=indent,
+                    sort_keys=sort_keys,
+                    pretty=pretty,
+                    float_precision=float_precision,
+                    ensure_ascii=ensure_ascii,
+                    **kwargs
+                ),
+            )
+            prt_console(
+                "    Complete! Elapse %.6f sec." % (time.process_time() - st),
+                verbose,
+            )
+            return s
+
+        if is_binary_file(abspath):
+            b = self.dumpb(
+                obj,
+                float_precision=float_precision,
+                table_threshold=kwargs.get("table_threshold"),
+                datetime_epoch=kwargs.get("datetime_epoch"),
+                track_refs=kwargs.get("track_refs", False),
+            )
+            with atomic_write(abspath, mode="wb", overwrite=True) as f:
+                if codec is not None:
+                    f.write(codec.compress(b, compress_level))
+                else:
+                    f.write(b)
+            prt_console(
+                "    Complete! Elapse %.6f sec." % (time.process_time() - st),
+                verbose,
+            )
+            return b
+
+        if stream:
+            chunks = self.iterdumps(
+                obj,
+                indent=indent,
+                sort_keys=sort_keys,
+                pretty=pretty,
+                float_precision=float_precision,
+                ensure_ascii=ensure_ascii,
+                **kwargs,
+            )
+            with atomic_write(abspath, mode="wb", overwrite=True) as f:
+                write_chunks(f, chunks, codec, compress_level, workers=workers)
+            # the previous dump may be written with ``blob_threshold``
+            remove_sidecars(abspath)
+            prt_console(
+                "    Complete! Elapse %.6f sec." % (time.process_time() - st),
+                verbose,
+            )
+            return
+
         s = self.dumps(
             obj,
             indent=indent,
@@ -338,10 +1191,12 @@ class BaseSuperJson(metaclass=Meta):
         )
 
         with atomic_write(abspath, mode="wb", overwrite=True) as f:
-            if is_compressed:
-                f.write(compresslib.compress(s, return_type="bytes"))
+            if codec is not None:
+                write_chunks(f, [s], codec, compress_level, workers=workers)
             else:
                 f.write(s.encode("utf-8"))
+        # the previous dump may be written with ``blob_threshold``
+        remove_sidecars(abspath)
 
         prt_console(
             "    Complete! Elapse %.6f sec." % (time.process_time() - st),
@@ -349,18 +1204,49 @@ class BaseSuperJson(metaclass=Meta):
         )
         return s
 
+    def _dump_with_blobs(
+        self,
+        obj,
+        abspath,
+        codec,
+        compress_level,
+        blob_threshold,
+        kwargs,
+    ) -> str:
+        """Write the large binary values to a new sidecar file, then replace
+        the json file, then remove the old sidecar files. See
+        :mod:`superjson.blobs`.
+        """
+        writer = BlobWriter(abspath, blob_threshold)
+        try:
+            s = self._configure(_blob_writer=writer).dumps(obj, **kwargs)
+            b = s.encode("utf-8")
+            if codec is not None:
+                b = codec.compress(b, compress_level)
+            has_blobs = writer.commit()
+            with atomic_write(abspath, mode="wb", overwrite=True) as f:
+                f.write(b)
+        except BaseException:
+            writer.discard()
+            raise
+        remove_sidecars(abspath, keep=writer.path if has_blobs else None)
+        return s
+
     def load(
         self,
         abspath: str,
         object_hook=None,
         ignore_comments: bool = False,
         verbose: bool = True,
+        blob_copy: bool = False,
         **kwargs
     ):
         """load object from json file.
 
         :param abspath: if ``*.json, *.js** then do regular dump. if ``*.gz``,
-          then perform decompression.
+          ``*.bz2``, ``*.xz``, ``*.zst``, ``*.lz4``, then perform
+          decompression. if ``*.sjb`` (or ``*.sjb.gz``, ...), then load the
+          binary format (see :meth:`loadb`).
         :type abspath: str
 
         :param ignore_comments: default ``False. If True, then ignore comments.
@@ -368,42 +1254,645 @@ class BaseSuperJson(metaclass=Meta):
 
         :param verbose: default True, help-message-display trigger.
         :type verbose: boolean
+
+        :param blob_copy: default ``False``, the values in the sidecar blob
+          file (see ``dump(blob_threshold=...)``) are loaded as memoryview of
+          the memory mapped file. If True, they are copied to ``bytes``.
+        :type blob_copy: boolean
         """
+        if is_json_lines_file(abspath):
+            return list(self.load_lines(
+                abspath,
+                object_hook=object_hook,
+                ignore_comments=ignore_comments,
+                **kwargs
+            ))
+
         prt_console("\nLoad from '%s' ..." % abspath, verbose)
 
-        is_compressed = is_compressed_json_file(abspath)
+        codec = get_file_codec(abspath)
 
         if not os.path.exists(abspath):
             raise EnvironmentError("'%s' doesn't exist." % abspath)
 
         st = time.process_time()
 
-        with open(abspath, "rb") as f:
-            if is_compressed:
-                s = compresslib.decompress(f.read(), return_type="str")
-            else:
-                s = f.read().decode("utf-8")
+        if is_binary_file(abspath):
+            with map_file(abspath) as mm:
+                if codec is not None:
+                    obj = self.loadb(codec.decompress(mm), object_hook)
+                else:
+                    obj = self.loadb(mm, object_hook)
+            prt_console(
+                "    Complete! Elapse %.6f sec." % (time.process_time() - st),
+                verbose,
+            )
+            return obj
 
-        obj = self.loads(
-            s,
+        # resolves the references to the sidecar blob file
+        superjson = self._configure(_blob_reader=BlobReader(
+            os.path.dirname(abspath), copy=blob_copy,
+        ))
+        decoder = superjson.make_decoder(
             object_hook=object_hook,
             decompress=False,
-            ignore_comments=ignore_comments,
-            **kwargs,
+            ignore_comments=False,
+            **kwargs
         )
+        if ignore_comments:
+            # strip comments while reading, the raw string is not created
+            s = "".join(iter_strip_comments(iter_text_chunks(abspath, codec)))
+            obj = decoder.loads(s)
+        elif codec is not None:
+            with map_file(abspath) as mm:
+                s = codec.decompress(mm).decode("utf-8")
+            obj = decoder.loads(s)
+        else:
+            # parse from the memory mapped file, the bytes copy of the
+            # file is not created
+            with map_file(abspath) as mm:
+                obj = decoder.loads_buffer(mm)
 
         prt_console("    Complete! Elapse %.6f sec." % (time.process_time() - st),
                     verbose)
 
         return obj
 
+    def iter_load(
+        self,
+        abspath: str,
+        object_hook=None,
+        ignore_comments: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs
+    ):
+        """Iterate the elements of a top level json array in a file, the
+        registered loaders are applied to each element.
+
+        The file is read chunk by chunk, only the current chunk and one
+        element are held in memory, so it works with huge files.
+
+        :param abspath: if ``*.json, *.js**`` then read it directly. if
+          compressed (``*.gz``, ``*.xz``, ...), then decompress it on the fly.
+        :type abspath: str
+
+        :param ignore_comments: default ``False``. If True, then ignore
+          comments, they are stripped chunk by chunk.
+        :type ignore_comments: bool
+
+        :param chunk_size: number of bytes to read from the file at a time.
+        :type chunk_size: int
+        """
+        codec = get_file_codec(abspath)
+
+        if not os.path.exists(abspath):
+            raise EnvironmentError("'%s' doesn't exist." % abspath)
+
+        decoder = self.make_decoder(
+            object_hook=object_hook,
+            ignore_comments=ignore_comments,
+            **kwargs
+        )
+        return decoder.iterloads(
+            iter_text_chunks(abspath, codec, chunk_size)
+        )
+
+    def dump_lines(
+        self,
+        iterable,
+        abspath: str,
+        sort_keys: bool = None,
+        float_precision: int = None,
+        ensure_ascii: bool = True,
+        overwrite: bool = False,
+        verbose: bool = True,
+        compress_level: int = None,
+        workers: int = None,
+        **kwargs
+    ):
+        """Dump objects into a json lines file, one json per line.
+
+        Records are encoded and written as they are produced by ``iterable``,
+        a single encoder is reused for all of them. The write is atomic.
+
+        :param abspath: if ``*.jsonl``, ``*.ndjson`` then do regular dump. if
+          ``*.jsonl.gz``, ``*.ndjson.gz`` (or any other compression
+          extension), then perform compression.
+        :type abspath: str
+
+        :param overwrite: default ``False``, If ``True``, when you dump to
+          existing file, it silently overwrite it.
+        :type overwrite: boolean
+
+        :param verbose: default True, help-message-display trigger.
+        :type verbose: boolean
+
+        :param compress_level: default ``None``, use the default level of the
+          codec.
+        :type compress_level: int
+
+        :param workers: default ``None``, if greater than 1, compress the file
+          with ``workers`` threads in parallel.
+        :type workers: int
+
+        :returns: number of records written, or None if the file exists and
+          overwrite is not allowed.
+        """
+        prt_console("\nDump to '%s' ..." % abspath, verbose)
+
+        codec = get_file_codec(abspath)
+
+        if not overwrite:
+            if os.path.exists(abspath):  # pragma: no cover
+                prt_console(
+                    "    Stop! File exists and overwrite is not allowed",
+                    verbose,
+                )
+                return
+
+        st = time.process_time()
+
+        encoder = self.make_encoder(
+            sort_keys=sort_keys,
+            float_precision=float_precision,
+            ensure_ascii=ensure_ascii,
+            **kwargs
+        )
+        counter = [0]
+
+        def iter_lines_to_write():
+            dumps = encoder.dumps
+            for record in iterable:
+                counter[0] += 1
+                yield dumps(record)
+                yield "\n"
+
+        with atomic_write(abspath, mode="wb", overwrite=True) as f:
+            write_chunks(
+                f, iter_lines_to_write(), codec, compress_level,
+                workers=workers,
+            )
+
+        prt_console(
+            "    Complete! Elapse %.6f sec." % (time.process_time() - st),
+            verbose,
+        )
+        return counter[0]
+
+    def load_lines(
+        self,
+        abspath: str,
+        object_hook=None,
+        ignore_comments: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs
+    ):
+        """Iterate the records in a json lines file, the registered loaders
+        are applied to each record. Blank lines are skipped.
+
+        The file is read chunk by chunk, a single decoder is reused, and
+        records are decoded one at a time.
+
+        :param abspath: if ``*.jsonl``, ``*.ndjson`` then read it directly. if
+          ``*.jsonl.gz``, ``*.ndjson.gz`` (or any other compression
+          extension), then decompress it on the fly.
+        :type abspath: str
+
+        :param ignore_comments: default ``False``. If True, then ignore
+          comments, a block comment can span multiple lines.
+        :type ignore_comments: bool
+
+        :param chunk_size: number of bytes to read from the file at a time.
+        :type chunk_size: int
+        """
+        codec = get_file_codec(abspath)
+
+        if not os.path.exists(abspath):
+            raise EnvironmentError("'%s' doesn't exist." % abspath)
+
+        decoder = self.make_decoder(object_hook=object_hook, **kwargs)
+
+        def iter_records():
+            loads = decoder.loads
+            chunks = iter_text_chunks(abspath, codec, chunk_size)
+            if ignore_comments:
+                chunks = iter_strip_comments(chunks)
+            for line in iter_lines(chunks):
+                if line.strip():
+                    yield loads(line)
+
+        return iter_records()
+
+    def dump_many(
+        self,
+        objects: dict,
+        overwrite: bool = False,
+        workers: int = None,
+        verbose: bool = False,
+        **kwargs
+    ):
+        """Dump many objects into files concurrently on a thread pool, file
+        I/O and fsync of different files overlap. Each file is written
+        atomically, same as :meth:`BaseSuperJson.dump`.
+
+        :param objects: ``{abspath: obj}``.
+        :type objects: dict
+
+        :param overwrite: default ``False``, if ``False``, dumping to an
+          existing file is an error.
+        :type overwrite: boolean
+
+        :param workers: number of threads, default ``None`` uses the default
+          of :class:`concurrent.futures.ThreadPoolExecutor`.
+        :type workers: int
+
+        Other arguments are the same as :meth:`BaseSuperJson.dump`.
+
+        :returns: ``(results, errors)``, ``{abspath: file size in bytes}``
+          for succeeded files, ``{abspath: exception}`` for failed files.
+          The encoded data is not kept.
+        """
+
+        def dump(abspath, obj):
+            if not overwrite and os.path.exists(abspath):
+                raise FileExistsError("'%s' already exists." % abspath)
+            self.dump(obj, abspath, overwrite=True, verbose=verbose, **kwargs)
+            return os.path.getsize(abspath)
+
+        return _run_many(dump, objects.items(), workers)
+
+    def load_many(
+        self,
+        abspaths,
+        workers: int = None,
+        verbose: bool = False,
+        **kwargs
+    ):
+        """Load many json files concurrently on a thread pool.
+
+        :param abspaths: iterable of file path.
+
+        :param workers: number of threads, default ``None`` uses the default
+          of :class:`concurrent.futures.ThreadPoolExecutor`.
+        :type workers: int
+
+        Other arguments are the same as :meth:`BaseSuperJson.load`.
+
+        :returns: ``(results, errors)``, ``{abspath: obj}`` for succeeded
+          files, ``{abspath: exception}`` for failed files.
+        """
+
+        def load(abspath, _):
+            return self.load(abspath, verbose=verbose, **kwargs)
+
+        return _run_many(
+            load, ((abspath, None) for abspath in abspaths), workers,
+        )
+
+    def _get_process_pool(self, workers: int = None):
+        """Get the persistent process pool, it is created at the first call,
+        and re-created if ``workers`` is changed.
+
+        :rtype: :class:`~concurrent.futures.ProcessPoolExecutor`
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if self._process_pool is not None:
+            if self._process_pool_workers == workers:
+                return self._process_pool
+            self.close_process_pool()
+        if sys.version_info >= (3, 7):
+            self._process_pool = ProcessPoolExecutor(
+                workers,
+                mp_context=_get_mp_context(),
+                initializer=_init_process_worker,
+                initargs=(self,),
+            )
+        else:  # pragma: no cover
+            self._process_pool = _start_process_pool(self, workers)
+        self._process_pool_workers = workers
+        return self._process_pool
+
+    def close_process_pool(self):
+        """Shutdown the process pool used by :meth:`BaseSuperJson.dumps_parallel`
+        and :meth:`BaseSuperJson.loads_parallel`. Call it after registering
+        new dumper / loader, so the workers are re-created with them.
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+            self._process_pool_workers = None
+
+    def _iter_parallel(self, func, items, kwargs, workers, ordered, chunk_size):
+        pool = self._get_process_pool(workers)
+        max_in_flight = 2 * self._process_pool_workers
+        items = iter(items)
+
+        def iter_chunks():
+            start = 0
+            while True:
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    return
+                yield start, chunk
+                start += len(chunk)
+
+        if ordered:
+            pending = deque()
+            try:
+                for _, chunk in iter_chunks():
+                    pending.append(pool.submit(func, chunk, kwargs))
+                    if len(pending) >= max_in_flight:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+        else:
+            from concurrent.futures import wait, FIRST_COMPLETED
+
+            pending = dict()  # future -> index of the first item in chunk
+
+            def iter_done(return_when):
+                done, _ = wait(pending, return_when=return_when)
+                for future in done:
+                    start = pending.pop(future)
+                    yield from enumerate(future.result(), start)
+
+            try:
+                for start, chunk in iter_chunks():
+                    pending[pool.submit(func, chunk, kwargs)] = start
+                    if len(pending) >= max_in_flight:
+                        yield from iter_done(FIRST_COMPLETED)
+                while pending:
+                    yield from iter_done(FIRST_COMPLETED)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def dumps_parallel(
+        self,
+        objs,
+        workers: int = None,
+        ordered: bool = True,
+        chunk_size: int = 1000,
+        **kwargs
+    ):
+        """Encode many objects on a persistent process pool, it is not bound
+        by the GIL. The workers use the registered dumpers of this instance.
+
+        Objects are sent to the workers in chunks to amortize the IPC cost,
+        at most ``2 * workers`` chunks are in flight, so ``objs`` can be a
+        huge iterator.
+
+        :param objs: iterable of objects.
+
+        :param workers: number of processes, default ``None`` uses the cpu
+          count. The pool is kept for the next call, see
+          :meth:`BaseSuperJson.close_process_pool`.
+        :type workers: int
+
+        :param ordered: default ``True``, yield the json strings in the same
+          order as ``objs``. If ``False``, yield ``(index, json string)`` as
+          soon as a chunk is done.
+        :type ordered: bool
+
+        :param chunk_size: number of objects sent to a worker at a time.
+        :type chunk_size: int
+
+        Other arguments are the same as :meth:`BaseSuperJson.dumps`, they
+        must be picklable.
+
+        :returns: an iterator of json string, or ``(index, json string)``.
+        """
+        return self._iter_parallel(
+            _dumps_chunk, objs, kwargs, workers, ordered, chunk_size,
+        )
+
+    def loads_parallel(
+        self,
+        strings,
+        workers: int = None,
+        ordered: bool = True,
+        chunk_size: int = 1000,
+        **kwargs
+    ):
+        """Decode many json strings on a persistent process pool. The workers
+        use the registered loaders of this instance.
+
+        Arguments are the same as :meth:`BaseSuperJson.dumps_parallel`, and
+        :meth:`BaseSuperJson.loads`.
+
+        :returns: an iterator of object, or ``(index, object)``.
+        """
+        return self._iter_parallel(
+            _loads_chunk, strings, kwargs, workers, ordered, chunk_size,
+        )
+
+    # ----------------------------------------------------------------------
+    # asyncio API
+    # ----------------------------------------------------------------------
+    async def adumps(self, obj, executor=None, **kwargs):
+        """Coroutine version of :meth:`BaseSuperJson.dumps`, the encoding
+        runs in ``executor``, the event loop is not blocked.
+
+        :param executor: default ``None``, the default executor of the event
+            loop. A :class:`~concurrent.futures.ProcessPoolExecutor` can be
+            used to run the encoding in parallel with the GIL released.
+        """
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            executor, partial(self.dumps, obj, **kwargs),
+        )
+
+    async def aloads(self, s, executor=None, **kwargs):
+        """Coroutine version of :meth:`BaseSuperJson.loads`, the decoding
+        runs in ``executor``. See :meth:`BaseSuperJson.adumps`.
+        """
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            executor, partial(self.loads, s, **kwargs),
+        )
+
+    def _encode_file(self, obj, abspath, compress_level, kwargs) -> bytes:
+        """Encode (and compress) the content of the file, used by
+        :meth:`BaseSuperJson.adump`.
+        """
+        if is_binary_file(abspath):
+            b = self.dumpb(
+                obj,
+                float_precision=kwargs.get("float_precision"),
+                table_threshold=kwargs.get("table_threshold"),
+                datetime_epoch=kwargs.get("datetime_epoch"),
+                track_refs=kwargs.get("track_refs", False),
+            )
+        elif is_json_lines_file(abspath):
+            dumps = self.make_encoder(**kwargs).dumps
+            b = "".join([dumps(record) + "\n" for record in obj]).encode("utf-8")
+        else:
+            b = self.dumps(obj, **kwargs).encode("utf-8")
+        codec = get_file_codec(abspath)
+        if codec is not None:
+            b = codec.compress(b, compress_level)
+        return b
+
+    async def adump(
+        self,
+        obj,
+        abspath: str,
+        overwrite: bool = False,
+        compress_level: int = None,
+        executor=None,
+        **kwargs
+    ):
+        """Coroutine version of :meth:`BaseSuperJson.dump`, nothing is printed.
+
+        Encoding and compression run in ``executor`` (see
+        :meth:`BaseSuperJson.adumps`), then the file is written atomically
+        by the default executor of the event loop.
+
+        If the task is cancelled, the atomic write is stopped, and it waits
+        until the temp file is removed. The file is either untouched, or
+        completely written if the cancellation comes too late.
+
+        :param kwargs: the json options, the same as
+            :meth:`BaseSuperJson.dump`, ``stream`` and ``workers`` are not
+            supported.
+
+        :returns: ``True`` if the file is written, ``False`` if the file
+            exists and overwrite is not allowed.
+        """
+        get_file_codec(abspath)  # raise early if not a valid file
+        if not overwrite and os.path.exists(abspath):
+            return False
+
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        data = await loop.run_in_executor(
+            executor,
+            partial(self._encode_file, obj, abspath, compress_level, kwargs),
+        )
+
+        cancel_event = threading.Event()
+        future = loop.run_in_executor(
+            None, _write_atomic, abspath, data, cancel_event,
+        )
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            try:
+                await future
+            except _WriteCancelled:
+                pass
+            raise
+        return True
+
+    async def aload(self, abspath: str, executor=None, **kwargs):
+        """Coroutine version of :meth:`BaseSuperJson.load`, nothing is
+        printed. Reading, decompression and decoding run in ``executor``, see
+        :meth:`BaseSuperJson.adumps`.
+        """
+        kwargs["verbose"] = False
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            executor, partial(self.load, abspath, **kwargs),
+        )
+
+    async def aiter_load(
+        self,
+        abspath: str,
+        batch_size: int = 1000,
+        executor=None,
+        **kwargs
+    ):
+        """Async iterator version of :meth:`BaseSuperJson.iter_load`, or
+        :meth:`BaseSuperJson.load_lines` for json lines file. Example::
+
+            async for record in json.aiter_load("data.jsonl.gz"):
+                ...
+
+        :param batch_size: number of elements read and decoded in the
+            executor at a time.
+        :type batch_size: int
+
+        :param executor: default ``None``, the default executor of the event
+            loop. It has to be a thread pool, the elements are read from the
+            same file iterator.
+        """
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        if is_json_lines_file(abspath):
+            iterator = await loop.run_in_executor(
+                executor, partial(self.load_lines, abspath, **kwargs),
+            )
+        else:
+            iterator = await loop.run_in_executor(
+                executor, partial(self.iter_load, abspath, **kwargs),
+            )
+
+        future = None
+        try:
+            while True:
+                future = loop.run_in_executor(
+                    executor, _next_batch, iterator, batch_size,
+                )
+                batch = await future
+                if not batch:
+                    break
+                for element in batch:
+                    yield element
+        finally:
+            # the file iterator can't be closed while a batch is being read
+            if future is not None and not future.done():
+                future.add_done_callback(lambda _: iterator.close())
+            else:
+                iterator.close()
+
     # ----------------------------------------------------------------------
     # Support built in data type
     # ----------------------------------------------------------------------
+    def _dump_blob(self, data):
+        """Write a large bytes-like object to the sidecar blob file, if
+        ``dump(blob_threshold=...)`` is used, see :mod:`superjson.blobs`.
+
+        :returns: the blob reference, or ``None`` if it is not written.
+        """
+        writer = self._blob_writer
+        if writer is not None and len(data) >= writer.threshold:
+            return {"$" + BLOB_CLASS_NAME: writer.write(data)}
+        return None
+
+    def load_superjson_blob(self, dct, class_name=BLOB_CLASS_NAME):
+        """
+        Sidecar blob reference loader, returns memoryview of the memory
+        mapped sidecar file.
+        """
+        if self._blob_reader is None:
+            raise ValueError(
+                "sidecar blob reference can only be loaded by `load` from "
+                "the json file"
+            )
+        return self._blob_reader.read(dct["$" + class_name])
+
     def dump_bytes(self, obj, class_name=bytes_class_name):
         """
         ``btyes`` dumper.
         """
+        ref = self._dump_blob(obj)
+        if ref is not None:
+            return ref
         return {"$" + class_name: b64encode(obj).decode()}
 
     def load_bytes(self, dct, class_name=bytes_class_name):
@@ -412,23 +1901,56 @@ class BaseSuperJson(metaclass=Meta):
         """
         return b64decode(dct["$" + class_name].encode())
 
+    def dump_bytearray(self, obj, class_name="builtins.bytearray"):
+        """
+        ``bytearray`` dumper.
+        """
+        ref = self._dump_blob(obj)
+        if ref is not None:
+            # the loaded memoryview is copied back into a bytearray
+            return {"$" + class_name: ref}
+        if self._binary:
+            return {"$" + class_name: memoryview(obj)}
+        return {"$" + class_name: b64encode(obj).decode()}
+
+    def load_bytearray(self, dct, class_name="builtins.bytearray"):
+        """
+        ``bytearray`` loader.
+        """
+        data = dct["$" + class_name]
+        if isinstance(data, str):
+            data = b64decode(data.encode())
+        return bytearray(data)
+
+    def dump_memoryview(self, obj, class_name="builtins.memoryview"):
+        """
+        ``memoryview`` dumper, it is dumped as ``bytes``.
+        """
+        if not obj.c_contiguous:
+            obj = memoryview(obj.tobytes())
+        elif obj.ndim != 1 or obj.format != "B":
+            obj = obj.cast("B")
+        return self.dump_bytes(obj)
+
     def dump_datetime(self, obj, class_name="datetime.datetime"):
         """
-        ``datetime.datetime`` dumper.
+        ``datetime.datetime`` dumper, ISO 8601 string, or
+        ``[epoch, unit, utc_offset]`` if ``datetime_epoch`` is used.
         """
+        if self._datetime_epoch is not None:
+            return {
+                "$" + class_name: datetime_to_epoch(obj, self._datetime_epoch),
+            }
         return {"$" + class_name: obj.isoformat()}
 
     def load_datetime(self, dct, class_name="datetime.datetime"):
         """
         ``datetime.datetime`` loader.
         """
-        try:
-            from dateutil.parser import parse
-        except ImportError:  # pragma: no cover
-            msg = ("You need to install `python-dateutil` to support load/dump for datetime type")
-            logger.info(msg)
-            raise
-        return parse(dct["$" + class_name])
+        value = dct["$" + class_name]
+        if type(value) is str:
+            return parse_datetime(value)
+        return epoch_to_datetime(*value)
 
     def dump_date(self, obj, class_name="datetime.date"):
         """
@@ -440,7 +1962,7 @@ class BaseSuperJson(metaclass=Meta):
         """
         ``datetime.date`` loader.
         """
-        return datetime.strptime(dct["$" + class_name], "%Y-%m-%d").date()
+        return parse_date(dct["$" + class_name])
 
     def dump_set(self, obj, class_name=set_class_name):
         """
@@ -482,6 +2004,157 @@ class BaseSuperJson(metaclass=Meta):
         """
         return OrderedDict(dct["$" + class_name])
 
+    def load_superjson_table(self, dct, class_name=table_class_name):
+        """
+        Columnar table loader, see ``dumps(table_threshold=...)``. Returns the
+        list of records, or ``{key: column}`` dict if ``table_columns=True``
+        is used in ``loads``.
+        """
+        table = dct["$" + class_name]
+        keys = table["keys"]
+        if self._table_columns:
+            return dict(zip(keys, table["columns"]))
+        return [dict(zip(keys, row)) for row in zip(*table["columns"])]
+
+    def load_superjson_def(self, dct, class_name=DEF_CLASS_NAME):
+        """
+        Loader of the first occurrence of a shared object, see
+        ``dumps(track_refs=True)``.
+        """
+        if self._ref_table is None:
+            raise ValueError("shared reference is not supported here")
+        number, obj = dct["$" + class_name]
+        return self._ref_table.define(number, obj)
+
+    def load_superjson_ref(self, dct, class_name=REF_CLASS_NAME):
+        """
+        Loader of the reference to a shared object, see
+        ``dumps(track_refs=True)``.
+        """
+        if self._ref_table is None:
+            raise ValueError("shared reference is not supported here")
+        return self._ref_table.get(dct["$" + class_name])
+
+    # ----------------------------------------------------------------------
+    # Support numpy, numpy is only imported when loading
+    # ----------------------------------------------------------------------
+    def _dump_buffer(self, arr):
+        """The raw memory of a C-contiguous array, base64 encoded, or as it
+        is in binary mode, or the reference to the sidecar blob file.
+        """
+        buffer = memoryview(arr.reshape(-1).view("u1"))
+        if self._binary:
+            return buffer
+        ref = self._dump_blob(buffer)
+        if ref is not None:
+            return ref
+        return b64encode(buffer).decode()
+
+    def dump_numpy_ndarray(self, obj, class_name="numpy.ndarray"):
+        """
+        ``numpy.ndarray`` dumper. The raw memory of the array is dumped as it
+        is, with dtype (including the byte order), shape and memory order.
+        Array of ``object`` dtype is dumped as a list of elements.
+        """
+        dtype = obj.dtype
+        if dtype.hasobject:
+            return {
+                "$" + class_name: {
+                    "dtype": "|O",
+                    "shape": list(obj.shape),
+                    "order": "C",
+                    "data": [self._json_convert(item) for item in obj.flat],
+                }
+            }
+
+        if obj.flags.c_contiguous:
+            order = "C"
+        elif obj.flags.f_contiguous:
+            # the transpose of a F-contiguous array is C-contiguous, and
+            # has the same memory
+            order = "F"
+        else:
+            order = "C"
+            obj = obj.copy()
+        return {
+            "$" + class_name: {
+                "dtype": dtype.str if dtype.fields is None else dtype.descr,
+                "shape": list(obj.shape),
+                "order": order,
+                "data": self._dump_buffer(obj.T if order == "F" else obj),
+            }
+        }
+
+    def load_numpy_ndarray(self, dct, class_name="numpy.ndarray"):
+        """
+        ``numpy.ndarray`` loader. The array is created on the decoded buffer
+        by ``numpy.frombuffer`` without copy, it is read only.
+        """
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover
+            msg = "You need to install `numpy` to load numpy.ndarray"
+            get_logger().info(msg)
+            raise
+        value = dct["$" + class_name]
+        shape = tuple(value["shape"])
+        if value["dtype"] == "|O":
+            arr = np.empty(len(value["data"]), dtype=object)
+            for index, item in enumerate(value["data"]):
+                arr[index] = item
+            return arr.reshape(shape)
+        data = value["data"]
+        if isinstance(data, str):
+            data = b64decode(data.encode())
+        arr = np.frombuffer(data, dtype=_to_numpy_dtype(value["dtype"]))
+        return arr.reshape(shape, order=value["order"])
+
+    def dump_numpy_generic(self, obj, class_name="numpy.generic"):
+        """
+        numpy scalar dumper, for example ``numpy.float64``, ``numpy.int32``.
+        The subclasses of the python types (``numpy.float64`` is a
+        ``float``, ``numpy.str_`` is a ``str``) are dumped as plain json
+        values, the same as the python ones.
+        """
+        if isinstance(obj, (float, int, bool, str)):
+            return self._json_convert(obj.item())
+        return {
+            "$" + class_name: {
+                "dtype": obj.dtype.str,
+                "data": self._dump_buffer(obj.reshape(1)),
+            }
+        }
+
+    def load_numpy_generic(self, dct, class_name="numpy.generic"):
+        """
+        numpy scalar loader.
+        """
+        value = dct["$" + class_name]
+        arr = self.load_numpy_ndarray({
+            "$numpy.ndarray": {
+                "dtype": value["dtype"],
+                "shape": [1],
+                "order": "C",
+                "data": value["data"],
+            },
+        })
+        return arr[0]
+
+
+def _to_numpy_dtype(descr):
+    """Convert the json decoded ``dtype.str`` or ``dtype.descr`` back to a
+    form ``numpy.dtype`` accepts, the tuples became lists in json.
+    """
+    if isinstance(descr, str):
+        return descr
+    fields = list()
+    for field in descr:
+        field = [field[0], _to_numpy_dtype(field[1])] + [
+            tuple(item) for item in field[2:]
+        ]
+        fields.append(tuple(field))
+    return fields
+
 
 class SuperJson(BaseSuperJson): pass
 
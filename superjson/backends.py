@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pluggable json backend for the final encode / parse step.
+
+superjson converts objects with the registered dumpers, and restores them
+with the registered loaders, the backend only turns builtin types into json
+string and back. Available backends:
+
+- ``"stdlib"``: the :mod:`json` module, it is the default.
+- ``"orjson"``: requires the ``orjson`` package.
+- ``"rapidjson"``: requires the ``python-rapidjson`` package.
+- ``"ujson"``: requires the ``ujson`` package.
+- ``"auto"``: the fastest installed one, in above order from the bottom.
+
+Example::
+
+    >>> from superjson import SuperJson
+    >>> json = SuperJson(backend="auto")
+    >>> json.dumps([1, 2], backend="stdlib")  # explicit override per call
+    '[1, 2]'
+
+If a backend can't express an option (``separators``, ``cls``,
+``parse_float``, indent other than 2 for orjson, ...), or it fails on a value
+(for example, integer out of 64 bits range), the stdlib is used for that call.
+The output may be different in whitespace, but it is always decoded to the
+same object.
+
+.. note::
+
+    orjson encodes ``NaN`` and ``Infinity`` as ``null``, and serializes
+    ``uuid.UUID``, ``enum.Enum`` and dataclasses by itself. If the object has
+    any non-finite float, the stdlib is used for that call. Dataclasses go
+    through the dumpers, and if the object has any ``uuid.UUID`` or
+    ``enum.Enum``, it's converted in python first, so they are dumped by the
+    registered dumper, or raise :class:`TypeError` without one, the same as
+    the stdlib.
+"""
+
+import re
+import sys
+import math
+import importlib
+from functools import partial
+from collections import OrderedDict
+
+# module name -> module, or None if it is not installed
+_optional_modules = dict()
+
+
+def import_optional(name: str):
+    """
+    Import an optional json library at the first use, so ``import superjson``
+    doesn't pay for the libraries that are never used.
+
+    :returns: the module, or ``None`` if it is not installed.
+    """
+    try:
+        return _optional_modules[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:  # pragma: no cover
+        module = None
+    _optional_modules[name] = module
+    return module
+
+
+_non_ascii = re.compile(r"[^\x00-\x7f]")
+
+_atomic_types = frozenset((str, int, bool, type(None)))
+
+# an integer literal that may be out of the 64 bits range
+_long_digits = re.compile(r"[0-9]{19}")
+_bytes_long_digits = re.compile(rb"[0-9]{19}")
+
+
+def _escape_non_ascii_char(match):
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return "\\u%04x" % code
+    code -= 0x10000
+    return "\\u%04x\\u%04x" % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+
+def escape_non_ascii(s: str) -> str:
+    """Escape the non-ASCII characters in json string, the same as
+    ``json.dumps(..., ensure_ascii=True)``. Non-ASCII characters can only
+    appear in the json string values, so it is safe to replace them all.
+    """
+    if _non_ascii.search(s) is None:
+        return s
+    return _non_ascii.sub(_escape_non_ascii_char, s)
+
+
+def apply_object_hook(obj, object_hook):
+    """Apply ``object_hook`` on every dict in a decoded json value, inner
+    dict first, the same order as :func:`json.loads`.
+    """
+    klass = type(obj)
+    if klass is dict:
+        for key, value in obj.items():
+            if type(value) in (dict, list):
+                obj[key] = apply_object_hook(value, object_hook)
+        return object_hook(obj)
+    elif klass is list:
+        for index, value in enumerate(obj):
+            if type(value) in (dict, list):
+                obj[index] = apply_object_hook(value, object_hook)
+    return obj
+
+
+def _has_non_finite(obj, convert) -> bool:
+    """Test if there's any ``NaN`` or ``Infinity`` float in the object, the
+    objects that are not builtin types are converted by ``convert`` first.
+    """
+    todo = [obj]
+    while todo:
+        obj = todo.pop()
+        klass = type(obj)
+        if klass in _atomic_types:
+            continue
+        elif klass is dict:
+            todo.extend(obj.values())
+        elif klass is list or klass is tuple:
+            todo.extend(obj)
+        elif klass is float:
+            if not math.isfinite(obj):
+                return True
+        else:
+            value = convert(obj)
+            if value is not obj:
+                todo.append(value)
+            elif isinstance(obj, float):
+                if not math.isfinite(obj):
+                    return True
+            elif isinstance(obj, dict):
+                todo.extend(obj.values())
+            elif isinstance(obj, (list, tuple)):
+                todo.extend(obj)
+    return False
+
+
+# the types that are json values as they are
+_leaf_types = frozenset((str, int, float, bool, type(None)))
+
+
+def _has_native_types(obj) -> bool:
+    """Test if there's any ``uuid.UUID`` or ``enum.Enum`` value or key in
+    the builtin containers, orjson serializes them by itself without calling
+    ``default``. The classes are only looked up in the modules already
+    imported, the other objects are not walked into, they go through
+    ``default``.
+    """
+    native_types = tuple(
+        getattr(sys.modules[module_name], name)
+        for module_name, name in [("uuid", "UUID"), ("enum", "Enum")]
+        if module_name in sys.modules
+    )
+    if not native_types:
+        return False
+    leaf_types = _leaf_types
+    todo = [obj]
+    pop = todo.pop
+    append = todo.append
+    while todo:
+        obj = pop()
+        klass = type(obj)
+        if klass is dict:
+            for key, value in obj.items():
+                if type(key) is not str and type(key) not in leaf_types:
+                    append(key)
+                if type(value) not in leaf_types:
+                    append(value)
+        elif klass is list or klass is tuple:
+            for value in obj:
+                if type(value) not in leaf_types:
+                    append(value)
+        elif klass not in leaf_types and isinstance(obj, native_types):
+            return True
+    return False
+
+
+def _orjson_loads(s, loads):
+    """orjson parses the integer out of the 64 bits range as float, raise
+    ``ValueError`` to fall back to the stdlib in this case.
+    """
+    if isinstance(s, str):
+        pattern = _long_digits
+    else:
+        pattern = _bytes_long_digits
+    if pattern.search(s) is not None:
+        raise ValueError("integer may be out of the 64 bits range")
+    return loads(s)
+
+
+class Backend(object):
+    """
+    Base class of the json backend.
+    """
+    #: backend name
+    name = None
+    #: the json library, it's imported when the backend is used
+    module_name = None
+    #: whether the ``loads`` function created by :meth:`make_loads` can
+    #: parse utf-8 encoded bytes-like object (bytes, memoryview of a
+    #: memory mapped file, ...) directly, without decoding it to str
+    parse_buffer = False
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether the library is installed.
+        """
+        if self.module_name is None:
+            return True
+        return import_optional(self.module_name) is not None
+
+    @property
+    def module(self):
+        """
+        The json library module.
+        """
+        return import_optional(self.module_name)
+
+    def make_dumps(
+        self,
+        superjson,
+        indent,
+        sort_keys,
+        ensure_ascii,
+        options,
+        fallback,
+    ):
+        """
+        Create the ``dumps(obj) -> str`` function.
+
+        :param superjson: the SuperJson instance, could be a configured copy
+            with ``float_precision`` setting.
+        :param options: other json encoder keyword arguments.
+        :param fallback: the stdlib ``dumps(obj) -> str`` function.
+
+        :returns: ``None`` if the options can't be expressed by this backend.
+        """
+        return None
+
+    def make_loads(self, superjson, object_hook, scan_tags, options, fallback):
+        """
+        Create the ``loads(s: str) -> object`` function.
+
+        :param options: other json decoder keyword arguments.
+        :param fallback: the stdlib ``loads(s: str) -> object`` function.
+
+        :returns: ``None`` if the options can't be expressed by this backend.
+        """
+        return None
+
+    def _make_loads(self, superjson, object_hook, scan_tags, fallback, loads, errors):
+        """
+        The common ``loads`` implementation, parse by ``loads``, then apply
+        the object hook if there's any registered tag.
+        """
+        has_tags = superjson._has_tags
+
+        def backend_loads(s):
+            try:
+                obj = loads(s)
+            except errors:
+                if not isinstance(s, str):
+                    s = str(s, "utf-8")
+                return fallback(s)
+            if scan_tags and not has_tags(s):
+                return obj
+            return apply_object_hook(obj, object_hook)
+
+        return backend_loads
+
+
+class StdlibBackend(Backend):
+    """
+    The :mod:`json` module.
+    """
+    name = "stdlib"
+
+
+class OrjsonBackend(Backend):
+    """
+    orjson, it calls the dumpers in its ``default`` hook, the builtin types
+    are serialized without any python level conversion.
+    """
+    name = "orjson"
+    module_name = "orjson"
+    parse_buffer = True
+
+    def make_dumps(
+        self,
+        superjson,
+        indent,
+        sort_keys,
+        ensure_ascii,
+        options,
+        fallback,
+    ):
+        if options or indent not in (None, 2, "  "):
+            return None
+
+        orjson = self.module
+        # datetime, dataclasses and the subclasses of the builtin types go
+        # through the dumpers, not serialized by orjson
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_SUBCLASS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        convert = superjson._json_convert
+        get_dumper = superjson._get_dumper
+        # if floats have to be rounded, or lists may be encoded as table,
+        # convert everything in python first
+        native = (
+            superjson._float_precision is None
+            and superjson._table_threshold is None
+            and superjson._atomic_types == _atomic_types
+            and all(
+                get_dumper(klass) is None
+                for klass in (dict, list, tuple, float)
+            )
+        )
+        if native:
+            def default(obj):
+                value = convert(obj)
+                if value is not obj:
+                    return value
+                # subclass of builtin types without registered dumper
+                if isinstance(obj, str):
+                    return str.__str__(obj)
+                elif isinstance(obj, int):
+                    return int(obj)
+                elif isinstance(obj, float):
+                    return float(obj)
+                raise TypeError("%r is not JSON serializable" % obj)
+        else:
+            default = None
+
+        dumps = orjson.dumps
+
+        def backend_dumps(obj):
+            # orjson serializes uuid.UUID and enum.Enum without calling
+            # default, they have to go through the dumpers, and the ones
+            # without a dumper are left to the stdlib to raise TypeError
+            try:
+                if native and not _has_native_types(obj):
+                    value = obj
+                    b = dumps(obj, default=default, option=option)
+                else:
+                    value = convert(obj)
+                    b = None
+                    if not _has_native_types(value):
+                        b = dumps(value, option=option)
+            except TypeError:  # orjson.JSONEncodeError
+                return fallback(obj)
+            if b is None:
+                return fallback(obj)
+            # NaN and Infinity are encoded as null
+            if b"null" in b and _has_non_finite(value, convert):
+                return fallback(obj)
+            s = b.decode("utf-8")
+            if ensure_ascii:
+                s = escape_non_ascii(s)
+            return s
+
+        return backend_dumps
+
+    def make_loads(self, superjson, object_hook, scan_tags, options, fallback):
+        if options:
+            return None
+        return self._make_loads(
+            superjson, object_hook, scan_tags, fallback,
+            partial(_orjson_loads, loads=self.module.loads), ValueError,
+        )
+
+
+class RapidjsonBackend(Backend):
+    """
+    python-rapidjson.
+    """
+    name = "rapidjson"
+    module_name = "rapidjson"
+
+    def make_dumps(
+        self,
+        superjson,
+        indent,
+        sort_keys,
+        ensure_ascii,
+        options,
+        fallback,
+    ):
+        if options or isinstance(indent, str):
+            return None
+
+        rapidjson = self.module
+        convert = superjson._json_convert
+        dumps = rapidjson.dumps
+        kwargs = dict(
+            indent=indent,
+            sort_keys=bool(sort_keys),
+            ensure_ascii=ensure_ascii,
+            number_mode=rapidjson.NM_NAN,
+        )
+
+        def backend_dumps(obj):
+            try:
+                return dumps(convert(obj), **kwargs)
+            except (TypeError, ValueError, OverflowError):
+                return fallback(obj)
+
+        return backend_dumps
+
+    def make_loads(self, superjson, object_hook, scan_tags, options, fallback):
+        if options:
+            return None
+        return self._make_loads(
+            superjson, object_hook, scan_tags, fallback,
+            partial(self.module.loads, number_mode=self.module.NM_NAN),
+            (ValueError, OverflowError),
+        )
+
+
+class UjsonBackend(Backend):
+    """
+    ujson.
+    """
+    name = "ujson"
+    module_name = "ujson"
+
+    def make_dumps(
+        self,
+        superjson,
+        indent,
+        sort_keys,
+        ensure_ascii,
+        options,
+        fallback,
+    ):
+        if options or isinstance(indent, str):
+            return None
+
+        convert = superjson._json_convert
+        dumps = self.module.dumps
+        kwargs = dict(
+            ensure_ascii=ensure_ascii,
+            sort_keys=bool(sort_keys),
+            indent=indent or 0,
+            escape_forward_slashes=False,
+        )
+
+        def backend_dumps(obj):
+            try:
+                return dumps(convert(obj), **kwargs)
+            except (TypeError, ValueError, OverflowError):
+                return fallback(obj)
+
+        return backend_dumps
+
+    def make_loads(self, superjson, object_hook, scan_tags, options, fallback):
+        if options:
+            return None
+        return self._make_loads(
+            superjson, object_hook, scan_tags, fallback,
+            self.module.loads, (ValueError, OverflowError),
+        )
+
+
+#: name -> backend
+backend_registry = OrderedDict()
+
+
+def register_backend(backend: Backend):
+    """
+    Register a backend by its name.
+    """
+    backend_registry[backend.name] = backend
+
+
+for _backend in [StdlibBackend(), OrjsonBackend(), RapidjsonBackend(), UjsonBackend()]:
+    register_backend(_backend)
+
+#: ``"auto"`` picks the first installed one
+AUTO_ORDER = ["orjson", "rapidjson", "ujson", "stdlib"]
+
+
+def get_backend(name: str) -> Backend:
+    """
+    Find a registered backend by its name, ``"auto"`` for the fastest
+    installed one.
+    """
+    if name == "auto":
+        for name in AUTO_ORDER:
+            backend = backend_registry[name]
+            if backend.available:
+                return backend
+    try:
+        backend = backend_registry[name]
+    except KeyError:
+        raise ValueError(
+            "unknown json backend %r, available backends are: %s" % (
+                name, ", ".join(backend_registry),
+            )
+        )
+    if not backend.available:
+        raise ValueError("json backend %r is not installed" % name)
+    return backend
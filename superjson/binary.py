@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact binary encoding, it is `MessagePack <https://msgpack.org/>`_
+compatible, any MessagePack library can read it.
+
+Compared with the json text:
+
+- ``bytes`` is stored as raw binary, not base64 string.
+- the ``{"$class_name": value}`` dict created by the registered dumpers is
+  stored as an extension type :data:`TAG_EXT_TYPE`, the ext data is
+  ``class_name`` followed by ``value``, both MessagePack encoded. It is
+  restored by the registered loader, so every custom type round-trips just
+  as it does in text mode.
+- integer out of the 64 bits range is stored as an extension type too.
+
+Usually used by :meth:`superjson.SuperJson.dumpb` and
+:meth:`superjson.SuperJson.loadb`.
+"""
+
+import struct
+
+#: MessagePack extension type code for ``{"$class_name": value}``
+TAG_EXT_TYPE = 83  # "S"
+
+#: class name in the tag ext for the integer out of 64 bits range
+BIG_INT_CLASS_NAME = "builtins.int"
+
+_pack_float = struct.Struct(">Bd").pack
+_pack_uint8 = struct.Struct(">BB").pack
+_pack_uint16 = struct.Struct(">BH").pack
+_pack_uint32 = struct.Struct(">BI").pack
+_pack_uint64 = struct.Struct(">BQ").pack
+_pack_int8 = struct.Struct(">Bb").pack
+_pack_int16 = struct.Struct(">Bh").pack
+_pack_int32 = struct.Struct(">Bi").pack
+_pack_int64 = struct.Struct(">Bq").pack
+_pack_ext8 = struct.Struct(">BBb").pack
+_pack_ext16 = struct.Struct(">BHb").pack
+_pack_ext32 = struct.Struct(">BIb").pack
+
+_unpack_uint8 = struct.Struct(">B").unpack_from
+_unpack_uint16 = struct.Struct(">H").unpack_from
+_unpack_uint32 = struct.Struct(">I").unpack_from
+_unpack_uint64 = struct.Struct(">Q").unpack_from
+_unpack_int8 = struct.Struct(">b").unpack_from
+_unpack_int16 = struct.Struct(">h").unpack_from
+_unpack_int32 = struct.Struct(">i").unpack_from
+_unpack_int64 = struct.Struct(">q").unpack_from
+_unpack_float32 = struct.Struct(">f").unpack_from
+_unpack_float64 = struct.Struct(">d").unpack_from
+
+_fixext_header = {1: 0xd4, 2: 0xd5, 4: 0xd6, 8: 0xd7, 16: 0xd8}
+
+
+def _header(n, fix_code, fix_limit, code8, code16, code32):
+    if n < fix_limit:
+        return bytes((fix_code | n,))
+    elif code8 is not None and n < 0x100:
+        return _pack_uint8(code8, n)
+    elif n < 0x10000:
+        return _pack_uint16(code16, n)
+    elif n < 0x100000000:
+        return _pack_uint32(code32, n)
+    raise ValueError("object is too large")
+
+
+def _pack_int(o):
+    if 0 <= o < 0x80:
+        return bytes((o,))
+    elif -0x20 <= o < 0:
+        return bytes((o & 0xff,))
+    elif o >= 0:
+        if o < 0x100:
+            return _pack_uint8(0xcc, o)
+        elif o < 0x10000:
+            return _pack_uint16(0xcd, o)
+        elif o < 0x100000000:
+            return _pack_uint32(0xce, o)
+        elif o < 0x10000000000000000:
+            return _pack_uint64(0xcf, o)
+    else:
+        if o >= -0x80:
+            return _pack_int8(0xd0, o)
+        elif o >= -0x8000:
+            return _pack_int16(0xd1, o)
+        elif o >= -0x80000000:
+            return _pack_int32(0xd2, o)
+        elif o >= -0x8000000000000000:
+            return _pack_int64(0xd3, o)
+    return None
+
+
+def _pack_ext(code, data):
+    n = len(data)
+    if n in _fixext_header:
+        return _pack_int8(_fixext_header[n], code) + data
+    elif n < 0x100:
+        return _pack_ext8(0xc7, n, code) + data
+    elif n < 0x10000:
+        return _pack_ext16(0xc8, n, code) + data
+    return _pack_ext32(0xc9, n, code) + data
+
+
+def make_pack(
+    superjson,
+    # hand-optimized bytecode; turn globals into locals
+    dict=dict,
+    float=float,
+    int=int,
+    isinstance=isinstance,
+    len=len,
+    list=list,
+    memoryview=memoryview,
+    str=str,
+    tuple=tuple,
+    type=type,
+):
+    """
+    Create the ``pack(obj) -> bytes`` function.
+
+    :param superjson: the :class:`~superjson.SuperJson` instance that owns the
+        dumpers. Usually it is a configured copy that ``bytes`` is an atomic
+        type, so the nested ``bytes`` in the dumper output is kept as it is.
+    """
+    precision = superjson._float_precision
+    table_threshold = superjson._table_threshold
+    to_table = superjson._to_table
+    get_dumper = superjson._get_dumper
+    atomic_types = superjson._atomic_types
+    tagged_loaders = superjson._tagged_loaders
+    none_type = type(None)
+
+    def pack_str(o, append):
+        data = o.encode("utf-8", "surrogatepass")
+        append(_header(len(data), 0xa0, 32, 0xd9, 0xda, 0xdb))
+        append(data)
+
+    def pack_tag(class_name, value, append):
+        parts = list()
+        pack_str(class_name, parts.append)
+        pack(value, parts.append)
+        append(_pack_ext(TAG_EXT_TYPE, b"".join(parts)))
+
+    def pack_dict(o, append):
+        if len(o) == 1:
+            for key, value in o.items():
+                if key in tagged_loaders:
+                    pack_tag(key[1:], value, append)
+                    return
+        append(_header(len(o), 0x80, 16, None, 0xde, 0xdf))
+        for key, value in o.items():
+            klass = type(key)
+            if klass is str:
+                pack_str(key, append)
+            elif klass in (int, float, bool, none_type, bytes):
+                pack(key, append)
+            else:
+                raise TypeError(
+                    "keys must be str, bytes, int, float, bool or None, "
+                    "not %s" % klass.__name__
+                )
+            pack(value, append)
+
+    def pack_list(o, append):
+        if table_threshold is not None and len(o) >= table_threshold:
+            table = to_table(o)
+            if table is not None:
+                pack_dict(table, append)
+                return
+        append(_header(len(o), 0x90, 16, None, 0xdc, 0xdd))
+        for value in o:
+            pack(value, append)
+
+    def pack_float(o, append):
+        if precision is not None:
+            o = round(o, precision)
+        append(_pack_float(0xcb, o))
+
+    def pack(o, append):
+        klass = type(o)
+        if klass in atomic_types:
+            if klass is str:
+                pack_str(o, append)
+            elif o is None:
+                append(b"\xc0")
+            elif o is True:
+                append(b"\xc3")
+            elif o is False:
+                append(b"\xc2")
+            elif klass is int:
+                data = _pack_int(o)
+                if data is None:
+                    pack_tag(BIG_INT_CLASS_NAME, str(o), append)
+                else:
+                    append(data)
+            else:  # bytes, memoryview
+                if klass is memoryview:
+                    # the length of a non-byte memoryview counts the items
+                    if not o.c_contiguous:
+                        o = memoryview(o.tobytes())
+                    elif o.ndim != 1 or o.format != "B":
+                        o = o.cast("B")
+                append(_header(len(o), 0, 0, 0xc4, 0xc5, 0xc6))
+                append(o)
+        elif klass is dict:
+            pack_dict(o, append)
+        elif klass is list or klass is tuple:
+            pack_list(o, append)
+        elif klass is float:
+            pack_float(o, append)
+        else:
+            dumper = get_dumper(klass)
+            if dumper is not None:
+                pack(dumper(superjson, o), append)
+            elif isinstance(o, dict):
+                pack_dict(o, append)
+            elif isinstance(o, (list, tuple)):
+                pack_list(o, append)
+            elif isinstance(o, float):
+                pack_float(float(o), append)
+            elif isinstance(o, str):
+                pack_str(o, append)
+            elif isinstance(o, int):
+                pack(int(o), append)
+            else:
+                raise TypeError("%r is not serializable" % o)
+
+    def pack_obj(obj) -> bytes:
+        parts = list()
+        pack(obj, parts.append)
+        return b"".join(parts)
+
+    return pack_obj
+
+
+def make_unpack(superjson, object_hook=None):
+    """
+    Create the ``unpack(data: bytes) -> object`` function.
+
+    :param object_hook: applied on every decoded map and tag, the default
+        is the object hook of ``superjson``, it restores the registered
+        types.
+    """
+    if object_hook is None:
+        object_hook = superjson._object_hook1
+
+    def unpack_tag(data, pos, end):
+        class_name, pos = unpack(data, pos)
+        value, pos = unpack(data, pos)
+        if pos != end:
+            raise ValueError("invalid superjson tag ext data")
+        if class_name == BIG_INT_CLASS_NAME:
+            return int(value)
+        return object_hook({"$" + class_name: value})
+
+    def unpack_ext(data, pos, n):
+        code = _unpack_int8(data, pos)[0]
+        pos += 1
+        end = pos + n
+        if code != TAG_EXT_TYPE:
+            raise ValueError("unsupported MessagePack ext type %s" % code)
+        return unpack_tag(data, pos, end), end
+
+    def unpack_array(data, pos, n):
+        array = list()
+        append = array.append
+        for _ in range(n):
+            value, pos = unpack(data, pos)
+            append(value)
+        return array, pos
+
+    def unpack_map(data, pos, n):
+        dct = dict()
+        for _ in range(n):
+            key, pos = unpack(data, pos)
+            value, pos = unpack(data, pos)
+            dct[key] = value
+        return object_hook(dct), pos
+
+    def unpack_str(data, pos, n):
+        end = pos + n
+        return data[pos:end].decode("utf-8", "surrogatepass"), end
+
+    def unpack_bin(data, pos, n):
+        end = pos + n
+        return bytes(data[pos:end]), end
+
+    def unpack(data, pos):
+        code = data[pos]
+        pos += 1
+        if code < 0x80:
+            return code, pos
+        elif code >= 0xe0:
+            return code - 0x100, pos
+        elif code < 0x90:
+            return unpack_map(data, pos, code & 0x0f)
+        elif code < 0xa0:
+            return unpack_array(data, pos, code & 0x0f)
+        elif code < 0xc0:
+            return unpack_str(data, pos, code & 0x1f)
+        elif code == 0xc0:
+            return None, pos
+        elif code == 0xc2:
+            return False, pos
+        elif code == 0xc3:
+            return True, pos
+        try:
+            handler, size, reader = _dispatch[code]
+        except KeyError:
+            raise ValueError("invalid MessagePack type code 0x%02x" % code)
+        value = reader(data, pos)[0]
+        pos += size
+        if handler is None:
+            return value, pos
+        return handler(data, pos, value)
+
+    def unpack_fixext(n):
+        return lambda data, pos, value: unpack_ext(data, pos - 1, n)
+
+    # code -> (handler, size of the value, value reader)
+    _dispatch = {
+        0xc4: (unpack_bin, 1, _unpack_uint8),
+        0xc5: (unpack_bin, 2, _unpack_uint16),
+        0xc6: (unpack_bin, 4, _unpack_uint32),
+        0xc7: (unpack_ext, 1, _unpack_uint8),
+        0xc8: (unpack_ext, 2, _unpack_uint16),
+        0xc9: (unpack_ext, 4, _unpack_uint32),
+        0xca: (None, 4, _unpack_float32),
+        0xcb: (None, 8, _unpack_float64),
+        0xcc: (None, 1, _unpack_uint8),
+        0xcd: (None, 2, _unpack_uint16),
+        0xce: (None, 4, _unpack_uint32),
+        0xcf: (None, 8, _unpack_uint64),
+        0xd0: (None, 1, _unpack_int8),
+        0xd1: (None, 2, _unpack_int16),
+        0xd2: (None, 4, _unpack_int32),
+        0xd3: (None, 8, _unpack_int64),
+        0xd4: (unpack_fixext(1), 1, _unpack_int8),
+        0xd5: (unpack_fixext(2), 1, _unpack_int8),
+        0xd6: (unpack_fixext(4), 1, _unpack_int8),
+        0xd7: (unpack_fixext(8), 1, _unpack_int8),
+        0xd8: (unpack_fixext(16), 1, _unpack_int8),
+        0xd9: (unpack_str, 1, _unpack_uint8),
+        0xda: (unpack_str, 2, _unpack_uint16),
+        0xdb: (unpack_str, 4, _unpack_uint32),
+        0xdc: (unpack_array, 2, _unpack_uint16),
+        0xdd: (unpack_array, 4, _unpack_uint32),
+        0xde: (unpack_map, 2, _unpack_uint16),
+        0xdf: (unpack_map, 4, _unpack_uint32),
+    }
+
+    def unpack_obj(data):
+        try:
+            obj, pos = unpack(data, 0)
+        except (IndexError, struct.error):
+            raise ValueError("truncated MessagePack data")
+        if pos != len(data):
+            raise ValueError("extra data after the MessagePack value")
+        return obj
+
+    return unpack_obj
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sidecar blob file for the large binary values.
+
+With ``dump(obj, "data.json", blob_threshold=N)``, the ``bytes``,
+``bytearray``, ``memoryview`` values and the raw memory of the
+``numpy.ndarray`` that are at least N bytes are not base64 encoded into the
+json, they are written to a sidecar file next to it,
+``data.json.<token>.blob``, the json only holds a reference::
+
+    {"$superjson.blob": ["data.json.5f0c3a...blob", offset, length]}
+
+``load("data.json")`` memory maps the sidecar file read only, and the values
+come back as zero copy :class:`memoryview` slices of the map, the data is
+paged in by the OS only when it's accessed. ``bytes(view)`` makes a copy.
+``bytearray`` is copied out of the map, it comes back as ``bytearray``.
+
+Each dump writes a new sidecar file with a random token, the json file is
+the commit point:
+
+1. the sidecar file is written and fsynced, nothing refers to it yet.
+2. the json file is atomically replaced, it refers to the new sidecar file.
+3. the sidecar files of the previous dumps are removed.
+
+If the process dies in between, the json file still refers to the old
+sidecar file, the orphan new one is removed by the next dump. A dump without
+``blob_threshold`` also removes the sidecar files of the previous dumps.
+
+The replacement is not atomic for a concurrent reader: a ``load`` that read
+the old json file before step 2, and opens the old sidecar file after step
+3, fails with :class:`FileNotFoundError`. A sidecar file that is already
+memory mapped stays readable (on POSIX). Don't dump to a file while another
+process loads it, or retry the load.
+"""
+
+import os
+import re
+import mmap
+
+#: tag of the blob reference
+BLOB_CLASS_NAME = "superjson.blob"
+
+#: extension of the sidecar blob file
+BLOB_EXTENSION = ".blob"
+
+#: every blob starts at a multiple of it, so the numpy array loaded from the
+#: memory map is aligned
+BLOB_ALIGNMENT = 64
+
+
+def _sidecar_pattern(abspath: str):
+    return re.compile(
+        re.escape(os.path.basename(abspath)) + r"\.[0-9a-f]{16}"
+        + re.escape(BLOB_EXTENSION) + "$"
+    )
+
+
+def find_sidecars(abspath: str) -> list:
+    """
+    Find all the sidecar blob files of a json file, including the ones left
+    by the previous dumps.
+    """
+    dirname = os.path.dirname(abspath)
+    prefix = os.path.basename(abspath) + "."
+    pattern = _sidecar_pattern(abspath)
+    return [
+        os.path.join(dirname, basename)
+        for basename in sorted(os.listdir(dirname or "."))
+        if basename.startswith(prefix) and pattern.match(basename)
+    ]
+
+
+def remove_sidecars(abspath: str, keep: str = None):
+    """
+    Remove the sidecar blob files of a json file, except ``keep``.
+    """
+    for path in find_sidecars(abspath):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:  # pragma: no cover
+                pass
+
+
+class BlobWriter(object):
+    """
+    Write the blobs to a new sidecar file of ``abspath``. The file is
+    created at the first :meth:`write`.
+
+    :param threshold: the minimal size in bytes of the value that is stored
+        in the sidecar file.
+    """
+
+    def __init__(self, abspath: str, threshold: int):
+        self.basename = "%s.%s%s" % (
+            os.path.basename(abspath), os.urandom(8).hex(), BLOB_EXTENSION,
+        )
+        self.path = os.path.join(os.path.dirname(abspath), self.basename)
+        self.threshold = threshold
+        self.offset = 0
+        self._file = None
+
+    def write(self, data) -> list:
+        """
+        Append a bytes-like object to the sidecar file.
+
+        :returns: the reference, ``[sidecar basename, offset, length]``.
+        """
+        if self._file is None:
+            self._file = open(self.path, "xb")
+        padding = -self.offset % BLOB_ALIGNMENT
+        if padding:
+            self._file.write(b"\0" * padding)
+            self.offset += padding
+        with memoryview(data) as view:
+            length = view.nbytes
+            self._file.write(view)
+        ref = [self.basename, self.offset, length]
+        self.offset += length
+        return ref
+
+    def commit(self) -> bool:
+        """
+        Flush the sidecar file to the disk and close it.
+
+        :returns: ``False`` if nothing is written, no file is created.
+        """
+        if self._file is None:
+            return False
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return True
+
+    def discard(self):
+        """
+        Close and remove the sidecar file.
+        """
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.remove(self.path)
+            except OSError:  # pragma: no cover
+                pass
+
+
+class BlobReader(object):
+    """
+    Resolve the blob references of a json file in ``dirname``, each
+    sidecar file is memory mapped once.
+
+    :param copy: if ``True``, return ``bytes`` copy instead of memoryview.
+    """
+
+    def __init__(self, dirname: str, copy: bool = False):
+        self.dirname = dirname
+        self.copy = copy
+        self._maps = dict()
+
+    def _get_map(self, basename: str):
+        try:
+            return self._maps[basename]
+        except KeyError:
+            pass
+        if os.path.basename(basename) != basename \
+                or not basename.endswith(BLOB_EXTENSION):
+            raise ValueError("invalid sidecar blob file name %r" % basename)
+        with open(os.path.join(self.dirname, basename), "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[basename] = mm
+        return mm
+
+    def read(self, ref):
+        """
+        :param ref: ``[sidecar basename, offset, length]``
+        :returns: memoryview of the memory mapped sidecar file, or ``bytes``
+            if ``copy`` is True.
+        """
+        basename, offset, length = ref
+        mm = self._get_map(basename)
+        if offset < 0 or length < 0 or offset + length > len(mm):
+            raise ValueError("blob %r is out of the sidecar file" % (ref,))
+        if self.copy:
+            return mm[offset:offset + length]
+        return memoryview(mm)[offset:offset + length]
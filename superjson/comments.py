@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 
 """
-This module can remove these two style ``// comment``, ``# comment`` comments
-from code.
+This module can remove ``// comment``, ``# comment`` line comments and
+``/* comment */`` block comments from json string, the comment symbols in
+the json string value are kept.
+
+It is a single pass over the string, and it can work on chunks, see
+:func:`iter_strip_comments`.
+
+The original implementation was from pyjson_tricks:
 
 ---------- Revised BSD License ----------
 
@@ -34,33 +40,236 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 https://github.com/mverleg/pyjson_tricks
 """
 
-from re import findall
+import re
+
+DEFAULT_COMMENT_SYMBOLS = frozenset(("#", "//"))
+
+# number of characters that are processed at a time by the regex, a regex
+# match over a very long string is slow and uses lots of memory
+_SLICE_SIZE = 1 << 16
+
+_BLOCK_COMMENT_START = "/*"
+
+_STRING = r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+
+_pattern_cache = dict()
+
 
+def _get_pattern(comment_symbols):
+    r"""Build the regex for the comment symbols.
 
-def strip_comment_line_with_symbol(line, start):
-    """Strip comments from line string.
+    Each match is a run of code (json string values included) in group 1,
+    followed by an optional comment in group 2. For example, with the default
+    comment symbols::
+
+        ((?:[^"#/]+|STRING|/(?![/*]))*)((?:#|//)[^\n]*|/\*[\s\S]*?\*/)?
     """
-    parts = line.split(start)
-    counts = [len(findall(r'(?:^|[^"\\]|(?:\\\\|\\")+)(")', part))
-              for part in parts]
-    total = 0
-    for nr, count in enumerate(counts):
-        total += count
-        if total % 2 == 0:
-            return start.join(parts[:nr + 1]).rstrip()
-    else:  # pragma: no cover
-        return line.rstrip()
-
-
-def strip_comments(string, comment_symbols=frozenset(('#', '//'))):
+    key = frozenset(comment_symbols)
+    try:
+        return _pattern_cache[key]
+    except KeyError:
+        pass
+
+    symbols = sorted(key, key=len, reverse=True)
+    openers = symbols + [_BLOCK_COMMENT_START]
+    first_chars = sorted({opener[0] for opener in openers})
+    code = [
+        "[^%s]+" % re.escape('"' + "".join(first_chars)),
+        _STRING,
+    ]
+    for char in first_chars:
+        if char in openers:
+            continue
+        rests = [
+            re.escape(opener[1:]) for opener in openers if opener[0] == char
+        ]
+        code.append("%s(?!%s)" % (re.escape(char), "|".join(rests)))
+    comment = [
+        "(?:%s)[^\n]*" % "|".join(re.escape(symbol) for symbol in symbols),
+        r"/\*[\s\S]*?\*/",
+    ]
+    pattern = re.compile("((?:%s)*)(%s)?" % ("|".join(code), "|".join(comment)))
+
+    # the string tail that may be the beginning of a comment symbol
+    prefixes = frozenset(
+        opener[:i] for opener in openers for i in range(1, len(opener))
+    )
+    _pattern_cache[key] = pattern, prefixes
+    return pattern, prefixes
+
+
+# the rest of a json string value after the opening quote, without the
+# closing quote
+_string_rest = re.compile(r'[^"\\\n]*(?:\\.[^"\\\n]*)*')
+
+# scanner states, where the end of the last chunk is
+_IN_CODE = 0
+_IN_STRING = 1
+_IN_ESCAPE = 2  # in a string, right after a backslash
+_IN_LINE_COMMENT = 3
+_IN_BLOCK_COMMENT = 4
+_IN_BLOCK_COMMENT_STAR = 5  # in a block comment, right after a "*"
+
+
+class CommentStripper(object):
+    """Strip comments from a json string chunk by chunk.
+
+    A string value or a comment can be split by the chunk boundary, the
+    scanner state is kept until the next chunk comes, every character is
+    scanned only once.
+
+    Example::
+
+        >>> stripper = CommentStripper()
+        >>> stripper.feed('[1, /* a')
+        '[1, '
+        >>> stripper.feed(' */ 2] // b')
+        ' 2] '
+        >>> stripper.close()
+        ''
+    """
+
+    def __init__(self, comment_symbols=DEFAULT_COMMENT_SYMBOLS):
+        self.pattern, self.prefixes = _get_pattern(comment_symbols)
+        # the tail of the last chunk that may be the beginning of a comment
+        # symbol, it's never longer than the symbol
+        self.pending = ""
+        self.state = _IN_CODE
+
+    def feed(self, text: str) -> str:
+        """Strip comments from the next chunk, return the stripped string
+        that is ready.
+        """
+        if self.pending:
+            text = self.pending + text
+            self.pending = ""
+        return self._strip(text, final=False)
+
+    def close(self) -> str:
+        """Strip comments from the held tail, it is the end of the input.
+        """
+        if self.state in (_IN_BLOCK_COMMENT, _IN_BLOCK_COMMENT_STAR):
+            raise ValueError("Unterminated block comment")
+        text = self.pending
+        self.pending = ""
+        return self._strip(text, final=True)
+
+    def _strip(self, text: str, final: bool) -> str:
+        out = list()
+        pos = 0
+        end = len(text)
+        while pos < end:
+            state = self.state
+            if state == _IN_CODE:
+                pos = self._strip_code(text, pos, final, out)
+            elif state == _IN_STRING:
+                m = _string_rest.match(text, pos)
+                out.append(m.group())
+                pos = m.end()
+                if pos == end:
+                    break
+                char = text[pos]
+                out.append(char)
+                pos += 1
+                if char == "\\":
+                    self.state = _IN_ESCAPE
+                else:
+                    # closing quote, or new line in an invalid json string
+                    self.state = _IN_CODE
+            elif state == _IN_ESCAPE:
+                out.append(text[pos])
+                pos += 1
+                self.state = _IN_STRING
+            elif state == _IN_LINE_COMMENT:
+                index = text.find("\n", pos)
+                if index == -1:
+                    break
+                pos = index
+                self.state = _IN_CODE
+            else:
+                if state == _IN_BLOCK_COMMENT_STAR and text[pos] == "/":
+                    comment_end = pos + 1
+                else:
+                    index = text.find("*/", pos)
+                    if index == -1:
+                        if text[end - 1] == "*":
+                            self.state = _IN_BLOCK_COMMENT_STAR
+                        else:
+                            self.state = _IN_BLOCK_COMMENT
+                        break
+                    comment_end = index + 2
+                out.append(" ")
+                pos = comment_end
+                self.state = _IN_CODE
+        return "".join(out)
+
+    def _strip_code(self, text: str, pos: int, final: bool, out: list) -> int:
+        """Strip comments from the code starting at ``pos``, until the end of
+        ``text`` or an unfinished string value or comment.
+
+        :returns: the position where the scanning stops.
+        """
+        end = len(text)
+        while pos < end:
+            m = self.pattern.match(text, pos)
+            code_end = m.end(1)
+            if code_end > pos:
+                out.append(m.group(1))
+            comment = m.group(2)
+            if comment is not None:
+                if comment[:2] == "/*":
+                    out.append(" ")
+                elif not final and m.end() == end:
+                    # the line comment may continue in the next chunk
+                    self.state = _IN_LINE_COMMENT
+                pos = m.end()
+                continue
+            if code_end == end:
+                if not final:
+                    # the tail may be the beginning of a comment symbol
+                    for prefix in self.prefixes:
+                        if text.endswith(prefix):
+                            out[-1] = out[-1][:-len(prefix)]
+                            self.pending = prefix
+                            break
+                return end
+            # stopped at an unterminated string or block comment
+            if text.startswith(_BLOCK_COMMENT_START, code_end):
+                if final:
+                    raise ValueError(
+                        "Unterminated block comment starting at %s" % code_end
+                    )
+                self.state = _IN_BLOCK_COMMENT
+                return code_end + len(_BLOCK_COMMENT_START)
+            out.append(text[code_end])
+            self.state = _IN_STRING
+            return code_end + 1
+        return pos
+
+
+def iter_strip_comments(chunks, comment_symbols=DEFAULT_COMMENT_SYMBOLS):
+    """Strip comments from str chunks, yield the stripped string chunk by
+    chunk.
+    """
+    stripper = CommentStripper(comment_symbols)
+    for chunk in chunks:
+        for start in range(0, len(chunk), _SLICE_SIZE):
+            text = stripper.feed(chunk[start:start + _SLICE_SIZE])
+            if text:
+                yield text
+    text = stripper.close()
+    if text:
+        yield text
+
+
+def strip_comments(string, comment_symbols=DEFAULT_COMMENT_SYMBOLS):
     """Strip comments from json string.
 
     :param string: A string containing json with comments started by comment_symbols.
     :param comment_symbols: Iterable of symbols that start a line comment (default # or //).
     :return: The string with the comments removed.
     """
-    lines = string.splitlines()
-    for k in range(len(lines)):
-        for symbol in comment_symbols:
-            lines[k] = strip_comment_line_with_symbol(lines[k], start=symbol)
-    return '\n'.join(lines)
+    if not any(symbol in string for symbol in comment_symbols) \
+            and _BLOCK_COMMENT_START not in string:
+        return string
+    return "".join(iter_strip_comments([string], comment_symbols))
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+
+"""
+Streaming compression codecs for the compressed json file.
+
+A codec is picked by the file extension, for example ``data.json.bz2`` or
+``data.jsonl.xz``. ``.gz``, ``.bz2`` and ``.xz`` are always available,
+``.zst`` and ``.lz4`` are registered if the ``zstandard`` / ``lz4`` package
+is installed.
+
+Every codec writes the standard format of its tool, so the file can be read
+by ``gzip``, ``bzip2``, ``xz``, ``zstd``, ``lz4``. Multi streams file (for
+example, concatenated by ``cat``) can be read as well.
+
+Example::
+
+    >>> from superjson.compression import get_codec
+    >>> codec = get_codec("xz")
+    >>> codec.decompress(codec.compress(b"hello", level=9))
+    b'hello'
+"""
+
+import zlib
+import base64
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+from collections import OrderedDict
+
+from .fileio import DEFAULT_CHUNK_SIZE
+
+# the compression modules other than zlib are imported when the codec is
+# used, so ``import superjson`` stays fast
+
+
+def _iter_slices(data, size: int = DEFAULT_CHUNK_SIZE):
+    """Cut a bytes-like object into memoryview slices without copy, so the
+    decompressor never holds, or copies, much more than ``size`` bytes of
+    the input at a time.
+    """
+    with memoryview(data) as view:
+        view = view.cast("B")
+        for start in range(0, len(view), size):
+            yield view[start:start + size]
+
+
+class Codec(ABC):
+    """
+    Base class of the streaming compression codec, a subclass has to
+    implement :meth:`compressobj` and :meth:`decompressobj`.
+
+    :param level: the default compress level, if ``None``, the codec's
+        ``default_level`` is used.
+    """
+    #: codec name, can be used as ``compress`` argument of ``dumps``
+    name = None
+    #: file extension, with the leading dot
+    extension = None
+    #: default compress level
+    default_level = None
+
+    def __init__(self, level: int = None):
+        if level is not None:
+            self.default_level = level
+
+    def __repr__(self):
+        return "%s(level=%r)" % (self.__class__.__name__, self.default_level)
+
+    @abstractmethod
+    def compressobj(self, level: int = None):
+        """
+        Create a streaming compressor, it has ``compress(data)`` and
+        ``flush()`` methods.
+        """
+
+    @abstractmethod
+    def decompressobj(self):
+        """
+        Create a streaming decompressor for one stream, it has
+        ``decompress(data, max_length)``, ``eof``, ``needs_input``,
+        ``unused_data`` like :class:`bz2.BZ2Decompressor`.
+        """
+
+    def iter_decompress(self, chunks, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Decompress byte chunks on the fly, each yielded chunk is at most
+        ``chunk_size`` bytes. Multi streams data is supported.
+        """
+        decompressor = self.decompressobj()
+        for data in chunks:
+            while True:
+                if decompressor.eof:
+                    if not data:
+                        break
+                    # beginning of the next stream
+                    decompressor = self.decompressobj()
+                elif not data and decompressor.needs_input:
+                    break
+                chunk = decompressor.decompress(data, chunk_size)
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                else:
+                    data = b""
+                if chunk:
+                    yield chunk
+        if not decompressor.eof:
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached"
+            )
+
+    def compress(self, data: bytes, level: int = None) -> bytes:
+        """
+        Compress bytes.
+        """
+        compressor = self.compressobj(level)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress bytes, or a bytes-like object (a memory mapped file, ...).
+        """
+        return b"".join(self.iter_decompress(_iter_slices(data)))
+
+
+class GzipCodec(Codec):
+    """
+    gzip (RFC 1952), the raw zlib stream written to ``*.gz`` by older
+    version of superjson can also be decompressed.
+    """
+    name = "gzip"
+    extension = ".gz"
+    default_level = 6
+
+    # zlib ``wbits`` to write gzip format
+    _gzip_wbits = 16 + zlib.MAX_WBITS
+
+    # zlib ``wbits`` to automatically detect gzip or zlib format
+    _auto_wbits = 32 + zlib.MAX_WBITS
+
+    def compressobj(self, level: int = None):
+        if level is None:
+            level = self.default_level
+        return zlib.compressobj(level, zlib.DEFLATED, self._gzip_wbits)
+
+    def decompressobj(self):
+        return zlib.decompressobj(self._auto_wbits)
+
+    def iter_decompress(self, chunks, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        # zlib decompressor keeps the input exceeding ``max_length`` in
+        # ``unconsumed_tail`` instead of an internal buffer
+        decompressor = self.decompressobj()
+        for data in chunks:
+            while data:
+                if decompressor.eof:
+                    decompressor = self.decompressobj()
+                chunk = decompressor.decompress(data, chunk_size)
+                if chunk:
+                    yield chunk
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                else:
+                    data = decompressor.unconsumed_tail
+        chunk = decompressor.flush()
+        if chunk:
+            yield chunk
+        if not decompressor.eof:
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached"
+            )
+
+
+class Bz2Codec(Codec):
+    """
+    bzip2.
+    """
+    name = "bz2"
+    extension = ".bz2"
+    default_level = 9
+
+    def compressobj(self, level: int = None):
+        if level is None:
+            level = self.default_level
+        import bz2
+
+        return bz2.BZ2Compressor(level)
+
+    def decompressobj(self):
+        import bz2
+
+        return bz2.BZ2Decompressor()
+
+
+class XzCodec(Codec):
+    """
+    xz, the level is the lzma preset, from 0 to 9.
+    """
+    name = "xz"
+    extension = ".xz"
+    default_level = 6
+
+    def compressobj(self, level: int = None):
+        if level is None:
+            level = self.default_level
+        import lzma
+
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=level)
+
+    def decompressobj(self):
+        import lzma
+
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+
+
+class ZstdCodec(Codec):
+    """
+    zstandard, requires the ``zstandard`` package.
+    """
+    name = "zstd"
+    extension = ".zst"
+    default_level = 3
+
+    def compressobj(self, level: int = None):
+        if level is None:
+            level = self.default_level
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).compressobj()
+
+    def decompressobj(self):
+        """
+        The zstandard decompressor doesn't support ``max_length``, the output
+        of a frame without content size has no bound, it's not used by
+        :meth:`iter_decompress`.
+        """
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    def iter_decompress(self, chunks, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        # the stream reader returns at most ``chunk_size`` bytes at a time,
+        # but it doesn't report the truncated frame, the frame headers are
+        # followed by :class:`_ZstdFrames`
+        import zstandard
+
+        frames = _ZstdFrames()
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            _ChunkReader(chunks, frames.feed),
+            read_size=DEFAULT_CHUNK_SIZE,
+            read_across_frames=True,
+        )
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        if not frames.complete:
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached"
+            )
+
+
+class _ChunkReader(object):
+    """
+    File-like ``read(size)`` over an iterable of byte chunks, the bytes
+    that are read are also passed to ``callback``.
+    """
+
+    def __init__(self, chunks, callback):
+        self._chunks = iter(chunks)
+        self._callback = callback
+        self._data = memoryview(b"")
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._data:
+            try:
+                self._data = memoryview(next(self._chunks)).cast("B")
+            except StopIteration:
+                return b""
+        if size < 0:
+            size = len(self._data)
+        data = self._data[:size]
+        self._data = self._data[size:]
+        self._callback(data)
+        return data.tobytes()
+
+
+class _ZstdFrames(object):
+    """
+    Follow the frame and block headers of zstd data (RFC 8878) without
+    decompressing it, to find if the data ends at the end of a frame.
+    """
+    _MAGIC = 0xFD2FB528
+
+    def __init__(self):
+        self._need = 4  # size of the next header
+        self._state = self._on_magic
+        self._header = b""
+        self._skip = 0  # size of the payload to skip
+        self._checksum = False
+        self.complete = False  # empty data isn't a zstd stream
+
+    def feed(self, data):
+        pos = 0
+        while pos < len(data):
+            if self._skip:
+                n = min(self._skip, len(data) - pos)
+                self._skip -= n
+                pos += n
+                continue
+            piece = bytes(data[pos:pos + self._need - len(self._header)])
+            pos += len(piece)
+            self._header += piece
+            if len(self._header) < self._need:
+                break
+            header = self._header
+            self._header = b""
+            self._state(header)
+        self.complete = (
+            self._state == self._on_magic
+            and not self._header and not self._skip
+        )
+
+    def _expect(self, size, state):
+        self._need = size
+        self._state = state
+
+    def _on_magic(self, header):
+        magic = int.from_bytes(header, "little")
+        if magic == self._MAGIC:
+            self._expect(1, self._on_descriptor)
+        elif magic & 0xFFFFFFF0 == 0x184D2A50:  # skippable frame
+            self._expect(4, self._on_skippable_size)
+        else:
+            # not zstd data, the decompressor raises the error
+            self._expect(4, self._on_magic)
+
+    def _on_skippable_size(self, header):
+        self._skip = int.from_bytes(header, "little")
+        self._expect(4, self._on_magic)
+
+    def _on_descriptor(self, header):
+        descriptor = header[0]
+        single_segment = descriptor >> 5 & 1
+        self._checksum = bool(descriptor >> 2 & 1)
+        size = (0, 1, 2, 4)[descriptor & 3]  # dictionary id
+        size += (single_segment, 2, 4, 8)[descriptor >> 6]  # content size
+        if not single_segment:
+            size += 1  # window descriptor
+        self._skip = size
+        self._expect(3, self._on_block)
+
+    def _on_block(self, header):
+        block = int.from_bytes(header, "little")
+        size = block >> 3
+        if block >> 1 & 3 == 1:  # RLE block
+            size = 1
+        self._skip = size
+        if block & 1:  # last block
+            self._skip += 4 if self._checksum else 0
+            self._expect(4, self._on_magic)
+
+
+class Lz4Codec(Codec):
+    """
+    lz4 frame format, requires the ``lz4`` package.
+    """
+    name = "lz4"
+    extension = ".lz4"
+    default_level = 0
+
+    def compressobj(self, level: int = None):
+        if level is None:
+            level = self.default_level
+        return _Lz4Compressor(level)
+
+    def decompressobj(self):
+        import lz4.frame
+
+        return lz4.frame.LZ4FrameDecompressor()
+
+
+class _Lz4Compressor(object):
+    """
+    Adapt :class:`lz4.frame.LZ4FrameCompressor` to the
+    ``compress(data)``, ``flush()`` interface.
+    """
+
+    def __init__(self, level):
+        import lz4.frame
+
+        self._compressor = lz4.frame.LZ4FrameCompressor(
+            compression_level=level,
+        )
+        self._header = self._compressor.begin()
+
+    def compress(self, data):
+        data = self._compressor.compress(data)
+        if self._header:
+            data = self._header + data
+            self._header = b""
+        return data
+
+    def flush(self):
+        return self._header + self._compressor.flush()
+
+
+#: extension -> codec
+codec_registry = OrderedDict()
+
+
+def register_codec(codec: Codec):
+    """
+    Register a codec by its extension, the codec already registered with the
+    same extension is replaced. For example, use level 1 for ``*.xz``::
+
+        register_codec(XzCodec(level=1))
+    """
+    if not isinstance(codec, Codec):
+        raise TypeError("%r is not a Codec" % (codec,))
+    codec_registry[codec.extension] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Find a registered codec by its name or extension, for example ``"bz2"``,
+    ``".bz2"``.
+    """
+    name = name.lower()
+    if not name.startswith("."):
+        for codec in codec_registry.values():
+            if codec.name == name:
+                return codec
+        name = "." + name
+    try:
+        return codec_registry[name]
+    except KeyError:
+        raise ValueError(
+            "unknown compression codec %r, available codecs are: %s" % (
+                name, ", ".join(
+                    "%s (%s)" % (codec.name, codec.extension)
+                    for codec in codec_registry.values()
+                ),
+            )
+        )
+
+
+for _codec in [GzipCodec(), Bz2Codec(), XzCodec()]:
+    register_codec(_codec)
+# registered if the package is installed, it's found without importing it
+if find_spec("zstandard") is not None:
+    register_codec(ZstdCodec())
+if find_spec("lz4") is not None:
+    register_codec(Lz4Codec())
+
+
+def compress_str(s: str, compress, level: int = None) -> str:
+    """
+    Compress a string, used by ``dumps(compress=...)``.
+
+    :param compress: ``True`` for the zlib + base64 string created by
+        :mod:`superjson.pkg.compresslib`, or a codec name / extension, then
+        the compressed bytes are base64 encoded.
+    """
+    if compress is True:
+        from .pkg import compresslib
+
+        if level is None:
+            level = 6
+        return compresslib.compress(s, level=level, return_type="str")
+    b = get_codec(compress).compress(s.encode("utf-8"), level)
+    return base64.b64encode(b).decode("utf-8")
+
+
+def decompress_str(s, decompress) -> str:
+    """
+    Reverse of :func:`compress_str`, used by ``loads(decompress=...)``. If
+    ``s`` is bytes, it is the compressed bytes without base64 encoding.
+    """
+    if decompress is True:
+        from .pkg import compresslib
+
+        return compresslib.decompress(s, return_type="str")
+    if isinstance(s, str):
+        s = base64.b64decode(s.encode("utf-8"))
+    return get_codec(decompress).decompress(s).decode("utf-8")
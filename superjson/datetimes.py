@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fast ``datetime`` / ``date`` parsing, and the epoch encoding of ``datetime``.
+
+By default a datetime is dumped as its ISO 8601 string, it is parsed back by
+``datetime.fromisoformat`` (python 3.7+), which is a C function and much
+faster than :func:`dateutil.parser.parse`. dateutil is only used for the
+strings that ``fromisoformat`` doesn't understand, for example written by
+other tools.
+
+With ``dumps(datetime_epoch="ms")`` (or ``"us"``), a datetime is dumped as
+``[epoch, unit, utc_offset]``, the integer milli / micro seconds since
+``1970-01-01T00:00:00`` UTC, and the UTC offset in seconds, ``null`` for
+naive datetime::
+
+    >>> json.dumps(datetime(2000, 1, 1, 8, tzinfo=timezone(timedelta(hours=8))), datetime_epoch="ms")
+    '{"$datetime.datetime": [946684800000, "ms", 28800]}'
+
+A naive datetime is taken as it is in UTC, so it is loaded back to the same
+naive datetime regardless of the local timezone. An aware datetime is loaded
+with a fixed offset :class:`datetime.timezone`, like the ISO string, the name
+of the time zone is not kept. ``"ms"`` drops the microseconds.
+"""
+
+from datetime import datetime, date, timedelta, timezone
+
+#: epoch unit -> number of the unit in one second
+EPOCH_UNITS = {"ms": 1000, "us": 1000000}
+
+EPOCH = datetime(1970, 1, 1)
+
+_fromisoformat = getattr(datetime, "fromisoformat", None)
+_date_fromisoformat = getattr(date, "fromisoformat", None)
+
+
+def check_datetime_epoch(unit: str) -> str:
+    """
+    Validate the ``datetime_epoch`` option.
+    """
+    if unit not in EPOCH_UNITS:
+        raise ValueError(
+            "datetime_epoch has to be one of %s, not %r" % (
+                ", ".join(repr(key) for key in EPOCH_UNITS), unit,
+            )
+        )
+    return unit
+
+
+def _dateutil_parse(s: str) -> datetime:
+    try:
+        from dateutil.parser import parse
+    except ImportError:  # pragma: no cover
+        from .warning import get_logger
+
+        msg = ("You need to install `python-dateutil` to load the datetime "
+               "string that is not in ISO 8601 format: %r" % s)
+        get_logger().info(msg)
+        raise
+    return parse(s)
+
+
+def parse_datetime(s: str) -> datetime:
+    """
+    Parse a datetime string, ``datetime.fromisoformat`` first, then
+    :func:`dateutil.parser.parse` if it fails.
+    """
+    if _fromisoformat is not None:
+        try:
+            return _fromisoformat(s)
+        except ValueError:
+            pass
+    return _dateutil_parse(s)
+
+
+def parse_date(s: str) -> date:
+    """
+    Parse a ``YYYY-MM-DD`` date string, ``date.fromisoformat`` first, then
+    :meth:`datetime.strptime` if it fails.
+    """
+    if _date_fromisoformat is not None:
+        try:
+            return _date_fromisoformat(s)
+        except ValueError:
+            pass
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+# utc offset -> its value in seconds
+_offset_seconds = dict()
+# utc offset in seconds -> 1970-01-01T00:00:00 UTC in that time zone
+_epoch_by_offset = {None: EPOCH}
+
+_unit_deltas = {
+    unit: timedelta(microseconds=1000000 // n)
+    for unit, n in EPOCH_UNITS.items()
+}
+
+
+def _to_offset_seconds(offset: timedelta):
+    try:
+        return _offset_seconds[offset]
+    except KeyError:
+        pass
+    seconds = offset.days * 86400 + offset.seconds
+    if offset.microseconds:
+        seconds += offset.microseconds / 1000000
+    _offset_seconds[offset] = seconds
+    return seconds
+
+
+def _get_epoch(offset) -> datetime:
+    try:
+        return _epoch_by_offset[offset]
+    except KeyError:
+        pass
+    tz = timezone(timedelta(seconds=offset))
+    epoch = EPOCH.replace(tzinfo=timezone.utc).astimezone(tz)
+    _epoch_by_offset[offset] = epoch
+    return epoch
+
+
+def datetime_to_epoch(dt: datetime, unit: str) -> list:
+    """
+    :returns: ``[epoch, unit, utc_offset]``, ``utc_offset`` is the offset in
+        seconds, ``None`` if ``dt`` is naive.
+    """
+    offset = dt.utcoffset()
+    if offset is None:
+        epoch = (dt - EPOCH) // _unit_deltas[unit]
+    else:
+        offset = _to_offset_seconds(offset)
+        epoch = (dt - _get_epoch(offset)) // _unit_deltas[unit]
+    return [epoch, unit, offset]
+
+
+def epoch_to_datetime(epoch: int, unit: str, offset) -> datetime:
+    """
+    Reverse of :func:`datetime_to_epoch`.
+    """
+    return _get_epoch(offset) + epoch * _unit_deltas[unit]
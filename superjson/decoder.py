@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+"""
+Reusable json decoder.
+"""
+
+import re
+import json
+from json.decoder import WHITESPACE
+
+from .comments import strip_comments, iter_strip_comments
+from .backends import get_backend, apply_object_hook
+from .compression import decompress_str
+from .interning import make_interner, DEFAULT_MEMO_SIZE
+from .refs import REF_TAG, RefTable
+
+_bytes_ref_tag_pattern = re.compile(re.escape(REF_TAG.encode("utf-8")))
+
+# first character of a json number, and the characters that can continue it
+_NUMBER_START = frozenset("-0123456789")
+_NUMBER_CHARS = frozenset(".eE+-0123456789")
+
+
+class Decoder(object):
+    """
+    A pre-built, immutable json decoder. All the settings are resolved once
+    when the decoder is created, then it can be reused across calls and
+    threads.
+
+    Usually created by :meth:`superjson.SuperJson.make_decoder`. Arguments
+    are the same as :meth:`superjson.SuperJson.loads`.
+
+    If the default object hook is used, and ``scan_tags`` is True (default),
+    the json string is pre-scanned for registered ``"$class_name"`` tags. If
+    there's none, the document is parsed without any object hook, so no
+    python level callback runs for every json object.
+
+    With the default object hook, the shared references dumped by
+    ``dumps(track_refs=True)`` are resolved, see :mod:`superjson.refs`.
+
+    Example::
+
+        >>> decoder = json.make_decoder(ignore_comments=True)
+        >>> decoder.loads('[1, 2] // comment')
+        [1, 2]
+        >>> decoder.loads_many(['1', '2'])
+        [1, 2]
+    """
+    __slots__ = (
+        "superjson",
+        "object_hook",
+        "decompress",
+        "ignore_comments",
+        "scan_tags",
+        "resolve_refs",
+        "backend",
+        "table_columns",
+        "intern",
+        "json_decoder",
+        "plain_json_decoder",
+        "backend_loads",
+        "parse_buffer",
+    )
+
+    def __init__(
+        self,
+        superjson,
+        object_hook=None,
+        decompress=False,
+        ignore_comments: bool = False,
+        scan_tags: bool = True,
+        backend: str = None,
+        table_columns: bool = False,
+        intern_keys: bool = False,
+        intern_values: int = None,
+        intern_memo_size: int = DEFAULT_MEMO_SIZE,
+        cls=None,
+        **kwargs
+    ):
+        if table_columns:
+            superjson = superjson._configure(_table_columns=True)
+
+        resolve_refs = object_hook is None
+        if resolve_refs:
+            object_hook = superjson._object_hook1
+        else:
+            scan_tags = False
+
+        if "object_pairs_hook" in kwargs:
+            del kwargs["object_pairs_hook"]
+
+        if cls is None:
+            cls = json.JSONDecoder
+        json_decoder = cls(
+            object_hook=object_hook,
+            object_pairs_hook=None,
+            **kwargs
+        )
+        if scan_tags or resolve_refs:
+            plain_json_decoder = cls(**kwargs)
+        else:
+            plain_json_decoder = None
+
+        if backend is None:
+            backend = superjson._backend
+        options = dict(kwargs)
+        if cls is not json.JSONDecoder:
+            options["cls"] = cls
+        backend_ = get_backend(backend)
+        backend_loads = backend_.make_loads(
+            superjson, object_hook, scan_tags, options, self._stdlib_decode,
+        )
+        parse_buffer = backend_loads is not None and backend_.parse_buffer
+
+        if intern_keys or intern_values is not None:
+            intern = make_interner(intern_keys, intern_values, intern_memo_size)
+        else:
+            intern = None
+
+        setattr_ = super(Decoder, self).__setattr__
+        setattr_("superjson", superjson)
+        setattr_("object_hook", object_hook)
+        setattr_("decompress", decompress)
+        setattr_("ignore_comments", ignore_comments)
+        setattr_("scan_tags", scan_tags)
+        setattr_("resolve_refs", resolve_refs)
+        setattr_("backend", backend)
+        setattr_("table_columns", table_columns)
+        setattr_("intern", intern)
+        setattr_("json_decoder", json_decoder)
+        setattr_("plain_json_decoder", plain_json_decoder)
+        setattr_("backend_loads", backend_loads)
+        setattr_("parse_buffer", parse_buffer)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def loads(self, s):
+        """
+        Load object from json encoded string.
+        """
+        if self.decompress:
+            s = decompress_str(s, self.decompress)
+
+        if isinstance(s, str):
+            if s.startswith("\ufeff"):
+                raise json.JSONDecodeError(
+                    "Unexpected UTF-8 BOM (decode using utf-8-sig)", s, 0)
+        else:
+            s = s.decode(json.detect_encoding(s), "surrogatepass")
+
+        if self.ignore_comments:
+            s = strip_comments(s)
+
+        return self._decode(s)
+
+    def loads_buffer(self, buf):
+        """
+        Load object from utf-8 encoded json in a bytes-like object, usually
+        a memory mapped file (see :func:`superjson.fileio.map_file`).
+
+        If the backend can parse the buffer directly (orjson), no copy of the
+        data is made. Otherwise, the buffer is decoded to str straightly,
+        without the intermediate ``bytes`` copy.
+        """
+        if self.decompress or self.ignore_comments or not self.parse_buffer \
+                or (self.resolve_refs
+                    and _bytes_ref_tag_pattern.search(buf) is not None):
+            return self.loads(str(buf, "utf-8"))
+        if buf[:3] == b"\xef\xbb\xbf":
+            raise json.JSONDecodeError(
+                "Unexpected UTF-8 BOM (decode using utf-8-sig)", "", 0)
+        with memoryview(buf) as view:
+            obj = self.backend_loads(view)
+        if self.intern is not None:
+            return self.intern(obj)
+        return obj
+
+    def _decode(self, s: str):
+        if self.resolve_refs and REF_TAG in s:
+            obj = self._decode_refs(s)
+        elif self.backend_loads is not None:
+            obj = self.backend_loads(s)
+        else:
+            obj = self._stdlib_decode(s)
+        if self.intern is not None:
+            return self.intern(obj)
+        return obj
+
+    def _decode_refs(self, s: str):
+        """Decode the document that has shared references, the loaders get
+        a configured copy with the reference table of this call.
+        """
+        superjson = self.superjson._configure(_ref_table=RefTable())
+        obj = apply_object_hook(
+            self.plain_json_decoder.decode(s), superjson._object_hook1,
+        )
+        return superjson._ref_table.resolve(obj)
+
+    def _stdlib_decode(self, s: str):
+        if self.scan_tags and not self.superjson._has_tags(s):
+            return self.plain_json_decoder.decode(s)
+        return self.json_decoder.decode(s)
+
+    def loads_many(self, strings) -> list:
+        """
+        Load many json encoded strings, returns a list of object.
+        """
+        if self.decompress or self.ignore_comments:
+            return [self.loads(s) for s in strings]
+        decode = self._decode
+        return [
+            decode(s) if isinstance(s, str) else self.loads(s)
+            for s in strings
+        ]
+
+    def iterloads(self, chunks):
+        """
+        Incrementally decode a json string that is a top level array, yield
+        the decoded elements one by one.
+
+        :param chunks: iterable of str, the json string split into chunks.
+            Only the buffered chunks and one element are held in memory.
+
+        ``decompress`` is not applied here, comments are stripped chunk by
+        chunk if ``ignore_comments`` is True.
+        """
+        if self.ignore_comments:
+            chunks = iter_strip_comments(chunks)
+        chunks = iter(chunks)
+        buf = ""
+        pos = 0
+        eof = False
+        decoder = self.json_decoder
+
+        def read_more(size=1):
+            """Read more chunks into the buffer, until at least ``size``
+            unparsed characters are buffered. Return False if nothing can
+            be read.
+            """
+            nonlocal buf, pos, eof, decoder
+            pieces = [buf[pos:]]
+            n = len(pieces[0])
+            while not eof and (n < size or len(pieces) == 1):
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    eof = True
+                    break
+                pieces.append(chunk)
+                n += len(chunk)
+            if len(pieces) == 1:
+                return False
+            buf = "".join(pieces)
+            pos = 0
+            # the object hook can be skipped if no tag in the buffer
+            if self.scan_tags and not self.superjson._has_tags(buf):
+                decoder = self.plain_json_decoder
+            else:
+                decoder = self.json_decoder
+            return True
+
+        def skip_whitespace():
+            """Move ``pos`` to the next non-whitespace character and return
+            it, return an empty string at the end of input.
+            """
+            nonlocal pos
+            while True:
+                pos = WHITESPACE.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                if not read_more():
+                    return ""
+
+        if skip_whitespace() != "[":
+            raise ValueError("the top level json value is not an array")
+        pos += 1
+
+        if skip_whitespace() == "]":
+            pos += 1
+        else:
+            while True:
+                if not skip_whitespace():
+                    raise ValueError("unexpected end of json array")
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                    # a number split by the chunk boundary is decoded as
+                    # its prefix, ``3.`` as ``3``, ``1e-`` as ``1``
+                    complete = eof or buf[pos] not in _NUMBER_START or (
+                        end < len(buf) and buf[end] not in _NUMBER_CHARS
+                    )
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    complete = False
+                if not complete:
+                    # at least double the buffer, so a big element is not
+                    # re-parsed too many times
+                    read_more(2 * (len(buf) - pos))
+                    continue
+
+                if self.intern is not None:
+                    obj = self.intern(obj)
+                yield obj
+                pos = end
+                char = skip_whitespace()
+                if char == ",":
+                    pos += 1
+                elif char == "]":
+                    pos += 1
+                    break
+                else:
+                    raise ValueError(
+                        "expecting ',' or ']' in json array, got %r" % char)
+
+        if skip_whitespace():
+            raise ValueError("extra data after the top level json array")
@@ -0,0 +1,531 @@
+# -*- coding: utf-8 -*-
+
+"""
+Streaming json encoder.
+
+:meth:`superjson.SuperJson.dumps` converts the whole object graph into a tree
+of json serializable builtin types first, and then hands it to
+:func:`json.dumps`. That means a second copy of the data lives in memory
+until the encoding is finished.
+
+This module provides an iterative encoder that applies the registered dumpers
+only when a value is reached, and yields the json string chunk by chunk. It is
+a fork of the pure python encoder from the standard library
+``json.encoder._make_iterencode``, the output is exactly the same as
+``json.dumps(superjson._json_convert(obj))``.
+
+It's a memory tradeoff, not a speedup: the containers are walked by python
+code instead of the C accelerated encoder, only the dumper outputs are
+encoded by it. The peak memory doesn't grow with the size of the data, it
+takes about the same time as the default mode, up to 10% more (see
+``benchmark/bench_stream_dumps.py``).
+"""
+
+import json
+from functools import partial
+
+from .compression import compress_str
+from .backends import get_backend
+from .datetimes import check_datetime_epoch
+from .refs import track_refs
+
+_INFINITY = float("inf")
+
+
+def make_floatstr(allow_nan, _repr=float.__repr__, _inf=_INFINITY, _neginf=-_INFINITY):
+    """
+    Create the float to string function, same as the one used in
+    :meth:`json.JSONEncoder.iterencode`.
+    """
+
+    def floatstr(o):
+        if o != o:
+            text = "NaN"
+        elif o == _inf:
+            text = "Infinity"
+        elif o == _neginf:
+            text = "-Infinity"
+        else:
+            return _repr(o)
+
+        if not allow_nan:
+            raise ValueError(
+                "Out of range float values are not JSON compliant: " + repr(o)
+            )
+
+        return text
+
+    return floatstr
+
+
+def make_iterencode(
+    superjson,
+    encoder: json.JSONEncoder,
+    # hand-optimized bytecode; turn globals into locals
+    ValueError=ValueError,
+    TypeError=TypeError,
+    dict=dict,
+    float=float,
+    id=id,
+    int=int,
+    isinstance=isinstance,
+    list=list,
+    str=str,
+    tuple=tuple,
+    type=type,
+    _intstr=int.__repr__,
+):
+    """
+    Create a generator function ``iterencode(obj)`` that yields the json
+    string of ``obj`` chunk by chunk.
+
+    :param superjson: the :class:`~superjson.SuperJson` instance that owns the
+        dumpers, and the ``float_precision`` and ``table_threshold``
+        settings.
+    :param encoder: the :class:`json.JSONEncoder` that holds the
+        ``indent``, ``separators``, ``sort_keys``, ``ensure_ascii``,
+        ``skipkeys``, ``check_circular``, ``allow_nan`` and ``default``
+        settings.
+    """
+    if superjson._float_precision is None:
+        convert_float = None
+    else:
+        convert_float = partial(round, ndigits=superjson._float_precision)
+
+    if encoder.check_circular:
+        markers = {}
+    else:
+        markers = None
+    if encoder.ensure_ascii:
+        _encoder = json.encoder.encode_basestring_ascii
+    else:
+        _encoder = json.encoder.encode_basestring
+    _floatstr = make_floatstr(encoder.allow_nan)
+    _default = encoder.default
+    _indent = encoder.indent
+    _key_separator = encoder.key_separator
+    _item_separator = encoder.item_separator
+    _sort_keys = encoder.sort_keys
+    _skipkeys = encoder.skipkeys
+
+    if _indent is not None and not isinstance(_indent, str):
+        _indent = " " * _indent
+
+    _get_dumper = superjson._get_dumper
+    _to_table = superjson._to_table
+    _encode = encoder.encode
+
+    _plain_atomic_types = {str, int, bool, type(None)}
+
+    # builtin types that are encoded as they are, they don't have a
+    # registered dumper.
+    _atomic_types = superjson._atomic_types
+
+    def _key_to_str(key):
+        if isinstance(key, str):
+            return key
+        # JavaScript is weakly typed for these, so it makes sense to
+        # also allow them.  Many encoders seem to do something like this.
+        elif isinstance(key, float):
+            return _floatstr(key)
+        elif key is True:
+            return "true"
+        elif key is False:
+            return "false"
+        elif key is None:
+            return "null"
+        elif isinstance(key, int):
+            return _intstr(key)
+        elif _skipkeys:
+            return None
+        else:
+            raise TypeError(
+                "keys must be str, int, float, bool or None, "
+                "not %s" % key.__class__.__name__
+            )
+
+    def _enter(o):
+        if markers is not None:
+            markerid = id(o)
+            if markerid in markers:
+                raise ValueError("Circular reference detected")
+            markers[markerid] = o
+
+    def _exit(o):
+        if markers is not None:
+            del markers[id(o)]
+
+    def _make_container_encoders(
+        _iterencode, _atomic, _convert_float, _table_threshold,
+    ):
+        """
+        Create the list / dict encoders.
+
+        :param _iterencode: encoder for the values that are not atomic.
+        :param _atomic: types that can be encoded without any conversion.
+        :param _convert_float: applied on float values before encoding.
+        :param _table_threshold: list of at least this many records is
+            encoded as a columnar table, ``None`` to disable.
+        """
+
+        def _iterencode_list(lst, _current_indent_level):
+            if not lst:
+                yield "[]"
+                return
+            if _table_threshold is not None and len(lst) >= _table_threshold:
+                table = _to_table(lst)
+                if table is not None:
+                    yield from _iterencode_dict(table, _current_indent_level)
+                    return
+            if markers is not None:
+                markerid = id(lst)
+                if markerid in markers:
+                    raise ValueError("Circular reference detected")
+                markers[markerid] = lst
+            buf = "["
+            if _indent is not None:
+                _current_indent_level += 1
+                newline_indent = "\n" + _indent * _current_indent_level
+                separator = _item_separator + newline_indent
+                buf += newline_indent
+            else:
+                newline_indent = None
+                separator = _item_separator
+            first = True
+            for value in lst:
+                if first:
+                    first = False
+                else:
+                    buf = separator
+                klass = type(value)
+                if klass in _atomic:
+                    if klass is str:
+                        yield buf + _encoder(value)
+                    elif klass is int:
+                        yield buf + _intstr(value)
+                    elif value is None:
+                        yield buf + "null"
+                    elif value is True:
+                        yield buf + "true"
+                    else:
+                        yield buf + "false"
+                elif klass is float:
+                    if _convert_float is not None:
+                        value = _convert_float(value)
+                    yield buf + _floatstr(value)
+                else:
+                    yield buf
+                    if klass is dict:
+                        yield from _iterencode_dict(value, _current_indent_level)
+                    elif klass is list:
+                        yield from _iterencode_list(value, _current_indent_level)
+                    else:
+                        yield from _iterencode(value, _current_indent_level)
+            if newline_indent is not None:
+                _current_indent_level -= 1
+                yield "\n" + _indent * _current_indent_level
+            yield "]"
+            if markers is not None:
+                del markers[markerid]
+
+        def _iterencode_dict(dct, _current_indent_level):
+            if not dct:
+                yield "{}"
+                return
+            if markers is not None:
+                markerid = id(dct)
+                if markerid in markers:
+                    raise ValueError("Circular reference detected")
+                markers[markerid] = dct
+            buf = "{"
+            if _indent is not None:
+                _current_indent_level += 1
+                newline_indent = "\n" + _indent * _current_indent_level
+                item_separator = _item_separator + newline_indent
+                buf += newline_indent
+            else:
+                newline_indent = None
+                item_separator = _item_separator
+            first = True
+            if _sort_keys:
+                items = sorted(dct.items())
+            else:
+                items = dct.items()
+            for key, value in items:
+                if type(key) is not str:
+                    key = _key_to_str(key)
+                    if key is None:
+                        continue
+                if first:
+                    first = False
+                else:
+                    buf = item_separator
+                # the separator, key and atomic value are yielded as one
+                # chunk
+                buf = buf + _encoder(key) + _key_separator
+                klass = type(value)
+                if klass in _atomic:
+                    if klass is str:
+                        yield buf + _encoder(value)
+                    elif klass is int:
+                        yield buf + _intstr(value)
+                    elif value is None:
+                        yield buf + "null"
+                    elif value is True:
+                        yield buf + "true"
+                    else:
+                        yield buf + "false"
+                elif klass is float:
+                    if _convert_float is not None:
+                        value = _convert_float(value)
+                    yield buf + _floatstr(value)
+                else:
+                    yield buf
+                    if klass is dict:
+                        yield from _iterencode_dict(value, _current_indent_level)
+                    elif klass is list:
+                        yield from _iterencode_list(value, _current_indent_level)
+                    else:
+                        yield from _iterencode(value, _current_indent_level)
+            if first:
+                # all keys are skipped
+                yield buf
+            if newline_indent is not None:
+                _current_indent_level -= 1
+                yield "\n" + _indent * _current_indent_level
+            yield "}"
+            if markers is not None:
+                del markers[markerid]
+
+        return _iterencode_list, _iterencode_dict
+
+    def _plain_iterencode(o, _current_indent_level):
+        """
+        Encode value that is already json serializable.
+        """
+        if isinstance(o, str):
+            yield _encoder(o)
+        elif o is None:
+            yield "null"
+        elif o is True:
+            yield "true"
+        elif o is False:
+            yield "false"
+        elif isinstance(o, int):
+            yield _intstr(o)
+        elif isinstance(o, float):
+            yield _floatstr(o)
+        elif isinstance(o, (list, tuple)):
+            yield from _plain_iterencode_list(o, _current_indent_level)
+        elif isinstance(o, dict):
+            yield from _plain_iterencode_dict(o, _current_indent_level)
+        else:
+            _enter(o)
+            yield from _plain_iterencode(_default(o), _current_indent_level)
+            _exit(o)
+
+    def _encode_plain(o, _current_indent_level):
+        """
+        Encode the dumper output, it is already json serializable and held
+        in memory, so it's encoded in one go by the (C accelerated)
+        ``encoder``. A json string never contains a raw newline, only the
+        indent has one.
+        """
+        s = _encode(o)
+        if _indent is not None and _current_indent_level:
+            s = s.replace("\n", "\n" + _indent * _current_indent_level)
+        return s
+
+    def _iterencode(o, _current_indent_level):
+        """
+        Encode any value, the same rules as
+        :meth:`~superjson.SuperJson._json_convert` are used.
+        """
+        klass = type(o)
+        if klass in _atomic_types:
+            yield from _plain_iterencode(o, _current_indent_level)
+        elif klass is dict:
+            yield from _iterencode_dict(o, _current_indent_level)
+        elif klass is list or klass is tuple:
+            yield from _iterencode_list(o, _current_indent_level)
+        elif klass is float:
+            if convert_float is not None:
+                o = convert_float(o)
+            yield _floatstr(o)
+        else:
+            dumper = _get_dumper(klass)
+            if dumper is not None:
+                yield _encode_plain(dumper(superjson, o), _current_indent_level)
+            elif isinstance(o, dict):
+                yield from _iterencode_dict(o, _current_indent_level)
+            elif isinstance(o, (list, tuple)):
+                yield from _iterencode_list(o, _current_indent_level)
+            elif isinstance(o, float):
+                if convert_float is not None:
+                    o = convert_float(o)
+                yield _floatstr(o)
+            else:
+                yield from _plain_iterencode(o, _current_indent_level)
+
+    _plain_iterencode_list, _plain_iterencode_dict = _make_container_encoders(
+        _plain_iterencode, _plain_atomic_types, None, None,
+    )
+    _iterencode_list, _iterencode_dict = _make_container_encoders(
+        _iterencode, _atomic_types, convert_float, superjson._table_threshold,
+    )
+
+    def iterencode(o):
+        return _iterencode(o, 0)
+
+    return iterencode
+
+
+class Encoder(object):
+    """
+    A pre-built, immutable json encoder. All the settings are resolved once
+    when the encoder is created, then it can be reused across calls and
+    threads, no global state is touched.
+
+    Usually created by :meth:`superjson.SuperJson.make_encoder`. Arguments
+    are the same as :meth:`superjson.SuperJson.dumps`.
+
+    Example::
+
+        >>> encoder = json.make_encoder(float_precision=2)
+        >>> encoder.dumps(3.1415926)
+        '3.14'
+        >>> encoder.dumps_many([1.111, 2.222])
+        ['1.11', '2.22']
+    """
+    __slots__ = (
+        "superjson",
+        "indent",
+        "sort_keys",
+        "float_precision",
+        "ensure_ascii",
+        "compress",
+        "compress_level",
+        "stream",
+        "backend",
+        "table_threshold",
+        "datetime_epoch",
+        "track_refs",
+        "json_encoder",
+        "backend_dumps",
+    )
+
+    def __init__(
+        self,
+        superjson,
+        indent: bool = None,
+        sort_keys: bool = None,
+        pretty: bool = False,
+        float_precision: int = None,
+        ensure_ascii: bool = True,
+        compress=False,
+        compress_level: int = None,
+        stream: bool = False,
+        backend: str = None,
+        table_threshold: int = None,
+        datetime_epoch: str = None,
+        track_refs: bool = False,
+        cls=None,
+        **kwargs
+    ):
+        if pretty:
+            indent = 4
+            sort_keys = True
+
+        settings = dict()
+        if float_precision is not None:
+            settings["_float_precision"] = float_precision
+        if table_threshold is not None:
+            settings["_table_threshold"] = table_threshold
+        if datetime_epoch is not None:
+            settings["_datetime_epoch"] = check_datetime_epoch(datetime_epoch)
+        if settings:
+            superjson = superjson._configure(**settings)
+
+        if cls is None:
+            cls = json.JSONEncoder
+        json_encoder = cls(
+            indent=indent,
+            sort_keys=sort_keys,
+            ensure_ascii=ensure_ascii,
+            **kwargs
+        )
+
+        if backend is None:
+            backend = superjson._backend
+        options = dict(kwargs)
+        if cls is not json.JSONEncoder:
+            options["cls"] = cls
+        convert = superjson._json_convert
+        backend_dumps = get_backend(backend).make_dumps(
+            superjson,
+            indent,
+            sort_keys,
+            ensure_ascii,
+            options,
+            lambda obj: json_encoder.encode(convert(obj)),
+        )
+
+        setattr_ = super(Encoder, self).__setattr__
+        setattr_("superjson", superjson)
+        setattr_("indent", indent)
+        setattr_("sort_keys", sort_keys)
+        setattr_("float_precision", float_precision)
+        setattr_("ensure_ascii", ensure_ascii)
+        setattr_("compress", compress)
+        setattr_("compress_level", compress_level)
+        setattr_("stream", stream)
+        setattr_("backend", backend)
+        setattr_("table_threshold", table_threshold)
+        setattr_("datetime_epoch", datetime_epoch)
+        setattr_("track_refs", track_refs)
+        setattr_("json_encoder", json_encoder)
+        setattr_("backend_dumps", backend_dumps)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("%s is immutable" % self.__class__.__name__)
+
+    def iterdumps(self, obj):
+        """
+        Encode ``obj`` into json string, yield it chunk by chunk.
+        """
+        if self.track_refs:
+            obj = track_refs(self.superjson, obj)
+        return make_iterencode(self.superjson, self.json_encoder)(obj)
+
+    def dumps(self, obj) -> str:
+        """
+        Encode ``obj`` into json string.
+        """
+        if self.stream:
+            s = "".join(self.iterdumps(obj))
+        elif self.track_refs:
+            # already converted to the builtin types
+            obj = track_refs(self.superjson, obj)
+            if self.backend_dumps is not None:
+                s = self.backend_dumps(obj)
+            else:
+                s = self.json_encoder.encode(obj)
+        elif self.backend_dumps is not None:
+            s = self.backend_dumps(obj)
+        else:
+            s = self.json_encoder.encode(self.superjson._json_convert(obj))
+        if self.compress:
+            s = compress_str(s, self.compress, self.compress_level)
+        return s
+
+    def dumps_many(self, objs) -> list:
+        """
+        Encode many objects, returns a list of json string.
+        """
+        if self.stream or self.compress or self.track_refs:
+            return [self.dumps(obj) for obj in objs]
+        if self.backend_dumps is not None:
+            return [self.backend_dumps(obj) for obj in objs]
+        encode = self.json_encoder.encode
+        convert = self.superjson._json_convert
+        return [encode(convert(obj)) for obj in objs]
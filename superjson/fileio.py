@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Chunk by chunk file read / write helpers, used by the streaming dump / load
+methods.
+"""
+
+import mmap
+import codecs
+from contextlib import contextmanager
+from collections import deque
+
+#: default number of bytes to read from file at a time
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+#: default size of the block that is compressed in parallel
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+def write_chunks(
+    f,
+    chunks,
+    codec=None,
+    level: int = None,
+    buffer_size: int = 1 << 16,
+    workers: int = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+):
+    """Write str chunks to a binary file, for example the chunks yielded by
+    the streaming encoder.
+
+    Small chunks are joined into bigger one (at least ``buffer_size``
+    characters) before writing, if ``codec`` is given (see
+    :mod:`superjson.compression`), the data is compressed on the fly.
+
+    If ``workers`` is greater than 1, the data is compressed in parallel,
+    see :func:`write_chunks_parallel`.
+    """
+    if codec is not None and workers is not None and workers > 1:
+        write_chunks_parallel(f, chunks, codec, level, workers, block_size)
+        return
+
+    if codec is not None:
+        compressor = codec.compressobj(level)
+        write = lambda data: f.write(compressor.compress(data))
+    else:
+        write = f.write
+
+    buffer = list()
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            write("".join(buffer).encode("utf-8"))
+            buffer = list()
+            size = 0
+    if buffer:
+        write("".join(buffer).encode("utf-8"))
+
+    if codec is not None:
+        f.write(compressor.flush())
+
+
+def iter_blocks(chunks, block_size: int = DEFAULT_BLOCK_SIZE):
+    """Join and split str chunks into utf-8 encoded blocks, each block has
+    ``block_size`` characters, except the last one.
+    """
+    buffer = list()
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= block_size:
+            text = "".join(buffer)
+            end = len(text) - len(text) % block_size
+            for start in range(0, end, block_size):
+                yield text[start:start + block_size].encode("utf-8")
+            text = text[end:]
+            buffer = [text]
+            size = len(text)
+    if size:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _write_compressed(f, future):
+    f.write(future.result())
+
+
+def write_chunks_parallel(
+    f,
+    chunks,
+    codec,
+    level: int = None,
+    workers: int = 4,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+):
+    """Compress str chunks in parallel, and write them to a binary file.
+
+    The data is cut into blocks, each block is compressed as an independent
+    stream (a gzip member, a xz stream, a zstd frame ...) on a thread pool,
+    the concatenated streams can be read by any standard decompressor.
+    The compressors release the GIL, so they run on multiple cores.
+
+    It works as a pipeline, the current thread consumes ``chunks`` (usually
+    the streaming encoder), ``workers`` threads compress the blocks, and one
+    thread writes the compressed blocks in order. At most ``2 * workers``
+    blocks are in flight, so the memory usage is bounded.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_in_flight = 2 * workers
+    with ThreadPoolExecutor(workers) as compress_pool, \
+            ThreadPoolExecutor(1) as write_pool:
+        writes = deque()
+        try:
+            n_blocks = 0
+            for block in iter_blocks(chunks, block_size):
+                n_blocks += 1
+                future = compress_pool.submit(codec.compress, block, level)
+                writes.append(write_pool.submit(_write_compressed, f, future))
+                if len(writes) > max_in_flight:
+                    writes.popleft().result()
+            if not n_blocks:
+                f.write(codec.compress(b"", level))
+            while writes:
+                writes.popleft().result()
+        except BaseException:
+            for future in writes:
+                future.cancel()
+            raise
+
+
+@contextmanager
+def map_file(abspath: str):
+    """Memory map a file read only, the content is paged in by the OS on
+    demand and shared by all processes that map the same file, no private
+    copy of the file is made. Yield the :class:`mmap.mmap` object, it can be
+    used as a bytes-like object. Empty file (can't be mapped) yields
+    ``b""``.
+
+    Don't keep any ``memoryview`` of it after the ``with`` block.
+    """
+    with open(abspath, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            yield b""
+            return
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def iter_bytes_chunks(
+    abspath: str,
+    codec=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """Read a file chunk by chunk, decompress on the fly if ``codec`` is
+    given. Each yielded chunk is at most ``chunk_size`` bytes.
+
+    The file is memory mapped, see :func:`map_file`.
+    """
+    with map_file(abspath) as mm:
+        chunks = (
+            mm[start:start + chunk_size]
+            for start in range(0, len(mm), chunk_size)
+        )
+        if codec is not None:
+            yield from codec.iter_decompress(chunks, chunk_size)
+        else:
+            yield from chunks
+
+
+def iter_text_chunks(
+    abspath: str,
+    codec=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """Same as :func:`iter_bytes_chunks`, but yield utf-8 decoded str. A
+    multi-bytes character that is split by the chunk boundary is handled.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in iter_bytes_chunks(abspath, codec, chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def iter_lines(chunks):
+    """Split str chunks into lines, the line breaks are not included. A line
+    that is split by the chunk boundary is joined back.
+    """
+    pending = list()
+    for chunk in chunks:
+        if "\n" not in chunk:
+            pending.append(chunk)
+            continue
+        lines = chunk.split("\n")
+        if pending:
+            pending.append(lines[0])
+            lines[0] = "".join(pending)
+            pending = list()
+        tail = lines.pop()
+        if tail:
+            pending.append(tail)
+        yield from lines
+    if pending:
+        yield "".join(pending)
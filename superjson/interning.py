@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Share the repeated strings of the decoded object.
+
+A list of millions of records repeats the same keys, and often the same
+enum like string values (``"status": "active"``). The parser creates a new
+``str`` object for most of them, the interner replaces them by the first
+seen equal string, so the duplicates are freed::
+
+    >>> decoder = json.make_decoder(intern_keys=True, intern_values=16)
+    >>> records = decoder.loads(s)
+
+The strings are kept in a memo table bounded to ``intern_memo_size``
+entries, when it's full, new strings are not interned any more, so a
+document of unique strings doesn't grow the memo without limit. The memo
+lives as long as the :class:`~superjson.decoder.Decoder`, a decoder reused
+for many documents (``loads_many``, ``load_lines``, ``iter_load``) shares
+the strings across them.
+
+The stdlib and orjson parsers already share the equal keys within one
+document, ``intern_keys`` saves memory when many small documents are loaded
+(json lines), or with other backends. ``intern_values`` saves memory in both
+cases.
+
+Only the plain ``dict`` and ``list`` are visited, the objects created by the
+loaders are kept as they are.
+"""
+
+#: default maximum number of strings in the memo table
+DEFAULT_MEMO_SIZE = 1 << 16
+
+
+def make_interner(
+    intern_keys: bool = True,
+    intern_values: int = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    # hand-optimized bytecode; turn globals into locals
+    dict=dict,
+    len=len,
+    list=list,
+    str=str,
+    type=type,
+):
+    """
+    Create the ``intern(obj) -> obj`` function. A ``dict`` is re-created
+    if ``intern_keys`` is True and any of its keys is not the interned
+    string, otherwise the dicts, lists and their values are updated in
+    place.
+
+    :param intern_keys: intern the keys of json objects.
+    :param intern_values: intern the string values not longer than this,
+        ``None`` to disable.
+    :param memo_size: the maximum number of strings in the memo table.
+    """
+    memo = dict()
+    if intern_values is None:
+        max_length = -1
+    else:
+        max_length = intern_values
+
+    def intern_str(s):
+        try:
+            return memo[s]
+        except KeyError:
+            if len(memo) < memo_size:
+                memo[s] = s
+            return s
+
+    def intern_value(value):
+        klass = type(value)
+        if klass is str:
+            if len(value) <= max_length:
+                return intern_str(value)
+        elif klass is dict:
+            return intern_dict(value)
+        elif klass is list:
+            intern_list(value)
+        return value
+
+    def intern_dict(dct):
+        if intern_keys:
+            # the parser may already share the keys in one document, the
+            # dict is re-created only if any key is not the interned one
+            for key in dct:
+                if type(key) is str and intern_str(key) is not key:
+                    return {
+                        intern_str(key) if type(key) is str else key:
+                            intern_value(value)
+                        for key, value in dct.items()
+                    }
+        for key, value in dct.items():
+            dct[key] = intern_value(value)
+        return dct
+
+    def intern_list(lst):
+        for index, value in enumerate(lst):
+            lst[index] = intern_value(value)
+
+    return intern_value
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+"""
+Shared references and reference cycles.
+
+By default every occurrence of an object is dumped in full, an object
+referenced from many places is repeated many times, and a reference cycle
+raises ``RecursionError``. With ``dumps(obj, track_refs=True)``, the objects
+are tracked by identity, an object that occurs more than once is dumped only
+at its first occurrence, with a reference number, the other occurrences
+refer to the number::
+
+    >>> a = [1, 2]
+    >>> json.dumps([a, a], track_refs=True)
+    '[{"$superjson.def": [0, [1, 2]]}, {"$superjson.ref": 0}]'
+
+``dict``, ``list``, ``tuple`` and all the objects handled by a dumper are
+tracked, the atomic values (``str``, ``int``, ``float``, ``bool``, ``None``)
+are not. The objects that occur only once are dumped as usual.
+
+``loads`` and ``loadb`` resolve the references, the loaded objects are
+shared the same way as the original ones, including the cycles that go
+through the registered custom types::
+
+    >>> b = json.loads(json.dumps([a, a], track_refs=True))
+    >>> b[0] is b[1]
+    True
+
+A reference to an object that is not loaded yet (from inside the object
+itself, or before the object with ``sort_keys``) is loaded as a
+placeholder, it is replaced once the whole document is loaded. The
+placeholder is replaced in ``dict``, ``list``, ``deque``, ``set`` and the
+attributes (``__dict__`` and ``__slots__``) of the objects created by the
+loaders. A loader that keeps it in an immutable object (``tuple``,
+``frozenset``, ...), can't take part in a cycle, :class:`ValueError` is
+raised.
+
+Not supported by ``iterloads`` / ``iter_load``, the elements are loaded one
+by one.
+"""
+
+from collections import deque
+
+#: tag of the first occurrence of a shared object, ``[number, value]``
+DEF_CLASS_NAME = "superjson.def"
+
+#: tag of the other occurrences of a shared object, ``number``
+REF_CLASS_NAME = "superjson.ref"
+
+_def_tag = "$" + DEF_CLASS_NAME
+_ref_tag = "$" + REF_CLASS_NAME
+
+#: if the json string contains it, it is loaded with a :class:`RefTable`
+REF_TAG = '"%s"' % _ref_tag
+
+
+# converted value of the object that is being converted
+_converting = object()
+
+
+class RefTracker(object):
+    """
+    Convert an object the same as ``superjson._json_convert``, but each
+    object is converted only once, its later occurrences are converted to
+    ``{"$superjson.ref": n}``, and the first one is wrapped by
+    ``{"$superjson.def": [n, value]}``.
+    """
+
+    def __init__(self, superjson):
+        # the nested ``self._json_convert`` calls of the dumpers reach
+        # ``self.convert`` through the configured copy
+        self.superjson = superjson._configure(_json_convert=self.convert)
+        self._convert = type(superjson)._json_convert
+        self._atomic_types = superjson._atomic_types
+        # id(obj) -> [obj, converted, number], obj is kept alive, so the id
+        # of a temporary object created by a dumper isn't reused
+        self.memo = dict()
+        self.count = 0
+        # id(converted list) -> number, the lists to wrap by :meth:`track`
+        self.lists = dict()
+
+    def convert(self, obj):
+        klass = type(obj)
+        if klass in self._atomic_types:
+            return obj
+        elif klass is float:
+            return self._convert(self.superjson, obj)
+        key = id(obj)
+        try:
+            entry = self.memo[key]
+        except KeyError:
+            entry = [obj, _converting, None]
+            self.memo[key] = entry
+            node = self._convert(self.superjson, obj)
+            entry[1] = node
+            if entry[2] is not None:
+                # referenced from inside itself
+                return {_def_tag: [entry[2], node]}
+            return node
+
+        number = entry[2]
+        if number is None:
+            node = entry[1]
+            klass = type(node)
+            if node is _converting:
+                pass
+            elif klass is dict:
+                # the first occurrence is already in its parent, turn it
+                # into the definition in place
+                value = dict(node)
+                node.clear()
+                node[_def_tag] = [self.count, value]
+            elif klass is list:
+                self.lists[id(node)] = self.count
+            else:
+                return node
+            number = entry[2] = self.count
+            self.count += 1
+        return {_ref_tag: number}
+
+    def _wrap_lists(self, node):
+        """Wrap the first occurrence of the shared lists, each of them is
+        in the converted object only once.
+        """
+        lists = self.lists
+        remaining = len(lists)
+        todo = [node]
+        while todo and remaining:
+            node = todo.pop()
+            if type(node) is dict:
+                items = list(node.items())
+            else:
+                items = list(enumerate(node))
+            for key, value in items:
+                klass = type(value)
+                if klass is dict or klass is list:
+                    todo.append(value)
+                    if klass is list and id(value) in lists:
+                        node[key] = {_def_tag: [lists[id(value)], value]}
+                        remaining -= 1
+
+    def track(self, obj):
+        """
+        :returns: the converted ``obj``, the shared objects are replaced by
+            the references.
+        """
+        node = self.convert(obj)
+        if self.lists:
+            self._wrap_lists(node)
+        return node
+
+
+def track_refs(superjson, obj):
+    """
+    Convert ``obj`` by ``superjson._json_convert``, with the shared objects
+    replaced by the references. The result only has the builtin types.
+    """
+    return RefTracker(superjson).track(obj)
+
+
+class Placeholder(object):
+    """
+    Loaded reference to an object that is not loaded yet.
+    """
+    __slots__ = ("number",)
+
+    def __init__(self, number):
+        self.number = number
+
+    def __repr__(self):
+        return "Placeholder(%r)" % self.number
+
+
+_atomic_types = (str, int, float, bool, type(None), bytes)
+
+
+def _iter_slots(klass):
+    for base in klass.__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for slot in slots:
+            if slot in ("__dict__", "__weakref__"):
+                continue
+            if slot.startswith("__") and not slot.endswith("__"):
+                slot = "_%s%s" % (base.__name__.lstrip("_"), slot)
+            yield slot
+
+
+class RefTable(object):
+    """
+    The loaded shared objects of one document, by reference number.
+    """
+
+    def __init__(self):
+        self.objects = dict()
+        self.placeholders = 0
+
+    def define(self, number, obj):
+        self.objects[number] = obj
+        return obj
+
+    def get(self, number):
+        try:
+            return self.objects[number]
+        except KeyError:
+            self.placeholders += 1
+            return Placeholder(number)
+
+    def _target(self, placeholder):
+        try:
+            return self.objects[placeholder.number]
+        except KeyError:
+            raise ValueError(
+                "undefined shared reference %r" % placeholder.number
+            )
+
+    def _replace(self, obj, todo) -> int:
+        """Replace the placeholders directly in ``obj``, add the other
+        values to ``todo``.
+
+        :returns: number of the replaced placeholders.
+        """
+        if isinstance(obj, dict):
+            items = list(obj.items())
+        elif isinstance(obj, (list, deque)):
+            items = list(enumerate(obj))
+        elif isinstance(obj, set):
+            found = [item for item in obj if type(item) is Placeholder]
+            for item in found:
+                obj.discard(item)
+                obj.add(self._target(item))
+            todo.extend(obj)
+            return len(found)
+        elif isinstance(obj, (tuple, frozenset)):
+            todo.extend(obj)
+            return 0
+        elif isinstance(obj, type):
+            return 0
+        else:
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                todo.append(attributes)
+            count = 0
+            for slot in _iter_slots(type(obj)):
+                value = getattr(obj, slot, None)
+                if type(value) is Placeholder:
+                    object.__setattr__(obj, slot, self._target(value))
+                    count += 1
+                else:
+                    todo.append(value)
+            return count
+        count = 0
+        for key, value in items:
+            if type(value) is Placeholder:
+                obj[key] = self._target(value)
+                count += 1
+            else:
+                todo.append(value)
+        return count
+
+    def resolve(self, obj):
+        """
+        Replace the placeholders in the loaded object by the shared objects.
+        """
+        remaining = self.placeholders
+        if not remaining:
+            return obj
+        if type(obj) is Placeholder:
+            obj = self._target(obj)
+            remaining -= 1
+        seen = set()
+        todo = [obj]
+        while todo and remaining:
+            value = todo.pop()
+            if isinstance(value, _atomic_types) or id(value) in seen:
+                continue
+            seen.add(id(value))
+            remaining -= self._replace(value, todo)
+        if remaining:
+            raise ValueError(
+                "%s shared references can't be restored, they are kept in "
+                "immutable objects" % remaining
+            )
+        return obj
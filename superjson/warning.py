@@ -1,13 +1,40 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import logging
+import sys
+from types import ModuleType
+
+_logger = None
+
+
+def get_logger():
+    """The ``SuperJson`` logger, :mod:`logging` is imported and the logger is
+    set up at the first call.
+    """
+    global _logger
+    if _logger is None:
+        import logging
+
+        logger = logging.getLogger("SuperJson")
+        logger.setLevel(logging.DEBUG)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setLevel(logging.INFO)
+        logger.addHandler(stream_handler)
+        _logger = logger
+    return _logger
+
+
+class _WarningModule(ModuleType):
+    # ``logger`` used to be a module attribute, create it on access. The
+    # module ``__getattr__`` needs Python 3.7, a property of the module class
+    # works on 3.6
+    @property
+    def logger(self):
+        return get_logger()
+
+
+sys.modules[__name__].__class__ = _WarningModule
 
-logger = logging.getLogger("SuperJson")
-logger.setLevel(logging.DEBUG)
-stream_handler = logging.StreamHandler()
-stream_handler.setLevel(logging.INFO)
-logger.addHandler(stream_handler)
 
 WARN_MSG = ("IMPLEMENT WARNING! SuperJson.{attr} is not a valid "
             "{method_type} method! It must have 'self' as first argument, "
@@ -23,7 +50,7 @@ def prt_console(message, verbose):  # pragma: no cover
     """Print message to console, if ``verbose`` is True.
     """
     if verbose:
-        logger.info(message)
+        get_logger().info(message)
 
 
 if __name__ == "__main__":
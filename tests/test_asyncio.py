@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import os
+import asyncio
+import pytest
+from pytest import raises
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from superjson import _superjson, json
+
+from all import data
+
+dir_here = os.path.dirname(os.path.abspath(__file__))
+
+
+def abspath_of(basename):
+    return os.path.join(dir_here, "asyncio", basename)
+
+
+def setup_module(module):
+    os.makedirs(os.path.join(dir_here, "asyncio"), exist_ok=True)
+
+
+def teardown_module(module):
+    import shutil
+
+    shutil.rmtree(os.path.join(dir_here, "asyncio"), ignore_errors=True)
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def test_adumps_aloads():
+    async def main():
+        s = await json.adumps(data, pretty=True)
+        assert s == json.dumps(data, pretty=True)
+        assert await json.aloads(s) == data
+
+        with ThreadPoolExecutor(2) as executor:
+            results = await asyncio.gather(*[
+                json.aloads(json.dumps(i), executor=executor)
+                for i in range(10)
+            ])
+            assert results == list(range(10))
+
+    run(main())
+
+
+def test_adump_aload():
+    async def main():
+        for basename in ["data.json", "data.json.gz", "data.sjb", "data.sjb.xz"]:
+            path = abspath_of(basename)
+            assert await json.adump(data, path, overwrite=True) is True
+            assert await json.aload(path) == data
+            assert json.load(path, verbose=False) == data
+            assert await json.adump(data, path) is False
+
+        records = [data, {"a": 1}, None]
+        for basename in ["data.jsonl", "data.jsonl.gz"]:
+            path = abspath_of(basename)
+            await json.adump(records, path, overwrite=True)
+            assert list(json.load_lines(path)) == records
+
+        with raises(ValueError):
+            await json.adump(data, abspath_of("data.txt"))
+        with raises(EnvironmentError):
+            await json.aload(abspath_of("not-exists.json"))
+
+    run(main())
+
+
+def test_adump_process_pool():
+    async def main():
+        path = abspath_of("process.json")
+        with ProcessPoolExecutor(1) as executor:
+            await json.adump(data, path, overwrite=True, executor=executor)
+            assert await json.aload(path, executor=executor) == data
+
+    run(main())
+
+
+def test_adump_cancel(monkeypatch):
+    monkeypatch.setattr(_superjson, "_WRITE_BLOCK_SIZE", 1)
+    path = abspath_of("cancel.json")
+
+    def list_temp_files():
+        return [
+            basename for basename in os.listdir(os.path.dirname(path))
+            if basename.startswith("tmp")
+        ]
+
+    async def main():
+        task = asyncio.ensure_future(
+            json.adump(["x" * 1000000], path, overwrite=True)
+        )
+        # wait until the atomic write begins
+        while not list_temp_files():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with raises(asyncio.CancelledError):
+            await task
+
+    run(main())
+    assert not list_temp_files()
+    assert not os.path.exists(path)
+
+
+def test_aiter_load():
+    records = [data, 1, "a", None, [data]]
+
+    async def collect(path, **kwargs):
+        return [record async for record in json.aiter_load(path, **kwargs)]
+
+    for basename in ["iter.json", "iter.json.gz", "iter.jsonl"]:
+        path = abspath_of(basename)
+        json.dump(records, path, overwrite=True, verbose=False)
+        assert run(collect(path)) == records
+        assert run(collect(path, batch_size=2)) == records
+
+    async def break_early():
+        async for record in json.aiter_load(abspath_of("iter.json"), batch_size=1):
+            break
+        return record
+
+    assert run(break_early()) == data
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
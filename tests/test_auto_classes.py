@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import pytest
+from pytest import raises
+from datetime import datetime
+from collections import namedtuple
+from typing import NamedTuple, List
+from superjson import SuperJson
+from superjson.backends import backend_registry
+from superjson.fields import get_auto_fields, resolve_class
+
+# dataclasses is added in Python 3.7
+dataclasses = pytest.importorskip("dataclasses")
+dataclass, field = dataclasses.dataclass, dataclasses.field
+
+try:
+    import attr
+except ImportError:  # pragma: no cover
+    attr = None
+
+backends = [
+    name for name, backend in backend_registry.items() if backend.available
+]
+
+
+@dataclass
+class Point:
+    x: float
+    y: float
+
+
+@dataclass(frozen=True)
+class Order:
+    id: int
+    create_at: datetime
+    points: List[Point]
+    tags: set = field(default_factory=set)
+    total: int = field(init=False, default=0)
+
+
+class Pair(NamedTuple):
+    left: object
+    right: object
+
+
+Triple = namedtuple("Triple", ["a", "b", "c"])
+
+
+if attr is not None:
+    @attr.s(slots=True)
+    class Account(object):
+        _id = attr.ib()
+        owner = attr.ib()
+
+
+class Base(object):
+    __slots__ = ("a", "__b")
+
+    def __init__(self, a, b):
+        self.a = a
+        self.__b = b
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in get_auto_fields(type(self))[0]
+        )
+
+
+class Child(Base):
+    __slots__ = "c"
+
+    def __init__(self, a, b, c):
+        super(Child, self).__init__(a, b)
+        self.c = c
+
+
+class Outer(object):
+    @dataclass
+    class Inner:
+        value: int
+
+
+fixtures = [
+    Point(1, 2.5),
+    Order(1, datetime(2000, 1, 1), [Point(1, 2)], {"a"}),
+    Pair(Point(0, 0), [Pair(1, "x")]),
+    Triple(1, [2], {"c": 3}),
+    Child(1, datetime(2000, 1, 1), [Base(2, 3)]),
+    Outer.Inner(1),
+    {"nested": [Point(1, 2), Pair(1, 2)]},
+]
+if attr is not None:
+    fixtures.append(Account(1, "alice"))
+
+
+@pytest.fixture(params=backends)
+def json(request):
+    return SuperJson(backend=request.param, auto_classes=True)
+
+
+def test_round_trip(json):
+    for obj in fixtures:
+        s = json.dumps(obj)
+        assert json.loads(s) == obj
+        assert json.loads(s.encode("utf-8")) == obj
+    assert json.loadb(json.dumpb(fixtures)) == fixtures
+
+
+def test_tag():
+    json = SuperJson(auto_classes=True)
+    s = json.dumps(Point(1, 2))
+    assert s == '{"$test_auto_classes.Point": {"x": 1, "y": 2}}'
+    s = json.dumps(Outer.Inner(1))
+    assert s == '{"$test_auto_classes.Outer.Inner": {"value": 1}}'
+    s = json.dumps(Child(1, 2, 3))
+    assert '"_Base__b": 2' in s
+
+
+def test_opt_in():
+    json = SuperJson()
+    with raises(TypeError):
+        json.dumps(Point(1, 2))
+    s = SuperJson(auto_classes=True).dumps(Point(1, 2))
+    assert json.loads(s) == {"$test_auto_classes.Point": {"x": 1, "y": 2}}
+
+
+def test_untrusted_input():
+    # only the classes dumped by the same instance are loaded
+    s = '{"$test_auto_classes.Point": {"x": 1, "y": 2}}'
+    json = SuperJson(auto_classes=True)
+    assert json.loads(s) == {"$test_auto_classes.Point": {"x": 1, "y": 2}}
+    json.dumps([Point(0, 0)])
+    assert json.loads(s) == Point(1, 2)
+    assert json.loads('{"$test_auto_classes.Child": {}}') \
+        == {"$test_auto_classes.Child": {}}
+
+    # the listed classes are loaded right away, the others are not handled
+    json = SuperJson(auto_classes=[Point, Child])
+    assert json.loads(s) == Point(1, 2)
+    child = Child(1, 2, 3)
+    assert json.loads(json.dumps(child)) == child
+    b = SuperJson(auto_classes=True).dumpb(Triple(1, 2, 3))
+    assert json.loadb(b) == {"$test_auto_classes.Triple": {
+        "a": 1, "b": 2, "c": 3,
+    }}
+    # not listed, dumped as a plain tuple
+    assert json.dumps(Triple(1, 2, 3)) == "[1, 2, 3]"
+    with raises(TypeError):
+        json.dumps(Outer.Inner(1))
+    with raises(TypeError):
+        SuperJson(auto_classes=[Point, datetime])
+
+
+def test_resolve_class():
+    json = SuperJson(auto_classes=True)
+    assert resolve_class("test_auto_classes.Point") is Point
+    assert resolve_class("test_auto_classes.Outer.Inner") is Outer.Inner
+    # not imported module is not imported
+    assert "antigravity" not in sys.modules
+    assert resolve_class("antigravity.Anything") is None
+    assert "antigravity" not in sys.modules
+    for s in [
+        '{"$test_auto_classes.Outer": {}}',  # not an auto class
+        '{"$builtins.object": {}}',
+        '{"$no.such.Class": {}}',
+        '{"$datetime.datetime.max": {}}',
+    ]:
+        assert json.loads(s) == json.loads(s, object_hook=dict)
+
+
+def test_registered_dumper_wins():
+    class MyJson(SuperJson):
+        def dump_Point(self, obj, class_name="test_auto_classes.Point"):
+            return {"$" + class_name: [obj.x, obj.y]}
+
+        def load_Point(self, dct, class_name="test_auto_classes.Point"):
+            return Point(*dct["$" + class_name])
+
+    json = MyJson(auto_classes=True)
+    s = json.dumps(Point(1, 2))
+    assert s == '{"$test_auto_classes.Point": [1, 2]}'
+    assert json.loads(s) == Point(1, 2)
+
+
+def test_get_auto_fields():
+    assert get_auto_fields(Point) == (("x", "y"), True)
+    assert get_auto_fields(Order)[1] is False
+    assert get_auto_fields(Pair) == (("left", "right"), True)
+    if attr is not None:
+        assert get_auto_fields(Account) == (("_id", "owner"), False)
+    assert get_auto_fields(Child) == (("a", "_Base__b", "c"), False)
+    assert get_auto_fields(Outer) is None
+    assert get_auto_fields(tuple) is None
+    assert get_auto_fields(datetime) is None
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import enum
+import uuid
+import pytest
+from pytest import raises
+from collections import OrderedDict
+from superjson import SuperJson, json as stdlib_json
+from superjson.backends import backend_registry, get_backend, escape_non_ascii
+
+from all import data
+
+backends = [
+    name for name, backend in backend_registry.items() if backend.available
+]
+
+
+class MyStr(str):
+    pass
+
+
+class MyDict(dict):
+    pass
+
+
+class Color(enum.Enum):
+    red = 1
+
+
+class NativeTypeSuperJson(SuperJson):
+    def dump_UUID(self, obj, class_name="uuid.UUID"):
+        return {"$" + class_name: str(obj)}
+
+    def load_UUID(self, dct, class_name="uuid.UUID"):
+        return uuid.UUID(dct["$" + class_name])
+
+    def dump_Color(self, obj, class_name=Color.__module__ + ".Color"):
+        return {"$" + class_name: obj.value}
+
+    def load_Color(self, dct, class_name=Color.__module__ + ".Color"):
+        return Color(dct["$" + class_name])
+
+
+fixtures = [
+    data,
+    [data, [data, {"nested": data}]],
+    {"unicode": "é中\U0001f600", "slash": "a/b", "escape": "\"\\\n\t"},
+    {1: "int key", 1.5: "float key", None: "null key", True: "bool key"},
+    {"big": 2 ** 70, "negative": -2 ** 63, "tuple": (1, (2, 3))},
+    {"subclass": [MyStr("a"), MyDict(a=1)], "$not.a.tag": 1},
+    [], {}, 0, -1.5e-10, "", None, True,
+]
+
+
+@pytest.fixture(params=backends)
+def json(request):
+    return SuperJson(backend=request.param)
+
+
+def test_get_backend():
+    assert get_backend("auto").available
+    with raises(ValueError):
+        get_backend("unknown")
+    with raises(ValueError):
+        SuperJson(backend="unknown")
+
+
+def test_escape_non_ascii():
+    s = "é中\U0001f600"
+    assert escape_non_ascii(s) == stdlib_json.dumps(s)[1:-1]
+    assert escape_non_ascii("abc") == "abc"
+
+
+def test_round_trip(json):
+    for obj in fixtures:
+        expected = stdlib_json.loads(stdlib_json.dumps(obj))
+        for kwargs in [
+            dict(),
+            dict(pretty=True),
+            dict(indent=2),
+            dict(ensure_ascii=False),
+            dict(sort_keys=True, ensure_ascii=False),
+        ]:
+            if kwargs.get("sort_keys") or kwargs.get("pretty"):
+                if isinstance(obj, dict) and len({type(k) for k in obj}) > 1:
+                    continue
+            s = json.dumps(obj, **kwargs)
+            assert json.loads(s) == expected
+            assert stdlib_json.loads(s) == expected
+            assert json.loads(s.encode("utf-8")) == expected
+            if kwargs.get("ensure_ascii", True):
+                assert all(ord(c) < 128 for c in s)
+
+
+def test_big_int(json):
+    ints = [2 ** 64 - 1, 2 ** 64 + 1, -2 ** 63, -2 ** 63 - 1, 10 ** 30 + 1]
+    s = json.dumps(ints)
+    for value in [json.loads(s), json.loads(s.encode("utf-8"))]:
+        assert value == ints
+        assert all(type(i) is int for i in value)
+
+
+def test_options(json):
+    s = json.dumps(data, float_precision=2)
+    assert json.loads(s)["float"] == 3.14
+    assert json.loads(s)["list"] == [1.11, 2.22, 3.33]
+
+    # option that the backend can't express falls back to stdlib
+    assert json.dumps([1, 2], separators=(",", ":")) == "[1,2]"
+    assert json.loads("[1.5]", parse_float=str) == ["1.5"]
+    assert json.dumps([1, 2], backend="stdlib") == "[1, 2]"
+
+    # key order
+    s = json.dumps(OrderedDict([("b", 1), ("a", 2)]), sort_keys=True)
+    assert list(json.loads(s)) == ["b", "a"]
+
+    # custom object hook
+    assert json.loads('{"a": {"b": 1}}', object_hook=len) == 1
+
+    with raises(TypeError):
+        json.dumps(object())
+
+    for obj in [
+        [float("inf"), float("nan")],
+        {"a": [1.5, None, {"b": float("-inf")}]},
+    ]:
+        s = json.dumps(obj)
+        assert stdlib_json.dumps(json.loads(s)) == stdlib_json.dumps(obj)
+
+
+def test_native_type_dumper():
+    obj = {"u": uuid.uuid4(), "c": [Color.red]}
+    for backend in backends:
+        json = NativeTypeSuperJson(backend=backend)
+        assert json.loads(json.dumps(obj)) == obj
+
+
+def test_unregistered_native_type():
+    # orjson serializes them by itself, but without a dumper they are not
+    # serializable by any backend
+    for obj in [
+        uuid.uuid4(),
+        [1, {"a": Color.red}],
+        {"a": (1, [uuid.uuid4()])},
+        {Color.red: 1},
+        {uuid.uuid4(): 1},
+    ]:
+        for backend in backends:
+            # ujson turns any dict key into str
+            if backend == "ujson" and type(obj) is dict \
+                    and type(next(iter(obj))) is not str:
+                continue
+            for kwargs in [dict(), dict(float_precision=2)]:
+                with pytest.raises(TypeError):
+                    SuperJson(backend=backend).dumps(obj, **kwargs)
+
+    try:
+        import dataclasses
+    except ImportError:  # pragma: no cover
+        return
+
+    @dataclasses.dataclass
+    class Point:
+        x: int
+
+    for backend in backends:
+        for kwargs in [dict(), dict(float_precision=2)]:
+            with pytest.raises(TypeError):
+                SuperJson(backend=backend).dumps([Point(1)], **kwargs)
+
+
+def test_parallel(json):
+    try:
+        strings = list(json.dumps_parallel([data] * 5, workers=2, chunk_size=2))
+        assert list(json.loads_parallel(strings, workers=2)) == [data] * 5
+    finally:
+        json.close_process_pool()
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import os
+import math
+import pytest
+from pytest import raises
+from array import array
+from datetime import datetime
+from collections import OrderedDict
+from superjson import SuperJson, json
+from superjson.binary import TAG_EXT_TYPE
+
+from all import data
+
+
+class User(object):
+    def __init__(self, id=None, name=None, avatar=None):
+        self.id = id
+        self.name = name
+        self.avatar = avatar
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
+
+
+class MySuperJson(SuperJson):
+    def dump_User(self, obj, class_name="test_binary.User"):
+        return {"$" + class_name: self._json_convert(obj.__dict__)}
+
+    def load_User(self, dct, class_name="test_binary.User"):
+        return User(**dct["$" + class_name])
+
+
+sj = MySuperJson()
+
+dir_here = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_round_trip():
+    fixtures = [
+        data,
+        [data, {"nested": [data]}],
+        {"unicode": "é中\U0001f600", "surrogate": "\ud800"},
+        {1: "int key", 1.5: "float key", None: "null key", b"\x00": "bytes"},
+        [0, 127, 128, -32, -33, 255, 256, 2 ** 32, -2 ** 63, 2 ** 64 - 1],
+        [2 ** 64, -2 ** 63 - 1, 10 ** 30],
+        ["a" * 31, "a" * 32, "a" * 256, "a" * 70000],
+        [list(range(16)), {str(i): i for i in range(16)}],
+        {"$not.a.tag": 1},
+        [], {}, 0, -1.5e-10, "", None, True, False, b"",
+    ]
+    for obj in fixtures:
+        assert sj.loadb(sj.dumpb(obj)) == obj
+
+    assert math.isnan(sj.loadb(sj.dumpb(float("nan"))))
+    assert sj.loadb(sj.dumpb((1, (2, 3)))) == [1, [2, 3]]
+
+
+def test_raw_bytes():
+    blob = os.urandom(1000)
+    b = sj.dumpb(blob)
+    assert b[:3] == b"\xc5\x03\xe8"  # bin 16
+    assert len(b) == 1003
+    # nested bytes in dumper output is not base64 encoded either
+    user = User(id=1, name="Alice", avatar=blob)
+    b = sj.dumpb({"users": [user]})
+    assert len(b) < 1100
+    assert sj.loadb(b) == {"users": [user]}
+
+
+def test_memoryview():
+    arr = array("d", [1.5, 2.5, 3.5])
+    for view in [
+        memoryview(arr),
+        memoryview(arr).cast("B").cast("B", (4, 6)),
+        memoryview(arr.tobytes())[::2],
+    ]:
+        b = sj.dumpb({"m": view})
+        assert sj.loadb(b) == {"m": view.tobytes()}
+    b = sj.dumpb(memoryview(arr))
+    assert b[:2] == b"\xc4\x18"  # bin 8, 24 bytes
+    assert len(b) == 26
+
+
+def test_tag_ext():
+    b = sj.dumpb(datetime(2000, 1, 1))
+    assert b[0] == 0xc7  # ext 8
+    assert b[2] == TAG_EXT_TYPE
+    # same restored object as the text format
+    for obj in [data, User(1, "Bob"), OrderedDict([("b", 1), ("a", 2)])]:
+        assert sj.loadb(sj.dumpb(obj)) == sj.loads(sj.dumps(obj))
+
+
+def test_float_precision():
+    assert sj.loadb(sj.dumpb([3.14159], float_precision=2)) == [3.14]
+    assert sj.loadb(sj.dumpb({1.23456}, float_precision=2)) == {1.23}
+
+
+def test_error():
+    with raises(TypeError):
+        sj.dumpb(object())
+    with raises(TypeError):
+        sj.dumpb({(1, 2): 1})
+    with raises(ValueError):
+        sj.loadb(sj.dumpb([1, 2])[:-1])
+    with raises(ValueError):
+        sj.loadb(sj.dumpb(1) + b"\x00")
+    with raises(ValueError):
+        sj.loadb(b"\xc1")
+    with raises(ValueError):
+        sj.loadb(b"\xd4\x01\x00")  # unknown ext type
+
+
+def test_msgpack_compatible():
+    msgpack = pytest.importorskip("msgpack")
+    obj = {"a": [1, 2.5, None, True, "s", b"raw"], "b": {"c": 2 ** 63}}
+    assert msgpack.unpackb(sj.dumpb(obj), strict_map_key=False) == obj
+    assert sj.loadb(msgpack.packb(obj, use_bin_type=True)) == obj
+
+
+def test_dump_load_file():
+    for ext in [".sjb", ".sjb.gz", ".sjb.xz"]:
+        path = os.path.join(dir_here, "binary" + ext)
+        try:
+            b = sj.dump(data, path, overwrite=True, verbose=False)
+            assert isinstance(b, bytes)
+            with open(path, "rb") as f:
+                raw = f.read()
+            if ext == ".sjb":
+                assert raw == b
+            else:
+                assert raw != b
+            assert sj.load(path, verbose=False) == data
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def test_default_instance():
+    assert json.loadb(json.dumpb(data)) == data
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
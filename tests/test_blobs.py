@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pytest
+from pytest import raises
+from superjson import SuperJson, json
+from superjson.blobs import find_sidecars, BLOB_ALIGNMENT
+
+data = {
+    "small": b"small",
+    "bytes": b"a" * 1000,
+    "bytearray": bytearray(b"b" * 2000),
+    "memoryview": memoryview(b"c" * 1500)[100:],
+    "nested": [{"bytes": b"d" * 3000}],
+}
+
+
+def test_dump_load(tmpdir):
+    for basename in ["data.json", "data.json.gz"]:
+        path = str(tmpdir.join(basename))
+        for json_ in [json, SuperJson(backend="orjson")]:
+            s = json_.dump(data, path, blob_threshold=1000, overwrite=True, verbose=False)
+            assert s.count("$superjson.blob") == 4
+            assert "$builtins.bytes" in s
+            sidecars = find_sidecars(path)
+            assert len(sidecars) == 1
+            assert os.path.getsize(sidecars[0]) < 8000
+
+            result = json_.load(path, verbose=False)
+            assert result["small"] == b"small"
+            for key in ["bytes", "memoryview"]:
+                assert isinstance(result[key], memoryview)
+                assert result[key].readonly
+                assert result[key] == data[key]
+            assert type(result["bytearray"]) is bytearray
+            assert result["bytearray"] == data["bytearray"]
+            assert bytes(result["nested"][0]["bytes"]) == b"d" * 3000
+
+            result = json_.load(path, verbose=False, blob_copy=True)
+            assert result["bytes"] == b"a" * 1000
+            assert type(result["bytes"]) is bytes
+            assert type(result["bytearray"]) is bytearray
+
+
+def test_sidecar_replaced(tmpdir):
+    path = str(tmpdir.join("data.json"))
+    json.dump(data, path, blob_threshold=1000, verbose=False)
+    old = find_sidecars(path)
+    json.dump(data, path, blob_threshold=1000, overwrite=True, verbose=False)
+    new = find_sidecars(path)
+    assert len(new) == 1 and new != old
+
+    # nothing large enough, no sidecar file
+    json.dump(data, path, blob_threshold=10 ** 6, overwrite=True, verbose=False)
+    assert find_sidecars(path) == []
+    assert json.load(path, verbose=False)["bytes"] == b"a" * 1000
+
+    # the new sidecar file is removed if the dump fails
+    with raises(TypeError):
+        json.dump([b"a" * 1000, object()], path, blob_threshold=1, overwrite=True, verbose=False)
+    assert find_sidecars(path) == []
+    assert json.load(path, verbose=False)["bytes"] == b"a" * 1000
+
+    # dumped without blob_threshold, the old sidecar file is removed
+    for kwargs in [dict(), dict(stream=True)]:
+        json.dump(data, path, blob_threshold=1000, overwrite=True, verbose=False)
+        assert len(find_sidecars(path)) == 1
+        json.dump(data, path, overwrite=True, verbose=False, **kwargs)
+        assert find_sidecars(path) == []
+        assert json.load(path, verbose=False)["bytes"] == b"a" * 1000
+    # the sidecar files of another json file are kept
+    other = str(tmpdir.join("data.json.json"))
+    json.dump(data, other, blob_threshold=1000, verbose=False)
+    json.dump(data, path, overwrite=True, verbose=False)
+    assert len(find_sidecars(other)) == 1
+
+
+def test_bytearray_memoryview():
+    for obj in [bytearray(b"abc"), memoryview(b"abc")]:
+        assert json.loads(json.dumps(obj)) == obj
+        assert json.loadb(json.dumpb(obj)) == obj
+    assert type(json.loads(json.dumps(bytearray(b"abc")))) is bytearray
+    assert type(json.loadb(json.dumpb(bytearray(b"abc")))) is bytearray
+    view = memoryview(bytes(range(12))).cast("I", (3,))
+    assert json.loads(json.dumps(view)) == bytes(range(12))
+    assert json.loads(json.dumps(view[::2])) == view[::2].tobytes()
+
+
+def test_errors(tmpdir):
+    for basename in ["data.sjb", "data.jsonl"]:
+        with raises(ValueError):
+            json.dump(data, str(tmpdir.join(basename)), blob_threshold=1)
+    s = '{"$superjson.blob": ["data.json.0123456789abcdef.blob", 0, 1]}'
+    with raises(ValueError):
+        json.loads(s)
+    path = str(tmpdir.join("data.json"))
+    for ref in ['["../x.blob", 0, 1]', '["data.json.0123456789abcdef.blob", 0, 10]']:
+        with open(path, "w") as f:
+            f.write('{"$superjson.blob": %s}' % ref)
+        with open(path + ".0123456789abcdef.blob", "wb") as f:
+            f.write(b"x")
+        with raises(ValueError):
+            json.load(path, verbose=False)
+
+
+def test_numpy(tmpdir):
+    np = pytest.importorskip("numpy")
+    arr = np.arange(10000, dtype="<f8").reshape(100, 100)
+    path = str(tmpdir.join("array.json"))
+    s = json.dump({"arr": arr, "small": np.arange(3)}, path, blob_threshold=1000, verbose=False)
+    assert len(s) < 500
+    result = json.load(path, verbose=False)
+    assert (result["arr"] == arr).all()
+    assert (result["small"] == np.arange(3)).all()
+    assert not result["arr"].flags.writeable
+    assert result["arr"].ctypes.data % BLOB_ALIGNMENT == 0
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import pytest
+from pytest import raises
 from superjson import comments
 
 import json
+import time
 
 
 def test_strip_comments():
@@ -22,6 +24,58 @@ def test_strip_comments():
     assert json.loads(s) == {"a": 1, "b": 2, "c": 3}
 
 
+s_with_comments = r"""
+// header
+{
+    "url": "http://example.com/a#b", # comment with "quote"
+    "path": "/* not comment */", /* block
+    comment */ "escape": "a\"# \\", // end
+    "division": "1/2", "n": [1/**/, 2 /***/, 3 /* // # */], # x
+    "c": "http://"
+}
+// footer"""
+
+expected = {
+    "url": "http://example.com/a#b",
+    "path": "/* not comment */",
+    "escape": "a\"# \\",
+    "division": "1/2",
+    "n": [1, 2, 3],
+    "c": "http://",
+}
+
+
+def test_strip_block_comments():
+    s = comments.strip_comments(s_with_comments)
+    assert json.loads(s) == expected
+    assert comments.strip_comments("[1/**/2]") == "[1 2]"
+
+    assert comments.strip_comments('{"a": 1}') == '{"a": 1}'
+    assert comments.strip_comments("[1 -- a\n]", ["--"]) == "[1 \n]"
+
+    with raises(ValueError):
+        comments.strip_comments("[1] /* a")
+
+
+def test_iter_strip_comments():
+    s = s_with_comments
+    expected_s = comments.strip_comments(s)
+    for size in range(1, 20):
+        chunks = [s[i:i + size] for i in range(0, len(s), size)]
+        assert "".join(comments.iter_strip_comments(chunks)) == expected_s
+
+
+def test_long_string_and_comment():
+    # the string value and the comments are much longer than the slice,
+    # each character is scanned only once
+    value = "ab\\\"#//" * (1 << 20)
+    s = '{"a": "%s", // %s\n"b": /* %s */ 1}' % (value, value, value)
+    st = time.perf_counter()
+    result = comments.strip_comments(s)
+    assert time.perf_counter() - st < 5
+    assert json.loads(result) == {"a": json.loads('"%s"' % value), "b": 1}
+
+
 if __name__ == "__main__":
     import os
 
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import pytest
+from pytest import raises
+from superjson.compression import (
+    Codec, codec_registry, register_codec, get_codec, XzCodec,
+)
+
+
+data = ("Hello World! " * 1000 + "中文").encode("utf-8")
+
+
+def test_get_codec():
+    assert get_codec("gzip") is codec_registry[".gz"]
+    assert get_codec(".gz") is codec_registry[".gz"]
+    assert get_codec("gz") is codec_registry[".gz"]
+    assert get_codec("XZ") is codec_registry[".xz"]
+    with raises(ValueError):
+        get_codec("rar")
+
+
+def test_register_codec():
+    codec = codec_registry[".xz"]
+    try:
+        register_codec(XzCodec(level=0))
+        assert get_codec("xz").default_level == 0
+    finally:
+        register_codec(codec)
+    assert get_codec("xz") is codec
+
+    class BadCodec(Codec):
+        extension = ".bad"
+
+        def compressobj(self, level=None):
+            return XzCodec().compressobj(level)
+
+    with raises(TypeError):
+        register_codec(BadCodec())
+    with raises(TypeError):
+        register_codec(gzip)
+    assert ".bad" not in codec_registry
+
+
+@pytest.mark.parametrize("ext", list(codec_registry))
+def test_codec(ext):
+    codec = codec_registry[ext]
+    for level in [None, 1]:
+        compressed = codec.compress(data, level)
+        assert len(compressed) < len(data)
+        assert codec.decompress(compressed) == data
+
+    # small chunk in, small chunk out
+    compressed = codec.compress(data)
+    chunks = [compressed[i:i + 7] for i in range(0, len(compressed), 7)]
+    result = list(codec.iter_decompress(chunks, chunk_size=100))
+    assert b"".join(result) == data
+    assert max(len(chunk) for chunk in result) <= 100
+
+    # multi streams
+    assert codec.decompress(compressed + codec.compress(b"abc")) == data + b"abc"
+
+    # streams larger than the input slice, bytes-like object
+    big = os.urandom(3 << 19)
+    compressed = codec.compress(big, 1) + codec.compress(data, 1)
+    for buffer in [bytearray(compressed), memoryview(compressed)]:
+        assert codec.decompress(buffer) == big + data
+
+    # truncated
+    with raises(EOFError):
+        codec.decompress(compressed[:len(compressed) // 2])
+    compressed = codec.compress(b"abc")
+    for i in range(len(compressed)):
+        with raises(EOFError):
+            codec.decompress(compressed[:i])
+
+
+def test_gzip():
+    codec = get_codec("gzip")
+    assert gzip.decompress(codec.compress(data)) == data
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from pytest import raises
+from datetime import datetime, date, timedelta, timezone
+from superjson import SuperJson, json
+from superjson.datetimes import (
+    parse_datetime, parse_date, datetime_to_epoch, epoch_to_datetime,
+)
+
+tz_plus8 = timezone(timedelta(hours=8))
+tz_minus = timezone(-timedelta(hours=3, minutes=30))
+
+datetimes = [
+    datetime(2000, 1, 1),
+    datetime(2000, 1, 1, 12, 30, 15, 123456),
+    datetime(1969, 12, 31, 23, 59, 59, 999999),
+    datetime(1, 1, 1),
+    datetime(9999, 12, 31, 23, 59, 59, 999999),
+    datetime(2000, 1, 1, 8, tzinfo=tz_plus8),
+    datetime(2000, 1, 1, 8, 0, 0, 1, tzinfo=tz_minus),
+    datetime(2000, 1, 1, tzinfo=timezone.utc),
+]
+
+
+def test_parse():
+    for dt in datetimes:
+        assert parse_datetime(dt.isoformat()) == dt
+        assert parse_datetime(dt.isoformat()).utcoffset() == dt.utcoffset()
+    # not ISO 8601, parsed by dateutil
+    assert parse_datetime("Jan 2 2000 10:00") == datetime(2000, 1, 2, 10)
+    assert parse_date("2000-01-02") == date(2000, 1, 2)
+    with raises(ValueError):
+        parse_date("2000/01/02")
+
+
+def test_epoch():
+    assert datetime_to_epoch(datetime(1970, 1, 1, 0, 0, 1), "ms") \
+        == [1000, "ms", None]
+    assert datetime_to_epoch(datetime(2000, 1, 1, 8, tzinfo=tz_plus8), "us") \
+        == [946684800000000, "us", 28800]
+    for dt in datetimes:
+        result = epoch_to_datetime(*datetime_to_epoch(dt, "us"))
+        assert result == dt
+        assert result.utcoffset() == dt.utcoffset()
+        result = epoch_to_datetime(*datetime_to_epoch(dt, "ms"))
+        assert result == dt - timedelta(microseconds=dt.microsecond % 1000)
+
+
+def test_dumps_loads():
+    data = {"times": datetimes, "date": date(2000, 1, 1)}
+    for json_ in [json, SuperJson(backend="orjson")]:
+        for unit in ["ms", "us"]:
+            s = json_.dumps(data, datetime_epoch=unit)
+            assert '"%s"' % unit in s
+            assert json_.loads(s)["times"][:2] == [
+                datetime(2000, 1, 1),
+                datetime(2000, 1, 1, 12, 30, 15, 123000 if unit == "ms" else 123456),
+            ]
+        s = json_.dumps(data, datetime_epoch="us")
+        assert json_.loads(s) == data
+        assert json_.dumps(data, datetime_epoch="us", stream=True) \
+            == json.dumps(data, datetime_epoch="us", stream=True)
+    assert json.loadb(json.dumpb(data, datetime_epoch="us")) == data
+    assert json.dumps(datetime(2000, 1, 1, 8, tzinfo=tz_plus8), datetime_epoch="ms") \
+        == '{"$datetime.datetime": [946684800000, "ms", 28800]}'
+    # ISO string is the default
+    assert json.dumps(datetime(2000, 1, 1)) \
+        == '{"$datetime.datetime": "2000-01-01T00:00:00"}'
+    with raises(ValueError):
+        json.dumps(data, datetime_epoch="s")
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from pytest import raises
+from superjson import json, Decoder
+
+from all import data
+
+
+class TestDecoder(object):
+    def test_loads(self):
+        decoder = json.make_decoder()
+        assert isinstance(decoder, Decoder)
+        s = json.dumps(data)
+        assert decoder.loads(s) == data
+        assert decoder.loads(s.encode("utf-8")) == data
+        assert decoder.loads_many([s, s.encode("utf-8")]) == [data, data]
+
+    def test_options(self):
+        decoder = json.make_decoder(ignore_comments=True)
+        assert decoder.loads_many(["[1] // a", "[2] # b"]) == [[1], [2]]
+
+        decoder = json.make_decoder(decompress=True)
+        s = json.dumps(data, compress=True)
+        assert decoder.loads_many([s]) == [data]
+
+    def test_scan_tags(self):
+        from datetime import date
+
+        assert json._has_tags('{"a": 1}') is False
+        assert json._has_tags('{"$unknown": 1, "b": "$5"}') is False
+        assert json._has_tags('{"$datetime.date": "2000-01-01"}') is True
+        assert json._has_tags('{"\\u0024datetime.date": "2000-01-01"}') is True
+
+        for scan_tags in [True, False]:
+            decoder = json.make_decoder(scan_tags=scan_tags)
+            assert decoder.loads('[{"a": {"b": "$1"}}]') == [{"a": {"b": "$1"}}]
+            assert decoder.loads('{"$unknown": 1}') == {"$unknown": 1}
+            assert decoder.loads(
+                '[{"a": 1}, {"$datetime.date": "2000-01-01"}]'
+            ) == [{"a": 1}, date(2000, 1, 1)]
+            assert decoder.loads(
+                '{"\\u0024datetime.date": "2000-01-01"}'
+            ) == date(2000, 1, 1)
+            # only the "$" prefixed key is a tag
+            assert decoder.loads(
+                '{"Xdatetime.date": "2000-01-01"}'
+            ) == {"Xdatetime.date": "2000-01-01"}
+
+    def test_iterloads_split_number(self):
+        decoder = json.make_decoder()
+        for s in [
+            '[3.25, -1e-07, 12345, 6.02E+23, -0.5, 1.5e3]',
+            '[1.5,2]',
+            '[{"a": 1.25}, 1.0e10]',
+        ]:
+            expected = decoder.loads(s)
+            for i in range(1, len(s)):
+                assert list(decoder.iterloads([s[:i], s[i:]])) == expected
+            assert list(decoder.iterloads(s)) == expected
+
+    def test_immutable(self):
+        decoder = json.make_decoder()
+        with raises(AttributeError):
+            decoder.ignore_comments = True
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
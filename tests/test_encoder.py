@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from pytest import raises
+from concurrent.futures import ThreadPoolExecutor
+from superjson import json, Encoder
+
+from all import data
+
+
+class TestEncoder(object):
+    def test_dumps(self):
+        encoder = json.make_encoder(pretty=True)
+        assert isinstance(encoder, Encoder)
+        assert encoder.dumps(data) == json.dumps(data, pretty=True)
+        assert encoder.dumps_many([data, data]) == [encoder.dumps(data)] * 2
+
+        encoder = json.make_encoder(float_precision=2, compress=True)
+        s = encoder.dumps([3.1415926])
+        assert json.loads(s, decompress=True) == [3.14]
+        assert encoder.dumps_many([[3.1415926]]) == [s]
+
+    def test_stream(self):
+        encoder = json.make_encoder(stream=True, float_precision=3)
+        assert encoder.dumps(data) == json.dumps(data, float_precision=3)
+        assert "".join(encoder.iterdumps(data)) == encoder.dumps(data)
+
+    def test_immutable(self):
+        encoder = json.make_encoder()
+        with raises(AttributeError):
+            encoder.indent = 4
+
+    def test_float_precision_thread_safe(self):
+        values = [1.23456789, {2.3456789}, [3.456789]]
+        encoders = {
+            precision: json.make_encoder(float_precision=precision)
+            for precision in range(1, 5)
+        }
+        expected = {
+            precision: encoder.dumps(values)
+            for precision, encoder in encoders.items()
+        }
+        assert len(set(expected.values())) == 4
+
+        def dumps(precision):
+            return precision, encoders[precision].dumps_many([values] * 200)
+
+        with ThreadPoolExecutor(8) as executor:
+            for precision, results in executor.map(dumps, list(range(1, 5)) * 20):
+                assert set(results) == {expected[precision]}
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
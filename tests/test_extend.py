@@ -62,6 +62,135 @@ class TestMySuperJson(object):
         data1 = json.loads(s)
         assert data == data1
 
+    def test_subclass(self):
+        class Admin(User):
+            pass
+
+        data = {"admin": Admin(id=1, name="Alice")}
+        assert json.loads(json.dumps(data)) == data
+
+    def test_stream(self):
+        data = {
+            "users": [User(id=1, name="Alice"), User(id=2, name="Bob")],
+        }
+        s = json.dumps(data, stream=True)
+        assert s == json.dumps(data)
+        assert json.loads(s) == data
+
+    def test_parallel(self):
+        users = [User(id=i, name="user%s" % i) for i in range(50)]
+        expected = [json.dumps(user, sort_keys=True) for user in users]
+        try:
+            strings = list(json.dumps_parallel(
+                iter(users), workers=2, chunk_size=3, sort_keys=True,
+            ))
+            assert strings == expected
+            assert list(json.loads_parallel(strings, workers=2, chunk_size=3)) == users
+
+            pairs = list(json.dumps_parallel(users, workers=2, ordered=False, chunk_size=3))
+            assert sorted(index for index, _ in pairs) == list(range(50))
+            for index, s in pairs:
+                assert json.loads(s) == users[index]
+            assert list(json.dumps_parallel([], workers=2)) == []
+        finally:
+            json.close_process_pool()
+
+    def test_parallel_main_module(self):
+        import subprocess
+        import sys
+        import os
+
+        # subclass defined in __main__
+        code = "\n".join([
+            "from datetime import date",
+            "from superjson import SuperJson",
+            "class Point(object):",
+            "    def __init__(self, x): self.x = x",
+            "class MyJson(SuperJson):",
+            "    def dump_Point(self, obj, class_name='__main__.Point'):",
+            "        return {'$' + class_name: obj.x}",
+            "    def load_Point(self, dct, class_name='__main__.Point'):",
+            "        return Point(dct['$' + class_name])",
+            "json = MyJson()",
+            "s = list(json.dumps_parallel([Point(1), Point(2)], workers=2, chunk_size=1))",
+            "print([p.x for p in json.loads_parallel(s, workers=2)])",
+        ])
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, "-c", code], env=env)
+        assert output.decode("utf-8").strip() == "[1, 2]"
+
+    def test_override(self):
+        class A(SuperJson):
+            def dump_datetime(self, obj, class_name="datetime.datetime"):
+                return {"$" + class_name: "A"}
+
+        class B(SuperJson):
+            def dump_date(self, obj, class_name="datetime.date"):
+                return {"$" + class_name: "B"}
+
+        class C(A, B):
+            pass
+
+        class D(C):
+            def dump_datetime(self, obj, class_name="datetime.datetime"):
+                return {"$" + class_name: "D"}
+
+        from datetime import datetime, date
+
+        data = [datetime(2000, 1, 1), date(2000, 1, 1)]
+        assert A().dumps(data) == \
+            '[{"$datetime.datetime": "A"}, {"$datetime.date": "2000-01-01"}]'
+        assert C().dumps(data) == \
+            '[{"$datetime.datetime": "A"}, {"$datetime.date": "B"}]'
+        assert D().dumps(data) == \
+            '[{"$datetime.datetime": "D"}, {"$datetime.date": "B"}]'
+        assert SuperJson().dumps(data) == \
+            '[{"$datetime.datetime": "2000-01-01T00:00:00"}, ' \
+            '{"$datetime.date": "2000-01-01"}]'
+
+    def test_init_without_super(self):
+        class NoSuperInit(MySuperJson):
+            def __init__(self, name):
+                self.name = name
+
+        json1 = NoSuperInit("a")
+        data = {"user": User(id=1, name="Alice"), "n": [1, "a"]}
+        assert json1.dumps(data) == json.dumps(data)
+        assert json1.loads(json1.dumps(data)) == data
+        assert json1.dumps(data, stream=True) == json.dumps(data)
+        assert json1.loadb(json1.dumpb(data)) == data
+        with pytest.raises(AttributeError):
+            json1.missing
+
+    def test_mixin(self):
+        class Point(object):
+            def __init__(self, x):
+                self.x = x
+
+        class PointMixin(object):
+            def dump_Point(self, obj, class_name=get_class_name(Point(0))):
+                return {"$" + class_name: obj.x}
+
+            def load_Point(self, dct, class_name=get_class_name(Point(0))):
+                return Point(dct["$" + class_name])
+
+        class MixinSuperJson(PointMixin, SuperJson):
+            pass
+
+        json1 = MixinSuperJson()
+        s = json1.dumps(Point(1))
+        assert s == '{"$%s": 1}' % get_class_name(Point(0))
+        assert json1.loads(s).x == 1
+
+    def test_pickle(self):
+        import pickle
+
+        json.dumps(User(id=1, name="Alice"))
+        json1 = pickle.loads(pickle.dumps(json))
+        assert json1._dumper_cache == dict()
+        assert json1.dumps(User(id=1, name="Alice")) == json.dumps(User(id=1, name="Alice"))
+
 
 if __name__ == "__main__":
     import os
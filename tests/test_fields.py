@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from pytest import raises
+from datetime import datetime
+from superjson import SuperJson
+from superjson.fields import compile_fields, compile_dumper
+
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __eq__(self, other):
+        return (self.x, self.y) == (other.x, other.y)
+
+
+class Event(object):
+    __slots__ = ("name", "time", "tags")
+
+    def __init__(self, *args):
+        raise RuntimeError("__init__ is not called by the loader")
+
+    def __eq__(self, other):
+        return all(
+            getattr(self, field) == getattr(other, field)
+            for field in self.__slots__
+        )
+
+
+class Base(SuperJson):
+    pass
+
+
+class Sub(Base):
+    pass
+
+
+Base.register_fields(Point, ["x", "y"])
+
+
+def make_event():
+    event = Event.__new__(Event)
+    event.name = "launch"
+    event.time = datetime(2000, 1, 1)
+    event.tags = {"a", "b"}
+    return event
+
+
+def test_register_fields():
+    json = Base()
+    s = json.dumps(Point(1, 2.5))
+    assert s == '{"$test_fields.Point": {"x": 1, "y": 2.5}}'
+    assert json.loads(s) == Point(1, 2.5)
+    assert json.loads(json.dumps([Point(Point(1, 2), [3])])) \
+        == [Point(Point(1, 2), [3])]
+
+    # subclass created before and after the registration
+    assert Sub().loads(Sub().dumps(Point(1, 2))) == Point(1, 2)
+
+    class SubSub(Sub):
+        pass
+
+    assert SubSub().loads(SubSub().dumps(Point(1, 2))) == Point(1, 2)
+
+    # not registered on the parent class
+    with raises(TypeError):
+        SuperJson().dumps(Point(1, 2))
+
+
+def test_bypass_init_and_existing_instance():
+    json = Base()
+    event = make_event()
+    # the failed lookup is cached as "no dumper"
+    assert json._get_dumper(Event) is None
+
+    Base.register_fields(Event, Event.__slots__, init=False)
+    s = json.dumps(event, sort_keys=True)
+    assert s.startswith('{"$test_fields.Event": {"name": "launch"')
+    assert json.loads(s) == event
+    assert json.loadb(json.dumpb(event)) == event
+    assert Sub().loads(Sub().dumps([event])) == [event]
+
+
+def test_override():
+    class MyJson(SuperJson):
+        def dump_Point(self, obj, class_name="test_fields.Point"):
+            return {"$" + class_name: [obj.x, obj.y]}
+
+        def load_Point(self, dct, class_name="test_fields.Point"):
+            return Point(*dct["$" + class_name])
+
+    class MySubJson(MyJson):
+        pass
+
+    # MyJson's own dumper is kept
+    SuperJson.register_fields(Point, ["x", "y"])
+    try:
+        assert MySubJson().dumps(Point(1, 2)) == '{"$test_fields.Point": [1, 2]}'
+        assert SuperJson().dumps(Point(1, 2)) \
+            == '{"$test_fields.Point": {"x": 1, "y": 2}}'
+    finally:
+        del SuperJson._dumpers["test_fields.Point"]
+        del SuperJson._loaders["test_fields.Point"]
+        del SuperJson._declared_dumpers["test_fields.Point"]
+        del SuperJson._declared_loaders["test_fields.Point"]
+        del SuperJson._tagged_loaders["$test_fields.Point"]
+
+
+def test_compile_fields():
+    assert compile_fields(Point, ["x", "y"], "a.Point") \
+        is compile_fields(Point, ("x", "y"), "a.Point")
+    for fields in [["x", "x"], ["x-y"], ["class"], [1]]:
+        with raises(ValueError):
+            compile_dumper(fields, "a.Point")
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
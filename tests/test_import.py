@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+import subprocess
 import pytest
 from pytest import raises, approx
 
@@ -9,6 +12,38 @@ def test():
     pass
 
 
+def test_lazy_import():
+    # these modules are imported when the feature is used, not by
+    # ``import superjson``
+    lazy_modules = [
+        "asyncio", "multiprocessing", "concurrent.futures", "inspect",
+        "logging", "tempfile", "pickle", "bz2", "lzma", "zstandard", "lz4",
+        "orjson", "rapidjson", "ujson", "attr", "numpy",
+        "superjson.binary", "superjson.fields", "superjson.pkg.compresslib",
+        "superjson.pkg.atomicwrites",
+    ]
+    code = "\n".join([
+        "import sys",
+        "import superjson",
+        "print(' '.join(sorted(sys.modules)))",
+    ])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    modules = set(output.decode("utf-8").split())
+    assert "superjson._superjson" in modules
+    assert [name for name in lazy_modules if name in modules] == []
+
+
+def test_logger():
+    from superjson import warning
+
+    assert warning.logger is warning.get_logger()
+    assert warning.logger.name == "SuperJson"
+    with raises(AttributeError):
+        warning.no_such_attribute
+
+
 if __name__ == "__main__":
     import os
 
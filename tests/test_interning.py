@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from datetime import datetime
+from superjson import SuperJson, json
+from superjson.interning import make_interner
+
+records = [
+    {
+        "status_code": "active-%s" % (i % 3),
+        "description": "record number %s" % i,
+        "time": datetime(2000, 1, 1 + i % 3),
+        "tags": ["tag-%s" % (i % 2)],
+    }
+    for i in range(10)
+]
+
+
+def iter_json():
+    yield json
+    for backend in ["orjson", "rapidjson", "ujson"]:
+        try:
+            yield SuperJson(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+
+
+def key_of(record, index):
+    return list(record)[index]
+
+
+def test_intern():
+    s = json.dumps(records)
+    for json_ in iter_json():
+        result = json_.loads(s, intern_keys=True, intern_values=12)
+        assert result == records
+        assert key_of(result[0], 0) is key_of(result[9], 0)
+        assert result[0]["status_code"] is result[3]["status_code"]
+        assert result[0]["tags"][0] is result[2]["tags"][0]
+
+        # longer than 5
+        result = json_.loads(s, intern_keys=True, intern_values=5)
+        assert result[0]["status_code"] is not result[3]["status_code"]
+        assert result[0]["tags"][0] is result[2]["tags"][0]
+
+
+def test_share_across_documents():
+    decoder = json.make_decoder(intern_keys=True, intern_values=12)
+    strings = [json.dumps(record) for record in records]
+    results = decoder.loads_many(strings)
+    assert key_of(results[0], 1) is key_of(results[9], 1)
+    assert results[0]["status_code"] is results[3]["status_code"]
+    result = decoder.loads(strings[0])
+    assert key_of(result, 1) is key_of(results[0], 1)
+
+    items = list(decoder.iterloads([json.dumps(records)]))
+    assert items == records
+    assert key_of(items[0], 1) is key_of(results[0], 1)
+
+
+def test_memo_size():
+    intern = make_interner(intern_values=10, memo_size=2)
+    x3 = "".join(["x", "3"])
+    result = intern([{"a": "x1"}, {"a": "x1", "b": "x2"}, [x3, x3[:1] + x3[1:]]])
+    assert result == [{"a": "x1"}, {"a": "x1", "b": "x2"}, ["x3", "x3"]]
+    # memo is full, "x3" is not interned
+    assert result[2][0] is not result[2][1]
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from superjson import SuperJson, json
+
+np = pytest.importorskip("numpy")
+
+
+def assert_same(a, b):
+    assert type(a) is type(b)
+    assert a.dtype == b.dtype
+    assert a.shape == b.shape
+    if a.dtype.hasobject:
+        assert a.tolist() == b.tolist()
+    else:
+        assert a.tobytes() == b.tobytes()
+
+
+def round_trips(obj):
+    yield json.loads(json.dumps(obj))
+    yield json.loadb(json.dumpb(obj))
+    for backend in ["orjson", "rapidjson", "ujson"]:
+        try:
+            sj = SuperJson(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+        yield sj.loads(sj.dumps(obj))
+
+
+def test_dtypes():
+    base = np.arange(24).reshape(2, 3, 4)
+    arrays = [
+        base.astype(dtype)
+        for dtype in [
+            "<f8", ">f8", "<f4", "<f2", "<i8", ">i4", "<i2", "i1", "u1",
+            "<u8", "?", "<c16", ">c8", "<M8[ns]", "<m8[s]", "<U5", "|S3",
+        ]
+    ]
+    arrays.append(np.zeros(3, dtype=[("x", "<f8"), ("y", ">i4", (2,))]))
+    arrays.append(np.zeros(2, dtype=[("p", [("a", "<i2"), ("b", "|S2")])]))
+    arrays.append(np.array(3.5))
+    arrays.append(np.array([], dtype="<f8"))
+    arrays.append(np.array([1, "a", None, {"b": 1}], dtype=object))
+    for arr in arrays:
+        for result in round_trips(arr):
+            assert_same(result, arr)
+
+
+def test_non_contiguous():
+    arr = np.arange(60, dtype="<f8").reshape(3, 4, 5)
+    for view in [arr.T, arr[:, ::2], arr[::-1, 1:, ::3], np.asfortranarray(arr)]:
+        for result in round_trips(view):
+            assert (result == view).all()
+            assert result.shape == view.shape
+
+    s = json.dumps(np.asfortranarray(arr))
+    assert '"order": "F"' in s
+    assert json.loads(s).flags.f_contiguous
+
+
+def test_scalar():
+    for scalar in [
+        np.float32(-2.25), np.int64(-3), np.uint8(255),
+        np.bool_(True), np.complex128(1 + 2j), np.datetime64("2000-01-01"),
+    ]:
+        for result in round_trips(scalar):
+            assert type(result) is type(scalar)
+            assert result == scalar
+
+    # subclass of the python type is a plain json value
+    assert json.dumps(np.float64(1.5)) == "1.5"
+    assert json.dumps(np.str_("abc")) == '"abc"'
+    assert json.dumps([np.float64(1.23456)], float_precision=2) == "[1.23]"
+    assert json.dumps({"a": np.float64(1.5)}, stream=True) == '{"a": 1.5}'
+    for scalar, value in [(np.float64(1.5), 1.5), (np.str_("abc"), "abc")]:
+        for result in round_trips(scalar):
+            assert type(result) is type(value)
+            assert result == value
+
+
+def test_raw_buffer():
+    arr = np.random.random(10000)
+    # base64 in text mode, raw bytes in binary mode
+    assert len(json.dumps(arr)) < arr.nbytes * 1.4
+    assert len(json.dumpb(arr)) < arr.nbytes + 100
+    # no per element python object, the array is on the decoded buffer
+    result = json.loads(json.dumps({"a": [arr]}))["a"][0]
+    assert result.base is not None
+    assert not result.flags.writeable
+    assert (result == arr).all()
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
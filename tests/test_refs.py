@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from datetime import datetime
+from superjson import SuperJson, json, get_class_name
+
+
+class Node(object):
+    def __init__(self, name, children=None, parent=None):
+        self.name = name
+        self.children = children if children is not None else []
+        self.parent = parent
+
+
+class Point(object):
+    __slots__ = ("x", "peer")
+
+    def __init__(self, x, peer=None):
+        self.x = x
+        self.peer = peer
+
+
+class Frozen(object):
+    def __init__(self, items):
+        self.items = tuple(items)
+
+
+Point_class_name = get_class_name(Point(0))
+Frozen_class_name = get_class_name(Frozen([]))
+
+
+class RefSuperJson(SuperJson):
+    def dump_Point(self, obj, class_name=Point_class_name):
+        return {"$" + class_name: [obj.x, self._json_convert(obj.peer)]}
+
+    def load_Point(self, dct, class_name=Point_class_name):
+        return Point(*dct["$" + class_name])
+
+    def dump_Frozen(self, obj, class_name=Frozen_class_name):
+        return {"$" + class_name: self._json_convert(obj.items)}
+
+    def load_Frozen(self, dct, class_name=Frozen_class_name):
+        return Frozen(dct["$" + class_name])
+
+
+RefSuperJson.register_fields(Node, ["name", "children", "parent"])
+
+sj = RefSuperJson()
+
+
+def round_trips(superjson, obj, **kwargs):
+    yield superjson.loads(superjson.dumps(obj, track_refs=True, **kwargs))
+    yield superjson.loads(
+        superjson.dumps(obj, track_refs=True, stream=True, **kwargs))
+    yield superjson.loads(
+        superjson.dumps(obj, track_refs=True, sort_keys=True, **kwargs))
+    yield superjson.loadb(superjson.dumpb(obj, track_refs=True))
+    for backend in ["orjson", "rapidjson", "ujson"]:
+        try:
+            other = superjson.__class__(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+        yield other.loads(other.dumps(obj, track_refs=True, **kwargs))
+
+
+def test_shared():
+    a = [1, 2]
+    s = json.dumps([a, a], track_refs=True)
+    assert s == '[{"$superjson.def": [0, [1, 2]]}, {"$superjson.ref": 0}]'
+
+    shared = {"time": datetime(2000, 1, 1), "tags": ("x", "y")}
+    data = {"a": shared, "b": [shared, shared["time"]], "c": shared["tags"]}
+    for result in round_trips(json, data):
+        assert result["a"] is result["b"][0]
+        assert result["b"][1] is result["a"]["time"]
+        assert result["c"] is result["a"]["tags"]
+        assert result["a"] == {
+            "time": datetime(2000, 1, 1), "tags": ["x", "y"],
+        }
+
+    nested = [a, {"a": a}]
+    for result in round_trips(json, [nested, a, nested]):
+        assert result[0] is result[2]
+        assert result[1] is result[0][0]
+        assert result[1] is result[0][1]["a"]
+
+    records = [{"id": i, "tags": a} for i in range(3)]
+    for result in round_trips(json, [records, records], table_threshold=2):
+        assert result[0] is result[1]
+        assert result[0][0]["tags"] is result[0][2]["tags"]
+        assert result[0][1] == {"id": 1, "tags": [1, 2]}
+
+    # the values that occur only once are dumped as usual
+    data = {"a": [1, "x", 1.5], "b": ["x", {"c": None}]}
+    assert json.dumps(data, track_refs=True) == json.dumps(data)
+
+    # the shared dict is dumped only once
+    records = [{"id": i, "owner": shared} for i in range(100)]
+    assert len(json.dumps(records, track_refs=True)) \
+        < len(json.dumps(records)) / 2
+
+
+def test_cycle():
+    dct = {"x": 1}
+    dct["self"] = dct
+    lst = [dct]
+    lst.append(lst)
+    for result in round_trips(json, lst):
+        assert result[0]["self"] is result[0]
+        assert result[1] is result
+
+    with pytest.raises(RecursionError):
+        json.dumps(lst)
+
+
+def test_custom_types():
+    root = Node("root")
+    for i in range(3):
+        root.children.append(Node("child-%s" % i, parent=root))
+    a = Point(1)
+    b = Point(2, a)
+    a.peer = b
+    data = {"tree": root, "points": [a, b]}
+
+    for result in round_trips(sj, data):
+        tree = result["tree"]
+        assert [child.name for child in tree.children] \
+            == ["child-0", "child-1", "child-2"]
+        for child in tree.children:
+            assert child.parent is tree
+        a, b = result["points"]
+        assert (a.x, b.x) == (1, 2)
+        assert a.peer is b
+        assert b.peer is a
+
+
+def test_immutable():
+    frozen = Frozen([1])
+    frozen.items = (frozen,)
+    s = sj.dumps(frozen, track_refs=True)
+    with pytest.raises(ValueError):
+        sj.loads(s)
+
+    # no cycle, the shared object is loaded before the reference
+    inner = [1]
+    result = sj.loads(sj.dumps([inner, Frozen([inner])], track_refs=True))
+    assert result[1].items[0] is result[0]
+
+
+def test_decoder():
+    a = [1]
+    b = {"b": 2}
+    decoder = json.make_decoder()
+    results = decoder.loads_many([
+        json.dumps([a, a], track_refs=True),
+        json.dumps([b, b], track_refs=True),
+    ])
+    assert results[0][0] is results[0][1]
+    assert results[1] == [b, b]
+    assert results[1][0] is results[1][1]
+
+    s = json.dumps([[a, a]], track_refs=True)
+    with pytest.raises(ValueError):
+        list(decoder.iterloads([s]))
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
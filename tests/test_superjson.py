@@ -5,6 +5,8 @@ import pytest
 from pytest import raises
 from superjson._superjson import (
     is_compressed_json_file,
+    get_file_codec,
+    is_json_lines_file,
     superjson as json,
 )
 
@@ -23,7 +25,7 @@ def remove_all():
     test_dir = os.path.dirname(os.path.abspath(__file__))
     for basename in os.listdir(test_dir):
         ext = os.path.splitext(basename)[1]
-        if ext.lower() in [".json", ".gz"]:
+        if ext.lower() in [".json", ".gz", ".jsonl", ".bz2", ".xz", ".zst", ".lz4"]:
             abspath = os.path.join(test_dir, basename)
             try:
                 os.remove(abspath)
@@ -43,10 +45,23 @@ def test_is_compressed_json_file():
     assert is_compressed_json_file("data.json") is False
     assert is_compressed_json_file("data.js") is False
     assert is_compressed_json_file("data.gz") is True
+    assert is_compressed_json_file("data.jsonl") is False
+    assert is_compressed_json_file("data.jsonl.gz") is True
+    assert is_compressed_json_file("data.json.bz2") is True
+    assert is_compressed_json_file("data.json.XZ") is True
     with raises(ValueError):
         assert is_compressed_json_file("data.txt") is False
 
 
+def test_is_json_lines_file():
+    assert is_json_lines_file("data.jsonl") is True
+    assert is_json_lines_file("data.NDJSON") is True
+    assert is_json_lines_file("data.jsonl.gz") is True
+    assert is_json_lines_file("data.ndjson.xz") is True
+    assert is_json_lines_file("data.json") is False
+    assert is_json_lines_file("data.gz") is False
+
+
 class Test_dumps_loads(object):
     def test_deal_with_bytes(self):
         b = "Hello".encode("utf-8")
@@ -80,6 +95,59 @@ class Test_dumps_loads(object):
         assert "α" in s
         assert json.loads(s) == data
 
+    def test_stream(self):
+        for kwargs in [
+            dict(),
+            dict(pretty=True),
+            dict(float_precision=2),
+            dict(indent=2, sort_keys=True),
+            dict(ensure_ascii=False),
+            dict(separators=(",", ":")),
+        ]:
+            s1 = json.dumps(data, **kwargs)
+            s2 = json.dumps(data, stream=True, **kwargs)
+            assert s1 == s2
+            assert "".join(json.iterdumps(data, **kwargs)) == s1
+
+        nested = [data, (1, 2, [3.3333, {"a": None}]), {1: 2.5, 3: "x"}]
+        assert json.dumps(nested, stream=True) == json.dumps(nested)
+        # the dumper output nested in the indented containers
+        nested = {"a": [{"b": data}], "c": {2: [set([1])]}}
+        assert json.dumps(nested, stream=True, pretty=True) \
+            == json.dumps(nested, pretty=True)
+        nested["c"][(1,)] = 1
+        assert json.dumps(nested, stream=True, indent=1, skipkeys=True) \
+            == json.dumps(nested, indent=1, skipkeys=True)
+
+        with raises(TypeError):
+            json.dumps(object(), stream=True)
+
+    def test_dispatch(self):
+        from collections import OrderedDict
+        from datetime import datetime
+
+        class MyDatetime(datetime):
+            pass
+
+        class MyOrderedDict(OrderedDict):
+            pass
+
+        # subclass of registered type also get a dumper
+        dt = MyDatetime(2000, 1, 1)
+        assert json.loads(json.dumps(dt)) == datetime(2000, 1, 1)
+        od = MyOrderedDict([("b", 1), ("a", 2)])
+        assert json.loads(json.dumps(od)) == OrderedDict([("b", 1), ("a", 2)])
+        assert json.dumps(od, stream=True) == json.dumps(od)
+
+        # dispatch table is filled lazily
+        assert json._get_dumper(MyDatetime) is json._dumpers["datetime.datetime"]
+        assert MyDatetime in json._dumper_cache
+        assert json._get_dumper(object) is None
+
+        # primitive types bypass the lookup
+        for klass in [str, int, bool, type(None)]:
+            assert klass in json._atomic_types
+
     def test_compress(self):
         data = list(range(1000))
         s1 = json.dumps(data, compress=False)
@@ -87,6 +155,11 @@ class Test_dumps_loads(object):
         assert len(s1) > len(s2)
         assert json.loads(s2, decompress=True) == data
 
+        for codec in ["gzip", ".bz2", "xz"]:
+            s3 = json.dumps(data, compress=codec, compress_level=1)
+            assert len(s1) > len(s3)
+            assert json.loads(s3, decompress=codec) == data
+
 
 class TestSuperjson(object):
     def test_pretty(self):
@@ -105,6 +178,165 @@ class TestSuperjson(object):
         data1 = json.load(abspath_of("data1.gz"), verbose=False)
         assert data == data1
 
+    def test_gzip(self):
+        import gzip
+        import zlib
+
+        for stream in [False, True]:
+            json.dump(data, abspath_of("data1.gz"), overwrite=True,
+                      verbose=False, stream=stream)
+            # readable by the standard gzip tools
+            with gzip.open(abspath_of("data1.gz"), "rb") as f:
+                assert f.read().decode("utf-8") == json.dumps(data)
+
+        # multi members file
+        records = [data, {"a": 1}, [1, 2]]
+        with open(abspath_of("lines.jsonl.gz"), "wb") as f:
+            for record in records:
+                f.write(gzip.compress((json.dumps(record) + "\n").encode("utf-8")))
+        assert list(json.load_lines(abspath_of("lines.jsonl.gz"), chunk_size=3)) == records
+        assert json.load(abspath_of("lines.jsonl.gz"), verbose=False) == records
+
+        # zlib stream created by older version
+        with open(abspath_of("data1.gz"), "wb") as f:
+            f.write(zlib.compress(json.dumps(records).encode("utf-8")))
+        assert json.load(abspath_of("data1.gz"), verbose=False) == records
+        assert list(json.iter_load(abspath_of("data1.gz"), chunk_size=5)) == records
+
+        # truncated file
+        with open(abspath_of("data1.gz"), "wb") as f:
+            f.write(gzip.compress(json.dumps(data).encode("utf-8"))[:-10])
+        with raises(EOFError):
+            json.load(abspath_of("data1.gz"), verbose=False)
+
+    def test_codecs(self):
+        from superjson.compression import codec_registry
+
+        records = [data, {"a": 1}, [1, 2]]
+        for ext, codec in codec_registry.items():
+            for stream in [False, True]:
+                abspath = abspath_of("data.json" + ext)
+                json.dump(data, abspath, overwrite=True, verbose=False,
+                          stream=stream, compress_level=1)
+                with open(abspath, "rb") as f:
+                    assert codec.decompress(f.read()).decode("utf-8") == json.dumps(data)
+                assert json.load(abspath, verbose=False) == data
+
+            abspath = abspath_of("data.jsonl" + ext)
+            json.dump_lines(records, abspath, overwrite=True, verbose=False)
+            assert list(json.load_lines(abspath, chunk_size=4)) == records
+
+            abspath = abspath_of("data.json" + ext)
+            json.dump(records, abspath, overwrite=True, verbose=False)
+            assert list(json.iter_load(abspath, chunk_size=4)) == records
+
+    def test_parallel_compress(self):
+        import io
+        import gzip
+        from superjson.compression import codec_registry
+        from superjson.fileio import iter_blocks, write_chunks
+
+        s = json.dumps(data, ensure_ascii=False)
+        assert b"".join(iter_blocks([s], 10)) == s.encode("utf-8")
+        assert b"".join(iter_blocks(list(s), 10)) == s.encode("utf-8")
+        assert list(iter_blocks([], 10)) == []
+
+        for codec in codec_registry.values():
+            for chunks in [[s], list(s), []]:
+                f = io.BytesIO()
+                write_chunks(f, chunks, codec, workers=3, block_size=10)
+                assert codec.decompress(f.getvalue()).decode("utf-8") == "".join(chunks)
+
+        for stream in [False, True]:
+            json.dump(data, abspath_of("data1.gz"), overwrite=True,
+                      verbose=False, stream=stream, workers=4)
+            with gzip.open(abspath_of("data1.gz"), "rb") as f:
+                assert f.read().decode("utf-8") == json.dumps(data)
+
+        records = [data, {"a": 1}, [1, 2]]
+        json.dump_lines(records, abspath_of("lines.jsonl.xz"),
+                        overwrite=True, verbose=False, workers=2)
+        assert list(json.load_lines(abspath_of("lines.jsonl.xz"))) == records
+
+        def generate():
+            yield data
+            raise RuntimeError
+
+        with raises(RuntimeError):
+            json.dump_lines(generate(), abspath_of("lines.jsonl.gz"),
+                            overwrite=True, verbose=False, workers=2)
+
+    def test_ignore_comments(self):
+        s = "// header\n[1, /* a\n b */ 2, {\"a#\": \"//\"}] # footer\n"
+        expected = [1, 2, {"a#": "//"}]
+        for basename in ["comments.json", "comments.gz"]:
+            abspath = abspath_of(basename)
+            codec = get_file_codec(abspath)
+            with open(abspath, "wb") as f:
+                b = s.encode("utf-8")
+                f.write(b if codec is None else codec.compress(b))
+            assert json.load(abspath, ignore_comments=True, verbose=False) == expected
+            assert list(json.iter_load(
+                abspath, ignore_comments=True, chunk_size=3,
+            )) == expected
+
+        with open(abspath_of("comments.jsonl"), "wb") as f:
+            f.write(s.encode("utf-8") * 2)
+        assert list(json.load_lines(
+            abspath_of("comments.jsonl"), ignore_comments=True, chunk_size=3,
+        )) == [expected, expected]
+
+    def test_dump_many_load_many(self):
+        objects = {
+            abspath_of("many%s.json" % i): {"i": i, "data": data}
+            for i in range(20)
+        }
+        objects[abspath_of("many.gz")] = data
+        objects[abspath_of("many.txt")] = data  # invalid extension
+
+        results, errors = json.dump_many(objects, overwrite=True, workers=4)
+        assert len(results) == 21
+        for abspath, size in results.items():
+            assert size == os.path.getsize(abspath)
+        assert list(errors) == [abspath_of("many.txt")]
+        assert isinstance(errors[abspath_of("many.txt")], ValueError)
+
+        results, errors = json.dump_many(
+            {abspath_of("many.gz"): data, abspath_of("many100.json"): data},
+        )
+        assert list(errors) == [abspath_of("many.gz")]
+        assert isinstance(errors[abspath_of("many.gz")], FileExistsError)
+        assert list(results) == [abspath_of("many100.json")]
+
+        abspaths = list(objects) + [abspath_of("not-exists.json")]
+        results, errors = json.load_many(abspaths, workers=4)
+        for abspath, obj in objects.items():
+            if abspath.endswith(".txt"):
+                continue
+            assert results[abspath] == obj
+        assert set(errors) == {abspath_of("many.txt"), abspath_of("not-exists.json")}
+
+        # verbose is not passed twice
+        results, errors = json.dump_many(
+            {abspath_of("many0.json"): data}, overwrite=True, verbose=True,
+        )
+        assert errors == dict()
+        results, errors = json.load_many(
+            [abspath_of("many0.json")], verbose=True,
+        )
+        assert errors == dict()
+        assert results[abspath_of("many0.json")] == data
+
+    def test_stream(self):
+        for basename in ["stream.json", "stream.gz"]:
+            json.dump(data, abspath_of(basename), pretty=True,
+                      overwrite=True, verbose=False, stream=True)
+            data1 = json.load(abspath_of(basename), verbose=False)
+            assert data == data1
+
+        with open(abspath_of("stream.json"), "rb") as f:
+            assert f.read().decode("utf-8") == json.dumps(data, pretty=True)
+
     def test_overwrite(self):
         json.dump(data, abspath_of("test.json"), overwrite=True, verbose=False)
         json.dump("Hello World!", abspath_of("test.json"), overwrite=True, verbose=False)
@@ -112,6 +344,95 @@ class TestSuperjson(object):
         s = json.load(abspath_of("test.json"), verbose=False)
         assert s == "Hello World!"
 
+    def test_iter_load(self):
+        records = [data, 1, -2.5e10, "a\u00e9\u4e2d", [], {}, None, True, [data]]
+        for basename in ["iter.json", "iter.gz"]:
+            json.dump(records, abspath_of(basename), pretty=True,
+                      ensure_ascii=False, overwrite=True, verbose=False)
+            for chunk_size in [1, 7, 1024]:
+                assert list(json.iter_load(
+                    abspath_of(basename), chunk_size=chunk_size,
+                )) == records
+
+        json.dump([], abspath_of("iter.json"), overwrite=True, verbose=False)
+        assert list(json.iter_load(abspath_of("iter.json"))) == []
+
+        json.dump(data, abspath_of("iter.json"), overwrite=True, verbose=False)
+        with raises(ValueError):
+            list(json.iter_load(abspath_of("iter.json")))
+
+        for s in ["[1, 2", "[1, 2,]", "[1 2]", "[1] 2"]:
+            with open(abspath_of("iter.json"), "wb") as f:
+                f.write(s.encode("utf-8"))
+            with raises(ValueError):
+                list(json.iter_load(abspath_of("iter.json"), chunk_size=2))
+
+        with raises(EnvironmentError):
+            json.iter_load(abspath_of("not-exists.json"))
+
+    def test_json_lines(self):
+        records = [data, {"a": 1}, [1, 2], "hello\nworld", None]
+
+        def generate():
+            for record in records:
+                yield record
+
+        for basename in ["lines.jsonl", "lines.jsonl.gz"]:
+            n = json.dump_lines(generate(), abspath_of(basename),
+                                overwrite=True, verbose=False)
+            assert n == len(records)
+            assert list(json.load_lines(abspath_of(basename))) == records
+            for chunk_size in [1, 5]:
+                assert list(json.load_lines(
+                    abspath_of(basename), chunk_size=chunk_size,
+                )) == records
+
+            # dump / load also support json lines file
+            json.dump(records, abspath_of(basename),
+                      overwrite=True, verbose=False)
+            assert json.load(abspath_of(basename), verbose=False) == records
+
+        with open(abspath_of("lines.jsonl"), "rb") as f:
+            lines = f.read().decode("utf-8").split("\n")
+        assert len(lines) == len(records) + 1
+        assert lines[1] == '{"a": 1}'
+
+    def test_load_mmap(self):
+        import tracemalloc
+        from superjson import SuperJson
+
+        size = 10 * 1000 * 1000
+        with open(abspath_of("mmap.json"), "wb") as f:
+            f.write(b"[" + b" " * size + b"1]")
+
+        # the file is parsed from the memory mapped buffer, only the str
+        # copy is allocated, no bytes copy
+        tracemalloc.start()
+        try:
+            assert json.load(abspath_of("mmap.json"), verbose=False) == [1]
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < 1.5 * size
+
+        # empty file can't be mapped
+        with open(abspath_of("mmap.json"), "wb") as f:
+            pass
+        with raises(ValueError):
+            json.load(abspath_of("mmap.json"), verbose=False)
+
+        for backend in ["stdlib", "orjson"]:
+            try:
+                sj = SuperJson(backend=backend)
+            except ValueError:  # pragma: no cover
+                continue
+            sj.dump(data, abspath_of("mmap.json"), overwrite=True, verbose=False)
+            assert sj.load(abspath_of("mmap.json"), verbose=False) == data
+            with open(abspath_of("mmap.json"), "wb") as f:
+                f.write(b"\xef\xbb\xbf[1]")
+            with raises(ValueError):
+                sj.load(abspath_of("mmap.json"), verbose=False)
+
     def test_load_from_not_exist_file(self):
         with raises(EnvironmentError):
             json.load(abspath_of("not-exists.json"), verbose=False)
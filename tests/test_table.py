@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pytest
+from datetime import datetime
+from superjson import SuperJson, json
+
+records = [
+    {"id": i, "name": "user-%s" % i, "time": datetime(2000, 1, i + 1)}
+    for i in range(5)
+]
+
+
+def round_trips(obj, **kwargs):
+    yield json.loads(json.dumps(obj, **kwargs))
+    yield json.loads(json.dumps(obj, stream=True, **kwargs))
+    yield json.loadb(json.dumpb(obj, **kwargs))
+    for backend in ["orjson", "rapidjson", "ujson"]:
+        try:
+            sj = SuperJson(backend=backend)
+        except ValueError:  # pragma: no cover
+            continue
+        yield sj.loads(sj.dumps(obj, **kwargs))
+
+
+def test_table():
+    s = json.dumps(records, table_threshold=5)
+    assert s.startswith(
+        '{"$superjson.table": {"keys": ["id", "name", "time"], '
+        '"columns": [[0, 1, 2, 3, 4], ["user-0"'
+    )
+    assert s.count('"name"') == 1
+    assert json.dumps(records, table_threshold=5, stream=True) == s
+    for result in round_trips({"a": records, "b": (records,)}, table_threshold=2):
+        assert result == {"a": records, "b": [records]}
+
+    # nested table
+    data = [{"a": [{"x": i}, {"x": -i}]} for i in range(3)]
+    s = json.dumps(data, table_threshold=2)
+    assert s.count("$superjson.table") == 4
+    for result in round_trips(data, table_threshold=2):
+        assert result == data
+
+
+def test_not_table():
+    for data in [
+        records,  # below threshold
+        [],
+        [{}, {}],
+        [{"a": 1}, {"a": 1, "b": 2}],
+        [{"a": 1, "b": 2}, {"b": 2, "a": 1}],  # different key order
+        [{"a": 1}, [1]],
+        [{1: 1}, {1: 2}],
+        [{"$superjson.set": [1]}, {"$superjson.set": [2]}],
+    ]:
+        assert json.dumps(data, table_threshold=6) == json.dumps(data)
+        assert "$superjson.table" not in json.dumps(data, table_threshold=6)
+    # disabled by default
+    assert "$superjson.table" not in json.dumps(records * 100)
+
+
+def test_dump_file(tmpdir):
+    for basename in ["data.json", "data.json.gz", "data.sjb", "data.jsonl"]:
+        path = str(tmpdir.join(basename))
+        json.dump([records], path, table_threshold=2, verbose=False)
+        assert json.load(path, verbose=False) == [records]
+        path_records = str(tmpdir.join("records-" + basename))
+        json.dump([records], path_records, verbose=False)
+        if not basename.endswith(".gz"):  # too small to be compressed well
+            assert os.path.getsize(path) < os.path.getsize(path_records)
+
+
+def test_table_columns():
+    s = json.dumps(records, table_threshold=1)
+    columns = json.loads(s, table_columns=True)
+    assert columns == {
+        "id": [0, 1, 2, 3, 4],
+        "name": ["user-%s" % i for i in range(5)],
+        "time": [datetime(2000, 1, i + 1) for i in range(5)],
+    }
+    decoder = json.make_decoder(table_columns=True)
+    assert decoder.loads(s) == columns
+    # the setting doesn't leak to the instance
+    assert json.loads(s) == records
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])